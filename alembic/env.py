@@ -13,9 +13,17 @@ from app.models.application import Application
 from app.models.interview import Interview
 from app.models.document import Document
 from app.models.reminder import Reminder
+from app.models.user_status_count import UserStatusCount
+from app.models.reminder_digest import ReminderDigest
+from app.models.user_directory import UserDirectoryEntry
+from app.models.application_status_event import ApplicationStatusEvent
+from app.models.status_funnel_count import StatusFunnelCount
+from app.models.status_duration_bucket import StatusDurationBucket
 
 config = context.config
-config.set_main_option('sqlalchemy.url', Config.SQLALCHEMY_DATABASE_URI)
+# `flask db-upgrade` passes the app's URL in; the alembic CLI falls back to Config
+if not config.get_main_option('sqlalchemy.url'):
+    config.set_main_option('sqlalchemy.url', Config.SQLALCHEMY_DATABASE_URI.replace('%', '%%'))
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
@@ -23,6 +31,17 @@ if config.config_file_name is not None:
 target_metadata = db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Full-text search structures are managed by raw DDL (see app/search.py)
+    if type_ == 'table' and name.startswith('applications_fts'):
+        return False
+    if type_ == 'column' and name == 'search_vector':
+        return False
+    if type_ == 'index' and name == 'ix_applications_search_vector':
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -30,6 +49,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -45,7 +65,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
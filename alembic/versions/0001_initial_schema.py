@@ -0,0 +1,106 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=256), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'applications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('company', sa.String(length=200), nullable=False),
+        sa.Column('role', sa.String(length=200), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('url', sa.String(length=500), nullable=True),
+        sa.Column('location', sa.String(length=200), nullable=True),
+        sa.Column('salary_range', sa.String(length=100), nullable=True),
+        sa.Column('date_applied', sa.Date(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_applications_user_id', 'applications', ['user_id'])
+    op.create_index('ix_applications_status', 'applications', ['status'])
+
+    op.create_table(
+        'documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('document_type', sa.String(length=50), nullable=True),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('url', sa.String(length=500), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_documents_application_id', 'documents', ['application_id'])
+
+    op.create_table(
+        'interviews',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('interview_type', sa.String(length=50), nullable=True),
+        sa.Column('scheduled_at', sa.DateTime(), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=True),
+        sa.Column('interviewer', sa.String(length=200), nullable=True),
+        sa.Column('location', sa.String(length=300), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('outcome', sa.String(length=50), nullable=True),
+        sa.Column('feedback', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_interviews_application_id', 'interviews', ['application_id'])
+
+    op.create_table(
+        'reminders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('remind_on', sa.Date(), nullable=False),
+        sa.Column('message', sa.String(length=500), nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_reminders_application_id', 'reminders', ['application_id'])
+    op.create_index('ix_reminders_remind_on', 'reminders', ['remind_on'])
+
+
+def downgrade() -> None:
+    op.drop_table('reminders')
+    op.drop_table('interviews')
+    op.drop_table('documents')
+    op.drop_table('applications')
+    op.drop_table('users')
@@ -0,0 +1,32 @@
+"""composite index for keyset pagination of applications
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # db.create_all() at boot (before migrations took over) may have built it
+    op.create_index(
+        'ix_applications_user_updated_id',
+        'applications',
+        ['user_id', 'updated_at', 'id'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_applications_user_updated_id', table_name='applications')
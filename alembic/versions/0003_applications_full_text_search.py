@@ -0,0 +1,45 @@
+"""full-text search over applications
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.search import PG_DDL, SQLITE_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # The generated column is computed for every existing row on ADD COLUMN
+        for statement in PG_DDL:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # Backfill the external-content index from the applications table
+        op.execute("INSERT INTO applications_fts(applications_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_applications_search_vector")
+        op.execute("ALTER TABLE applications DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS applications_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS applications_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS applications_fts_ai")
+        op.execute("DROP TABLE IF EXISTS applications_fts")
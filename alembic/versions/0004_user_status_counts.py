@@ -0,0 +1,48 @@
+"""per-user application status counters
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # db.create_all() at boot (before migrations took over) may have built
+    # the table already, left empty or only counting later writes: rebuild
+    # its contents either way
+    if sa.inspect(op.get_bind()).has_table('user_status_counts'):
+        op.execute("DELETE FROM user_status_counts")
+    else:
+        _create_table()
+    op.execute(
+        "INSERT INTO user_status_counts (user_id, status, count) "
+        "SELECT user_id, status, COUNT(*) FROM applications "
+        "WHERE status IS NOT NULL GROUP BY user_id, status"
+    )
+
+
+def _create_table():
+    op.create_table(
+        'user_status_counts',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'status'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_status_counts')
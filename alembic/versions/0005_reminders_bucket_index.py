@@ -0,0 +1,32 @@
+"""composite index for reminder buckets
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # db.create_all() at boot (before migrations took over) may have built it
+    op.create_index(
+        'ix_reminders_application_completed_remind_on',
+        'reminders',
+        ['application_id', 'completed', 'remind_on'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminders_application_completed_remind_on', table_name='reminders')
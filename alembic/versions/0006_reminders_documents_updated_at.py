@@ -0,0 +1,34 @@
+"""updated_at on reminders and documents
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in ('reminders', 'documents'):
+        # db.create_all() at boot (before migrations took over) built new
+        # databases with the column already
+        if 'updated_at' not in {column['name'] for column in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f'UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL')
+
+
+def downgrade() -> None:
+    for table in ('reminders', 'documents'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
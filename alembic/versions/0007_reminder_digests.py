@@ -0,0 +1,44 @@
+"""reminder digests and open-reminder index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reminder_digests',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('digest_date', sa.Date(), nullable=False),
+        sa.Column('overdue_count', sa.Integer(), nullable=False),
+        sa.Column('today_count', sa.Integer(), nullable=False),
+        sa.Column('items', sa.JSON(), nullable=False),
+        sa.Column('stale', sa.Boolean(), nullable=False),
+        sa.Column('generated_at', sa.DateTime(), nullable=False),
+        sa.Column('emailed_on', sa.Date(), nullable=True),
+    )
+    op.create_index(
+        'ix_reminders_open_remind_on',
+        'reminders',
+        ['remind_on', 'application_id'],
+        postgresql_where=sa.text('completed = false'),
+        sqlite_where=sa.text('completed = 0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminders_open_remind_on', table_name='reminders')
+    op.drop_table('reminder_digests')
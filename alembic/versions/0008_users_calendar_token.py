@@ -0,0 +1,29 @@
+"""calendar feed token on users
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('calendar_token', sa.String(length=64), nullable=True))
+    op.create_index('ix_users_calendar_token', 'users', ['calendar_token'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_calendar_token', table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('calendar_token')
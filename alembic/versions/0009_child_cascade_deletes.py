@@ -0,0 +1,44 @@
+"""ON DELETE CASCADE from applications to interviews, documents and reminders
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHILD_TABLES = ('interviews', 'documents', 'reminders')
+
+# 0001 created these foreign keys unnamed; SQLite's batch mode needs a name
+# to find them by, PostgreSQL named them <table>_application_id_fkey
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _replace_foreign_keys(ondelete):
+    for table in CHILD_TABLES:
+        if op.get_bind().dialect.name == 'sqlite':
+            name = f'fk_{table}_application_id_applications'
+            with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, 'applications', ['application_id'], ['id'], ondelete=ondelete)
+        else:
+            name = f'{table}_application_id_fkey'
+            op.drop_constraint(name, table, type_='foreignkey')
+            op.create_foreign_key(name, table, 'applications', ['application_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    _replace_foreign_keys(None)
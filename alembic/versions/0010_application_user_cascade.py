@@ -0,0 +1,46 @@
+"""ON DELETE CASCADE from users to applications
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.search import SQLITE_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# See 0009: the foreign key was created unnamed
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _replace_foreign_key(ondelete):
+    if op.get_bind().dialect.name == 'sqlite':
+        name = 'fk_applications_user_id_users'
+        with op.batch_alter_table('applications', naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, 'users', ['user_id'], ['id'], ondelete=ondelete)
+        # Rebuilding the table dropped its full-text triggers; the FTS rows
+        # themselves are intact (ids were copied as they were)
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+    else:
+        name = 'applications_user_id_fkey'
+        op.drop_constraint(name, 'applications', type_='foreignkey')
+        op.create_foreign_key(name, 'applications', 'users', ['user_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _replace_foreign_key('CASCADE')
+
+
+def downgrade() -> None:
+    _replace_foreign_key(None)
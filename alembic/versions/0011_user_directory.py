@@ -0,0 +1,34 @@
+"""user directory for sharding by user id
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only the primary's copy is used (see app/shards.py); shards carry it empty
+    op.create_table(
+        'user_directory',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(length=120), nullable=False, unique=True),
+        sa.Column('shard', sa.String(length=32), nullable=False),
+        sa.Column('moving', sa.Boolean(), nullable=False),
+        sa.Column('moved_from', sa.String(length=32), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_directory')
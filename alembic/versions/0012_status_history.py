@@ -0,0 +1,80 @@
+"""application status events and analytics rollups
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app.analytics.FUNNEL, frozen as of this revision
+FUNNEL = ['saved', 'applied', 'phone_screen', 'interviewing', 'final_round', 'offer']
+
+
+def upgrade() -> None:
+    op.create_table(
+        'application_status_events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('from_status', sa.String(length=50), nullable=True),
+        sa.Column('to_status', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_application_status_events_application_id', 'application_status_events',
+                    ['application_id', 'id'])
+    op.create_index('ix_application_status_events_user_id', 'application_status_events', ['user_id'])
+    op.create_table(
+        'status_funnel_counts',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('reached', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'status'),
+    )
+    op.create_table(
+        'status_duration_buckets',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('bucket', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('total_seconds', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'status', 'bucket'),
+    )
+
+    # Earlier transitions were never kept: each application starts its
+    # history at its current status, and counts toward the funnel stages
+    # up to it. No stays are known yet.
+    op.execute(
+        "INSERT INTO application_status_events (application_id, user_id, from_status, to_status, created_at) "
+        "SELECT id, user_id, NULL, status, COALESCE(updated_at, created_at, CURRENT_TIMESTAMP) "
+        "FROM applications WHERE status IS NOT NULL ORDER BY id"
+    )
+    for rank, stage in enumerate(FUNNEL):
+        statuses = ', '.join(f"'{status}'" for status in FUNNEL[rank:])
+        op.execute(
+            "INSERT INTO status_funnel_counts (user_id, status, reached) "
+            f"SELECT user_id, '{stage}', COUNT(*) FROM applications "
+            f"WHERE status IN ({statuses}) GROUP BY user_id"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('status_duration_buckets')
+    op.drop_table('status_funnel_counts')
+    op.drop_index('ix_application_status_events_user_id', table_name='application_status_events')
+    op.drop_index('ix_application_status_events_application_id', table_name='application_status_events')
+    op.drop_table('application_status_events')
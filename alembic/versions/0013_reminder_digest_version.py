@@ -0,0 +1,27 @@
+"""reminder digest version counter
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reminder_digests', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reminder_digests') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,31 @@
+"""id allocations for rows kept across shard moves
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: Union[str, None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only the primary's copy is used (see app/shards.py); shards carry it empty
+    op.create_table(
+        'id_allocations',
+        sa.Column('table_name', sa.String(length=64), primary_key=True),
+        sa.Column('next_id', sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('id_allocations')
@@ -2,6 +2,9 @@ from flask import Flask, jsonify
 from flask_login import LoginManager
 from app.database import db
 from app.config import Config
+from app.cache import cache
+from app.user_cache import user_cache
+from app.typeahead import typeahead
 
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
@@ -12,9 +15,58 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Engine options come from the DB_ENGINE_PROFILE unless set explicitly
+    from app import pool
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', pool.engine_options(app.config))
+    
+    # Read replicas and shards are extra binds; the session routes to them
+    from app import replicas, shards
+    app.config.setdefault('SQLALCHEMY_BINDS', {**replicas.replica_binds(app.config),
+                                               **shards.shard_binds(app.config)})
+    
     # Initialize extensions
     db.init_app(app)
+    replicas.init_app(app)
+    shards.init_app(app)
+    pool.init_app(app)
     login_manager.init_app(app)
+    cache.init_app(app)
+    user_cache.init_app(app)
+    typeahead.init_app(app)
+    
+    from app import search
+    search.init_app(app)
+    
+    # Request latency/SQL/render histograms at /metrics; registered first so
+    # the other before_request hooks are timed too
+    from app import metrics
+    metrics.init_app(app)
+    
+    # Fingerprinted CSS bundles at /assets/ and the asset_url() template helper
+    from app import assets
+    assets.init_app(app)
+    
+    # Flags repeated same-shape queries per request (raises under TESTING)
+    from app import query_patterns
+    query_patterns.init_app(app)
+    
+    # Tables come from Alembic (`flask db-upgrade`); workers only verify the revision
+    from app import migrations
+    migrations.init_app(app)
+    
+    # Registers the session hooks that maintain per-user status counters
+    from app import status_counts  # noqa: F401
+    
+    # Registers the session hooks that mark reminder digests stale
+    from app import digest  # noqa: F401
+    
+    # Status history and its rollups (session hooks), and the duration filter
+    from app import analytics
+    analytics.init_app(app)
+    
+    # CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     # Health check endpoint (no auth required)
     @app.route('/health')
@@ -28,6 +80,9 @@ def create_app(config_class=Config):
     from app.routers.reminders import reminders_bp
     from app.routers.documents import documents_bp
     from app.routers.dashboard import dashboard_bp
+    from app.routers.export import export_bp
+    from app.routers.api import api_bp
+    from app.routers.calendar import calendar_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(applications_bp)
@@ -35,17 +90,16 @@ def create_app(config_class=Config):
     app.register_blueprint(reminders_bp)
     app.register_blueprint(documents_bp)
     app.register_blueprint(dashboard_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(calendar_bp)
     
-    # User loader for Flask-Login
-    from app.models.user import User
-    
+    # User loader for Flask-Login, served from the identity cache
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
-    
-    # Create tables
-    with app.app_context():
-        db.create_all()
+        if not shards.select_user(int(user_id)):
+            return None
+        return user_cache.load(int(user_id))
     
     return app
 
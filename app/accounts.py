@@ -0,0 +1,65 @@
+import time
+from collections import Counter
+from sqlalchemy import delete, select
+from app import shards
+from app.cache import cache
+from app.database import db
+from app.models.application import Application
+from app.models.user import User
+from app.status_counts import apply_deltas
+from app.user_cache import user_cache
+
+# Account deletion in bounded time and memory.
+#
+# Applications are deleted DELETE_BATCH_SIZE at a time, one transaction
+# per batch; their interviews, documents and reminders go with them
+# through ON DELETE CASCADE, never loaded into Python. No transaction
+# touches more than one batch's rows, so locks and the write-ahead log
+# stay small whatever the account's size. The user row goes last
+# (cascading to status counters and the digest), so an interrupted
+# deletion is finished by running it again.
+
+DELETE_BATCH_SIZE = 1000
+
+applications = Application.__table__
+
+
+class AccountDeletion:
+    def __init__(self):
+        self.applications = 0
+        self.batches = 0
+        self.longest_batch = 0.0
+
+
+def delete_account(user_id, batch_size=DELETE_BATCH_SIZE):
+    """Delete the user and everything they own; returns an ``AccountDeletion``."""
+    result = AccountDeletion()
+    while True:
+        started = time.perf_counter()
+        batch = db.session.execute(
+            select(applications.c.id, applications.c.status)
+            .where(applications.c.user_id == user_id).limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        db.session.execute(delete(applications).where(applications.c.id.in_([row.id for row in batch])))
+        # Counters stay exact while the deletion is in progress
+        deltas = Counter()
+        for row in batch:
+            deltas[(user_id, row.status)] -= 1
+        apply_deltas(db.session.connection(), deltas)
+        db.session.commit()
+
+        result.applications += len(batch)
+        result.batches += 1
+        result.longest_batch = max(result.longest_batch, time.perf_counter() - started)
+
+    db.session.execute(delete(User.__table__).where(User.__table__.c.id == user_id))
+    db.session.commit()
+    shards.forget(user_id)
+
+    # A new version, not a missing one: ids can be reused by later signups
+    cache.bump([user_id])
+    cache.backend.delete(f'ics:{user_id}')
+    user_cache.forget(user_id)
+    return result
@@ -0,0 +1,377 @@
+import bisect
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import delete, event, exists, inspect, select
+from app.database import db
+from app.models.application import Application, ApplicationStatus
+from app.models.application_status_event import ApplicationStatusEvent
+from app.models.status_duration_bucket import StatusDurationBucket
+from app.models.status_funnel_count import StatusFunnelCount
+from app.models.user import User
+from app.shards import assign_ids
+
+# Status history and pipeline analytics.
+#
+# Every status an application takes is appended to application_status_events
+# (the first with from_status NULL). Two rollup tables are kept from those
+# events, in the same transaction, so the dashboard reads them in
+# O(statuses) rather than scanning the history:
+#
+#   status_funnel_counts     applications that got at least as far as each
+#                            FUNNEL stage (rejected/withdrawn keep the
+#                            furthest stage they reached)
+#   status_duration_buckets  a histogram of completed stays per status,
+#                            from which medians are interpolated
+#
+# Session writes are recorded by the flush hooks below; Core writes (bulk
+# actions, import, seeding) call record_transitions()/forget_applications()
+# themselves. `flask reconcile-analytics` rebuilds the rollups from the
+# events.
+
+FUNNEL = [
+    ApplicationStatus.SAVED,
+    ApplicationStatus.APPLIED,
+    ApplicationStatus.PHONE_SCREEN,
+    ApplicationStatus.INTERVIEWING,
+    ApplicationStatus.FINAL_ROUND,
+    ApplicationStatus.OFFER,
+]
+RANK = {status: rank for rank, status in enumerate(FUNNEL)}
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Upper bounds (seconds) of the time-in-stage histogram buckets
+DURATION_BUCKETS = (HOUR, 6 * HOUR, DAY, 2 * DAY, 3 * DAY, 5 * DAY, 7 * DAY, 10 * DAY, 14 * DAY,
+                    21 * DAY, 30 * DAY, 45 * DAY, 60 * DAY, 90 * DAY, float('inf'))
+
+# Application ids per IN (...) when loading histories
+HISTORY_CHUNK_SIZE = 1000
+
+events = ApplicationStatusEvent.__table__
+funnel_counts = StatusFunnelCount.__table__
+duration_buckets = StatusDurationBucket.__table__
+applications = Application.__table__
+
+
+class _History:
+    """Where one application's history has got to."""
+    __slots__ = ('furthest', 'status', 'since')
+
+    def __init__(self):
+        self.furthest = -1
+        self.status = None
+        self.since = None
+
+    def move(self, status, at):
+        """Advance to ``status`` at ``at``; returns ``(stages newly reached, (status left, seconds) or None)``."""
+        rank = RANK.get(status, -1)
+        reached = FUNNEL[self.furthest + 1:rank + 1]
+        self.furthest = max(self.furthest, rank)
+        stay = None
+        if self.status is not None and self.since is not None and at is not None:
+            stay = (self.status, max(0, int((at - self.since).total_seconds())))
+        self.status, self.since = status, at
+        return reached, stay
+
+
+class Rollups:
+    """Pending additions to the rollup tables; ``sign=-1`` to take histories back out."""
+
+    def __init__(self, sign=1):
+        self.sign = sign
+        self.reached = Counter()
+        self.stays = Counter()
+        self.seconds = Counter()
+
+    def add(self, user_id, history, status, at):
+        """Count the move of an application to ``status`` at ``at``; ``history`` is updated."""
+        reached, stay = history.move(status, at)
+        for stage in reached:
+            self.reached[(user_id, stage)] += self.sign
+        if stay is not None:
+            status, seconds = stay
+            key = (user_id, status, bisect.bisect_left(DURATION_BUCKETS, seconds))
+            self.stays[key] += self.sign
+            self.seconds[key] += self.sign * seconds
+
+    def apply(self, connection):
+        _upsert(connection, funnel_counts, ['user_id', 'status'], [
+            {'user_id': u, 'status': s, 'reached': n} for (u, s), n in self.reached.items() if n
+        ])
+        _upsert(connection, duration_buckets, ['user_id', 'status', 'bucket'], [
+            {'user_id': u, 'status': s, 'bucket': b, 'count': n, 'total_seconds': self.seconds[(u, s, b)]}
+            for (u, s, b), n in self.stays.items() if n or self.seconds[(u, s, b)]
+        ])
+
+
+def _upsert(connection, table, keys, rows):
+    """Add each row's other columns to the stored ones (one executemany)."""
+    if not rows:
+        return
+    columns = [name for name in rows[0] if name not in keys]
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[name] for name in keys],
+            set_={name: table.c[name] + stmt.excluded[name] for name in columns}
+        )
+        connection.execute(stmt, rows)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            table.update().where(*[table.c[name] == row[name] for name in keys])
+            .values({name: table.c[name] + row[name] for name in columns})
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(row))
+
+
+def _histories(connection, application_ids, rollups=None):
+    """``{application_id: _History}`` replayed from the stored events, counted into ``rollups`` if given."""
+    histories = {}
+    for start in range(0, len(application_ids), HISTORY_CHUNK_SIZE):
+        chunk = application_ids[start:start + HISTORY_CHUNK_SIZE]
+        for row in connection.execute(
+            select(events.c.application_id, events.c.user_id, events.c.to_status, events.c.created_at)
+            .where(events.c.application_id.in_(chunk))
+            .order_by(events.c.application_id, events.c.id)
+        ):
+            history = histories.setdefault(row.application_id, _History())
+            if rollups is None:
+                history.move(row.to_status, row.created_at)
+            else:
+                rollups.add(row.user_id, history, row.to_status, row.created_at)
+    return histories
+
+
+def record_transitions(connection, transitions):
+    """Append events for ``[(application_id, user_id, old, new, at)]`` and update the rollups.
+
+    ``old`` is None for newly created applications; for ones with events it
+    is taken from the last of them. Moves to the status an application
+    already has are ignored.
+    """
+    transitions = [t for t in transitions if t[3] is not None and t[2] != t[3]]
+    if not transitions:
+        return 0
+    histories = _histories(connection, [t[0] for t in transitions])
+
+    rollups = Rollups()
+    rows = []
+    for application_id, user_id, old, new, at in transitions:
+        # With no events yet the history starts here, as a replay of them would
+        history = histories.setdefault(application_id, _History())
+        old = history.status or old
+        if old == new:
+            continue
+        rows.append({'application_id': application_id, 'user_id': user_id,
+                     'from_status': old, 'to_status': new, 'created_at': at})
+        rollups.add(user_id, history, new, at)
+
+    if rows:
+        connection.execute(events.insert(), assign_ids(events, rows))
+        rollups.apply(connection)
+    return len(rows)
+
+
+def record_untracked(connection, user_id, after_id=None):
+    """Record creation events for the user's applications that have none; returns how many.
+
+    For Core inserts that do not get their ids back; ``after_id`` limits
+    the search to ids above it.
+    """
+    stmt = select(applications.c.id, applications.c.status, applications.c.created_at).where(
+        applications.c.user_id == user_id,
+        ~exists().where(events.c.application_id == applications.c.id),
+    )
+    if after_id is not None:
+        stmt = stmt.where(applications.c.id > after_id)
+    now = datetime.utcnow()
+    return record_transitions(connection, [
+        (row.id, user_id, None, row.status, row.created_at or now) for row in connection.execute(stmt)
+    ])
+
+
+def forget_applications(connection, application_ids):
+    """Take the histories of applications about to be deleted out of the rollups.
+
+    Call before the DELETE; their events go with them through ON DELETE CASCADE.
+    """
+    rollups = Rollups(sign=-1)
+    _histories(connection, list(application_ids), rollups)
+    rollups.apply(connection)
+
+
+def replay(connection, user_id=None):
+    """``Rollups`` computed from scratch from the stored events."""
+    stmt = select(events.c.application_id, events.c.user_id, events.c.to_status, events.c.created_at) \
+        .order_by(events.c.application_id, events.c.id)
+    if user_id is not None:
+        stmt = stmt.where(events.c.user_id == user_id)
+    rollups = Rollups()
+    history, current = None, None
+    for row in connection.execution_options(yield_per=5000).execute(stmt):
+        if row.application_id != current:
+            history, current = _History(), row.application_id
+        rollups.add(row.user_id, history, row.to_status, row.created_at)
+    return rollups
+
+
+def _stored(user_id=None):
+    reached = select(funnel_counts).where(funnel_counts.c.reached != 0)
+    stays = select(duration_buckets).where(duration_buckets.c.count != 0)
+    if user_id is not None:
+        reached = reached.where(funnel_counts.c.user_id == user_id)
+        stays = stays.where(duration_buckets.c.user_id == user_id)
+    return (
+        {(r.user_id, r.status): r.reached for r in db.session.execute(reached)},
+        {(r.user_id, r.status, r.bucket): (r.count, r.total_seconds) for r in db.session.execute(stays)},
+    )
+
+
+def find_mismatches(user_id=None):
+    """Rollup keys whose stored value differs from a replay of the events, with both values."""
+    live = replay(db.session.connection(), user_id)
+    live_reached = {k: n for k, n in live.reached.items() if n}
+    live_stays = {k: (n, live.seconds[k]) for k, n in live.stays.items() if n}
+    stored_reached, stored_stays = _stored(user_id)
+
+    mismatches = {}
+    for live_rows, stored_rows, empty in ((live_reached, stored_reached, 0), (live_stays, stored_stays, (0, 0))):
+        for key in set(live_rows) | set(stored_rows):
+            if stored_rows.get(key, empty) != live_rows.get(key, empty):
+                mismatches[key] = (stored_rows.get(key, empty), live_rows.get(key, empty))
+    return mismatches
+
+
+def reconcile(user_id=None):
+    """Rebuild the rollups from the events. Returns rows written."""
+    connection = db.session.connection()
+    for table in (funnel_counts, duration_buckets):
+        stmt = delete(table)
+        if user_id is not None:
+            stmt = stmt.where(table.c.user_id == user_id)
+        connection.execute(stmt)
+    rollups = replay(connection, user_id)
+    rollups.apply(connection)
+    db.session.commit()
+    return sum(1 for n in rollups.reached.values() if n) + sum(1 for n in rollups.stays.values() if n)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _forget_deleted(session, flush_context, instances):
+    # Their events are still there to replay; the DELETE cascades them away
+    deleted_users = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    application_ids = [
+        obj.id for obj in session.deleted
+        if isinstance(obj, Application) and obj.id is not None and obj.user_id not in deleted_users
+    ]
+    if application_ids:
+        forget_applications(session.connection(), application_ids)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _record_status_changes(session, flush_context):
+    now = datetime.utcnow()
+    transitions = []
+    for obj in session.new:
+        if isinstance(obj, Application):
+            transitions.append((obj.id, obj.user_id, None, obj.status, obj.created_at or now))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Application) or obj in session.deleted:
+            continue
+        history = inspect(obj).attrs.status.history
+        if history.has_changes():
+            # The old status is only known here if it was loaded before the change
+            old = history.deleted[0] if history.deleted else None
+            transitions.append((obj.id, obj.user_id, old, obj.status, now))
+
+    if transitions:
+        record_transitions(session.connection(), transitions)
+
+
+def _median(buckets):
+    """Median stay from ``[(bucket, count, total_seconds)]``, interpolated within its bucket."""
+    total = sum(count for _, count, _ in buckets)
+    seen = 0
+    for bucket, count, seconds in sorted(buckets):
+        if seen + count >= total / 2:
+            upper = DURATION_BUCKETS[bucket]
+            if upper == float('inf'):
+                return seconds / count
+            lower = DURATION_BUCKETS[bucket - 1] if bucket else 0
+            return lower + (upper - lower) * (total / 2 - seen) / count
+        seen += count
+    return None
+
+
+def get_analytics(user_id):
+    """Funnel conversion and time in stage for a user, read from the rollups."""
+    reached = dict(db.session.execute(
+        select(funnel_counts.c.status, funnel_counts.c.reached).where(funnel_counts.c.user_id == user_id)
+    ).all())
+    stays = {}
+    for status, bucket, count, seconds in db.session.execute(
+        select(duration_buckets.c.status, duration_buckets.c.bucket,
+               duration_buckets.c.count, duration_buckets.c.total_seconds)
+        .where(duration_buckets.c.user_id == user_id, duration_buckets.c.count > 0)
+    ):
+        stays.setdefault(status, []).append((bucket, count, seconds))
+
+    labels = dict(ApplicationStatus.choices())
+    funnel = []
+    previous = None
+    for status in FUNNEL:
+        count = reached.get(status, 0)
+        funnel.append({
+            'status': status,
+            'label': labels[status],
+            'reached': count,
+            'conversion': count / previous if previous else None,
+        })
+        previous = count
+
+    time_in_stage = []
+    for status in ApplicationStatus.all():
+        if status not in stays:
+            continue
+        count = sum(n for _, n, _ in stays[status])
+        time_in_stage.append({
+            'status': status,
+            'label': labels[status],
+            'count': count,
+            'median_seconds': _median(stays[status]),
+            'mean_seconds': sum(s for _, _, s in stays[status]) / count,
+        })
+
+    applied = reached.get(ApplicationStatus.APPLIED, 0)
+    return {
+        'funnel': funnel,
+        'offer_rate': reached.get(ApplicationStatus.OFFER, 0) / applied if applied else None,
+        'time_in_stage': time_in_stage,
+    }
+
+
+def format_duration(seconds):
+    """``3d 4h``-style rendering of a number of seconds."""
+    if seconds is None:
+        return '-'
+    seconds = int(seconds)
+    if seconds < HOUR:
+        return f'{max(1, seconds // 60)}m'
+    if seconds < DAY:
+        return f'{seconds // HOUR}h'
+    days, hours = divmod(seconds // HOUR, 24)
+    return f'{days}d {hours}h' if hours and days < 10 else f'{days}d'
+
+
+def init_app(app):
+    app.add_template_filter(format_duration, 'duration')
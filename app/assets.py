@@ -0,0 +1,210 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import subprocess
+from urllib.parse import quote
+from flask import Blueprint, current_app, request, send_from_directory, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional, only needed to build .br files
+    brotli = None
+
+# Self-hosted, fingerprinted CSS.
+#
+# `flask build-assets` compiles assets/app.css with the Tailwind CLI (only the
+# classes used in app/templates and app/**/*.py survive) and writes one
+# stylesheet for the Font Awesome icons those files use, drawn as CSS masks from the SVG
+# metadata so no icon font is shipped. Every file is named after its content
+# hash and written with .gz and .br variants. manifest.json maps logical
+# names to those files; templates call asset_url('app.css').
+#
+# /assets/ serves the files with a one-year immutable Cache-Control, picking
+# the precompressed variant the client accepts. A checkout without a build
+# falls back to the CDN tags in base.html.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(ROOT, 'assets')
+OUTPUT_DIR = os.path.join(ROOT, 'app', 'static', 'dist')
+APP_DIR = os.path.join(ROOT, 'app')
+TEMPLATES_DIR = os.path.join(APP_DIR, 'templates')
+MANIFEST = 'manifest.json'
+
+# Precompressed variants, best first: (Accept-Encoding token, suffix)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# fa-* classes that style an icon rather than name one
+ICON_MODIFIERS = {'fw', 'spin', 'pulse', 'xs', 'sm', 'lg', 'xl', '2x', '3x', '4x', '5x', 'border', 'inverse'}
+
+ICON_CLASS = re.compile(r'\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)\b')
+
+assets_bp = Blueprint('assets', __name__, url_prefix='/assets')
+
+
+def fingerprinted(name, data):
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+
+def used_icons(templates_dir=TEMPLATES_DIR, source_dir=APP_DIR):
+    """Icon names referenced as ``fa-<name>`` in the templates or the app's Python sources.
+
+    Names must appear literally (not built with ``{{ }}`` or string
+    formatting) to be included; views that pass an icon to a template
+    (e.g. the dashboard stats) are covered by the ``.py`` scan, as in the
+    Tailwind content globs.
+    """
+    names = set()
+    for root, suffix in ((templates_dir, '.html'), (source_dir, '.py')):
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                # This module's own CSS rules are not icon references
+                if filename.endswith(suffix) and path != os.path.abspath(__file__):
+                    with open(path, encoding='utf-8') as f:
+                        names.update(ICON_CLASS.findall(f.read()))
+    return names - ICON_MODIFIERS
+
+
+def default_fontawesome_dir():
+    """The Font Awesome Free files shipped by the fontawesomefree package, if installed."""
+    try:
+        import fontawesomefree
+    except ImportError:
+        return None
+    return os.path.join(os.path.dirname(fontawesomefree.__file__), 'static', 'fontawesomefree')
+
+
+def icon_css(names, fontawesome_dir, style='solid'):
+    """``(css, missing)``: a stylesheet drawing each named icon, and unknown names.
+
+    Icons are masks over ``currentColor``, so text colour and size
+    utilities apply as they did to the icon font.
+    """
+    with open(os.path.join(fontawesome_dir, 'metadata', 'icons.json'), encoding='utf-8') as f:
+        metadata = json.load(f)
+    svgs = {}
+    for name, icon in metadata.items():
+        if style in icon.get('svg', {}):
+            for alias in [name] + icon.get('aliases', {}).get('names', []):
+                svgs.setdefault(alias, icon['svg'][style])
+
+    rules = [
+        '.fas,.fa-solid{display:inline-block;height:1em;width:1em;vertical-align:-.125em;'
+        'background-color:currentColor;-webkit-mask:var(--fa-icon) center/contain no-repeat;'
+        'mask:var(--fa-icon) center/contain no-repeat}',
+        '.fa-fw{width:1.25em}',
+    ]
+    missing = []
+    for name in sorted(names):
+        svg = svgs.get(name)
+        if svg is None:
+            missing.append(name)
+            continue
+        view_box = ' '.join(str(n) for n in svg['viewBox'])
+        markup = f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='{view_box}'><path d='{svg['path']}'/></svg>"
+        data = quote(markup, safe=" =:/'.,-")
+        width = round(svg['width'] / svg['height'], 4)
+        rules.append(f'.fa-{name}{{--fa-icon:url("data:image/svg+xml,{data}");width:{width}em}}')
+    return '\n'.join(rules) + '\n', missing
+
+
+def tailwind_css(tailwind, source_dir=SOURCE_DIR):
+    """Run the Tailwind CLI over the templates; returns the minified CSS."""
+    result = subprocess.run(
+        [*tailwind.split(), '-c', os.path.join(source_dir, 'tailwind.config.js'),
+         '-i', os.path.join(source_dir, 'app.css'), '--minify'],
+        cwd=ROOT, capture_output=True, check=True,
+    )
+    return result.stdout
+
+
+def write_bundle(name, data, output_dir):
+    """Write ``data`` under its fingerprinted name plus compressed variants."""
+    filename = fingerprinted(name, data)
+    path = os.path.join(output_dir, filename)
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+    return filename
+
+
+def read_manifest(output_dir=OUTPUT_DIR):
+    try:
+        with open(os.path.join(output_dir, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def build(tailwind='tailwindcss', fontawesome_dir=None, output_dir=OUTPUT_DIR):
+    """Build every bundle into ``output_dir`` and return ``(manifest, missing_icons)``.
+
+    Files of the previous build are kept, so pages rendered by workers
+    still running the old manifest keep working during a deploy; older
+    ones are removed.
+    """
+    fontawesome_dir = fontawesome_dir or default_fontawesome_dir()
+    if fontawesome_dir is None:
+        raise RuntimeError('Font Awesome metadata not found: pip install -r requirements-assets.txt '
+                           'or pass the directory of a Font Awesome Free download')
+    os.makedirs(output_dir, exist_ok=True)
+    previous = read_manifest(output_dir) or {}
+
+    icons, missing = icon_css(used_icons(), fontawesome_dir)
+    manifest = {
+        'app.css': write_bundle('app.css', tailwind_css(tailwind), output_dir),
+        'icons.css': write_bundle('icons.css', icons.encode(), output_dir),
+    }
+    with open(os.path.join(output_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    keep = set(manifest.values()) | set(previous.values())
+    for filename in os.listdir(output_dir):
+        if filename != MANIFEST and filename.split('.')[0] in ('app', 'icons') \
+                and re.sub(r'\.(gz|br)$', '', filename) not in keep:
+            os.remove(os.path.join(output_dir, filename))
+    return manifest, missing
+
+
+def asset_url(name):
+    """URL of the built ``name`` (e.g. ``'app.css'``), or None before the first build."""
+    # The debug server picks up rebuilds without a restart
+    manifest = read_manifest() if current_app.debug else current_app.extensions['assets']
+    if not manifest or name not in manifest:
+        return None
+    return url_for('assets.serve', filename=manifest[name])
+
+
+@assets_bp.route('/<path:filename>')
+def serve(filename):
+    path, encoding = filename, None
+    for token, suffix in ENCODINGS:
+        variant = safe_join(OUTPUT_DIR, filename + suffix)
+        if token in request.accept_encodings and variant and os.path.isfile(variant):
+            path, encoding = filename + suffix, token
+            break
+
+    # Names change with the content, so a cached copy never goes stale
+    response = send_from_directory(OUTPUT_DIR, path, mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=current_app.config['ASSETS_MAX_AGE'])
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    return response
+
+
+def init_app(app):
+    app.extensions['assets'] = read_manifest()
+    app.add_template_global(asset_url)
+    app.register_blueprint(assets_bp)
@@ -0,0 +1,109 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import delete, false, insert, literal, select, update
+from app.analytics import forget_applications, record_transitions
+from app.cache import cache
+from app.database import db
+from app.digest import mark_stale
+from app.models.application import Application, ApplicationStatus
+from app.models.reminder import Reminder
+from app.shards import allocates_ids, assign_ids
+from app.status_counts import apply_deltas
+
+# Bulk actions on a user's selected applications.
+#
+# Each action is one set-based statement over `id IN (...) AND user_id = ?`
+# (ids of other users are silently ignored), plus the bookkeeping the
+# session hooks would otherwise do: status counters in the same
+# transaction, status history, digest staleness, and a cache version bump
+# after commit.
+
+applications = Application.__table__
+reminders = Reminder.__table__
+
+
+def _owned_statuses(user_id, application_ids, lock=False):
+    """``{id: status}`` of the selected applications the user owns."""
+    stmt = select(applications.c.id, applications.c.status).where(
+        applications.c.id.in_(application_ids),
+        applications.c.user_id == user_id,
+    )
+    if lock:
+        # Keeps the counter deltas exact against concurrent status changes
+        stmt = stmt.with_for_update()
+    return dict(db.session.execute(stmt).all())
+
+
+def set_status(user_id, application_ids, status):
+    """Move the applications to ``status``; returns how many changed.
+
+    Rows already in ``status`` are left alone, so their ``updated_at``
+    (and list position) does not move.
+    """
+    if status not in ApplicationStatus.all():
+        raise ValueError(f'Unknown status {status!r}')
+    current = _owned_statuses(user_id, application_ids, lock=True)
+    changing = [id_ for id_, old in current.items() if old != status]
+    if not changing:
+        return 0
+
+    now = datetime.utcnow()
+    db.session.execute(update(applications).where(applications.c.id.in_(changing)).values(
+        status=status, updated_at=now
+    ))
+    deltas = Counter()
+    for id_ in changing:
+        deltas[(user_id, current[id_])] -= 1
+        deltas[(user_id, status)] += 1
+    apply_deltas(db.session.connection(), deltas)
+    record_transitions(db.session.connection(), [(id_, user_id, current[id_], status, now) for id_ in changing])
+    db.session.commit()
+    cache.bump([user_id])
+    return len(changing)
+
+
+def delete_applications(user_id, application_ids):
+    """Delete the applications; returns how many were deleted.
+
+    Interviews, documents, reminders and status events go with them
+    through the foreign keys' ON DELETE CASCADE, without being loaded.
+    """
+    current = _owned_statuses(user_id, application_ids, lock=True)
+    if not current:
+        return 0
+
+    forget_applications(db.session.connection(), list(current))
+    db.session.execute(delete(applications).where(applications.c.id.in_(list(current))))
+    deltas = Counter()
+    for status in current.values():
+        deltas[(user_id, status)] -= 1
+    apply_deltas(db.session.connection(), deltas)
+    mark_stale(db.session.connection(), [user_id])
+    db.session.commit()
+    cache.bump([user_id])
+    return len(current)
+
+
+def add_reminder(user_id, application_ids, remind_on, message):
+    """Add the same reminder to each application with one INSERT ... SELECT; returns how many."""
+    now = datetime.utcnow()
+    columns = ['application_id', 'remind_on', 'message', 'completed', 'created_at', 'updated_at']
+    source = select(applications.c.id, literal(remind_on, Reminder.remind_on.type),
+                    literal(message, Reminder.message.type), false(),
+                    literal(now, Reminder.created_at.type), literal(now, Reminder.updated_at.type)).where(
+        applications.c.id.in_(application_ids),
+        applications.c.user_id == user_id,
+    )
+    if allocates_ids(reminders):
+        # Ids come from the shard allocator, so the rows are built here
+        rows = assign_ids(reminders, [dict(zip(columns, row)) for row in db.session.execute(source)])
+        if rows:
+            db.session.execute(insert(reminders), rows)
+        count = len(rows)
+    else:
+        count = db.session.execute(insert(reminders).from_select(columns, source)).rowcount
+    if count:
+        mark_stale(db.session.connection(), [user_id])
+    db.session.commit()
+    cache.bump([user_id])
+    return count
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from sqlalchemy import event, select
+from app.database import db
+from app.models.application import Application
+from app.models.document import Document
+from app.models.interview import Interview
+from app.models.reminder import Reminder
+from app.models.user import User
+from app.replicas import primary_reads
+
+# Per-user response cache.
+#
+# Every cached value is keyed on the user's current "data version", an
+# opaque token that is replaced after any committed write touching that
+# user's applications, interviews, reminders or documents. Old entries are
+# never invalidated explicitly; they simply stop being addressed and age out.
+#
+# Backends share one interface: get(key), set(key, value, ttl) and
+# delete(key), where a ttl of None means the backend default and 0 means no
+# expiry.
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+
+class MemoryBackend:
+    """Bounded in-process LRU with per-entry TTL.
+
+    Versions live in the same process, so writes handled by one gunicorn
+    worker are not seen by the others until the entry's TTL runs out. Use
+    the sqlite backend when running more than one worker.
+    """
+
+    def __init__(self, max_entries=2048, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+def _private_file(path):
+    """Create ``path`` readable by this user only, or check an existing one is.
+
+    Values are unpickled, so whoever can write the file can run code in
+    the app: a file owned by another user, or a symlink, is refused.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    try:
+        stat = os.fstat(fd)
+        if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+            raise ValueError(f'CACHE_PATH {path} is owned by another user; refusing to use it')
+        if stat.st_mode & 0o077:
+            os.fchmod(fd, 0o600)
+    finally:
+        os.close(fd)
+
+
+class SQLiteBackend:
+    """Cache stored in a local SQLite file shared by every worker on the host."""
+
+    PRUNE_EVERY = 500
+
+    def __init__(self, path, default_ttl=300):
+        self.path = path
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._writes = 0
+        _private_file(path)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires_at)
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            conn.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),))
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+
+BACKENDS = {
+    'null': lambda app: NullBackend(),
+    'memory': lambda app: MemoryBackend(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_DEFAULT_TTL']),
+    'sqlite': lambda app: SQLiteBackend(app.config['CACHE_PATH'] or _instance_path(app, 'cache.db'),
+                                        app.config['CACHE_DEFAULT_TTL']),
+}
+
+
+def _instance_path(app, name):
+    os.makedirs(app.instance_path, mode=0o700, exist_ok=True)
+    return os.path.join(app.instance_path, name)
+
+
+class Cache:
+    def __init__(self):
+        self.backend = NullBackend()
+        self.default_ttl = 300
+
+    def init_app(self, app):
+        name = app.config['CACHE_BACKEND']
+        if name not in BACKENDS:
+            raise ValueError(f'Unknown CACHE_BACKEND {name!r}, expected one of {sorted(BACKENDS)}')
+        self.backend = BACKENDS[name](app)
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+        app.extensions['cache'] = self
+
+    def data_version(self, user_id):
+        key = f'version:{user_id}'
+        version = self.backend.get(key)
+        if version is None:
+            # A fresh random token can never address entries cached under
+            # an evicted or expired earlier version
+            version = uuid.uuid4().hex
+            self.backend.set(key, version, ttl=0)
+        return version
+
+    def bump(self, user_ids):
+        for user_id in user_ids:
+            self.backend.set(f'version:{user_id}', uuid.uuid4().hex, ttl=0)
+
+    def user_cached(self, user_id, name, params, build, ttl=None):
+        """Return ``build()`` for ``user_id``, cached under their data version.
+
+        ``params`` is any JSON-serialisable description of the inputs that
+        shape the result (filters, cursors, today's date...). ``ttl`` may be
+        a number of seconds or a callable taking the built value, for
+        results that go stale on their own at a known time.
+        """
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        key = f'{name}:{user_id}:{self.data_version(user_id)}:{digest}'
+        value = self.backend.get(key)
+        if value is None:
+            if isinstance(self.backend, NullBackend):
+                value = build()
+            else:
+                # Stored under the current version, so built from the primary:
+                # a lagging replica may not have the write that set it yet
+                with primary_reads(db.session):
+                    value = build()
+            seconds = ttl(value) if callable(ttl) else ttl
+            self.backend.set(key, value, self.default_ttl if seconds is None else max(min(seconds, self.default_ttl), 1))
+        return value
+
+
+cache = Cache()
+
+
+def snapshot(obj, *fields):
+    """Plain-dict copy of ``obj``'s attributes, safe to cache and pickle."""
+    return {field: getattr(obj, field) for field in fields}
+
+
+# Version bumps: collect the users touched by each flush, bump after commit
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_dirty_users(session, flush_context):
+    users = session.info.setdefault('cache_dirty_users', set())
+    application_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Application):
+            users.add(obj.user_id)
+        elif isinstance(obj, (Interview, Reminder, Document)):
+            application_ids.add(obj.application_id)
+        elif isinstance(obj, User):
+            users.add(obj.id)
+    if application_ids:
+        users.update(session.connection().execute(
+            select(Application.user_id).where(Application.id.in_(application_ids))
+        ).scalars())
+
+
+@event.listens_for(db.session, 'after_commit')
+def _bump_dirty_users(session):
+    users = session.info.pop('cache_dirty_users', None)
+    if users:
+        cache.bump(u for u in users if u is not None)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_dirty_users(session):
+    session.info.pop('cache_dirty_users', None)
@@ -0,0 +1,134 @@
+import hashlib
+from datetime import timedelta
+from sqlalchemy import func
+from app.cache import cache
+from app.database import db
+from app.models.application import Application
+from app.models.interview import Interview, InterviewOutcome, InterviewType
+
+# Per-user iCalendar (RFC 5545) feed of interviews.
+#
+# Calendar clients poll the feed every few minutes, so a poll costs one
+# indexed aggregate over the user's interviews. Its result fingerprints the
+# feed: while it is unchanged the cached body is served (or a 304). When it
+# changes only events whose interview or application changed are rendered
+# again; the others are reused from the cached entry.
+#
+# Last-Modified is the newest updated_at in the same aggregate, so every
+# worker sends the same value for the same data. Deleting an older interview
+# does not move it; the ETag (which wins when both are sent) still changes.
+#
+# Times are written as floating local times, matching how they are entered.
+
+PRODID = '-//Job Tracker//Interviews//EN'
+
+
+def _escape(text):
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Split a content line into 75-octet chunks (continuations start with a space)."""
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    parts, start = [], 0
+    while start < len(data):
+        end = min(start + (75 if not parts else 74), len(data))
+        # Never cut a UTF-8 sequence in half
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode())
+        start = end
+    return '\r\n '.join(parts)
+
+
+def _local(value):
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def _utc(value):
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def fingerprint(user_id):
+    """``(fingerprint, last_modified)`` of the user's interviews and their applications.
+
+    The fingerprint changes whenever any of them do; ``last_modified`` is
+    their newest ``updated_at`` (``None`` for an empty feed).
+    """
+    row = db.session.query(
+        func.count(Interview.id), func.max(Interview.id),
+        func.max(Interview.updated_at), func.max(Application.updated_at),
+    ).select_from(Interview).join(Application, Interview.application_id == Application.id).filter(
+        Application.user_id == user_id
+    ).one()
+    changed = [value for value in row[2:] if value is not None]
+    last_modified = max(changed).replace(microsecond=0) if changed else None
+    return '|'.join(str(value) for value in row), last_modified
+
+
+def render_event(row):
+    start = row.scheduled_at
+    end = start + timedelta(minutes=row.duration_minutes or 60)
+    interview_type = dict(InterviewType.choices()).get(row.interview_type, row.interview_type)
+    description = [f'{row.company} - {row.role}']
+    if row.interviewer:
+        description.append(f'Interviewer: {row.interviewer}')
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:interview-{row.id}@job-tracker',
+        f'DTSTAMP:{_utc(row.updated_at or row.scheduled_at)}',
+        f'DTSTART:{_local(start)}',
+        f'DTEND:{_local(end)}',
+        f'SUMMARY:{_escape(f"{interview_type} interview: {row.company}")}',
+        f"DESCRIPTION:{_escape(chr(10).join(description))}",
+    ]
+    if row.location:
+        lines.append(f'LOCATION:{_escape(row.location)}')
+    if row.outcome == InterviewOutcome.CANCELLED:
+        lines.append('STATUS:CANCELLED')
+    lines.append('END:VEVENT')
+    return ''.join(_fold(line) + '\r\n' for line in lines)
+
+
+def _event_rows(user_id):
+    return db.session.query(
+        Interview.id, Interview.interview_type, Interview.scheduled_at, Interview.duration_minutes,
+        Interview.interviewer, Interview.location, Interview.outcome, Interview.updated_at,
+        Application.company, Application.role, Application.updated_at.label('application_updated_at'),
+    ).join(Application, Interview.application_id == Application.id).filter(
+        Application.user_id == user_id
+    ).order_by(Interview.scheduled_at, Interview.id).all()
+
+
+def get_feed(user_id):
+    """``(body, etag, last_modified)`` of the user's feed, from cache when current."""
+    current, last_modified = fingerprint(user_id)
+    key = f'ics:{user_id}'
+    entry = cache.backend.get(key)
+    if entry is not None and entry['fingerprint'] == current:
+        return entry['body'], entry['etag'], last_modified
+
+    previous = entry['events'] if entry else {}
+    events = {}
+    for row in _event_rows(user_id):
+        version = (row.updated_at, row.application_updated_at)
+        cached = previous.get(row.id)
+        events[row.id] = cached if cached and cached[0] == version else (version, render_event(row))
+
+    body = ''.join([
+        'BEGIN:VCALENDAR\r\n', 'VERSION:2.0\r\n', f'PRODID:{PRODID}\r\n', 'CALSCALE:GREGORIAN\r\n',
+        'X-WR-CALNAME:Interviews\r\n',
+        *(block for _, block in events.values()),
+        'END:VCALENDAR\r\n',
+    ])
+    entry = {
+        'fingerprint': current,
+        'events': events,
+        'body': body,
+        'etag': hashlib.sha256(current.encode()).hexdigest()[:32],
+    }
+    cache.backend.set(key, entry, ttl=0)
+    return entry['body'], entry['etag'], last_modified
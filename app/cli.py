@@ -0,0 +1,274 @@
+import os
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('reconcile-status-counts')
+@click.option('--user-id', type=int, help='Only reconcile this user.')
+@click.option('--check', is_flag=True, help='Compare counters with a live GROUP BY and exit 1 on drift, without writing.')
+@with_appcontext
+def reconcile_status_counts(user_id, check):
+    """Rebuild the per-user status counters from the applications table."""
+    from app.database import db
+    from app.replicas import replica_reads
+    from app.shards import each_shard
+    from app.status_counts import find_mismatches, reconcile
+
+    if check:
+        mismatches = {}
+        # Read-only, so it can run on a replica
+        with replica_reads(db.session):
+            for _ in each_shard(user_id):
+                mismatches.update(find_mismatches(user_id))
+        for (uid, status), (stored, live) in sorted(mismatches.items(), key=str):
+            click.echo(f'user {uid} {status}: stored={stored} live={live}')
+        if mismatches:
+            raise SystemExit(1)
+        click.echo('Status counters are consistent.')
+        return
+
+    rows = sum(reconcile(user_id) for _ in each_shard(user_id))
+    click.echo(f'Rebuilt {rows} status counter row(s).')
+
+
+@click.command('reconcile-analytics')
+@click.option('--user-id', type=int, help='Only reconcile this user.')
+@click.option('--check', is_flag=True, help='Compare the rollups with a replay of the status events and exit 1 on drift, without writing.')
+@with_appcontext
+def reconcile_analytics(user_id, check):
+    """Rebuild the funnel and time-in-stage rollups from the status events."""
+    from app.analytics import find_mismatches, reconcile
+    from app.database import db
+    from app.replicas import replica_reads
+    from app.shards import each_shard
+
+    if check:
+        mismatches = {}
+        with replica_reads(db.session):
+            for _ in each_shard(user_id):
+                mismatches.update(find_mismatches(user_id))
+        for key, (stored, live) in sorted(mismatches.items(), key=str):
+            click.echo(f'user {key[0]} {" ".join(map(str, key[1:]))}: stored={stored} live={live}')
+        if mismatches:
+            raise SystemExit(1)
+        click.echo('Analytics rollups are consistent.')
+        return
+
+    rows = sum(reconcile(user_id) for _ in each_shard(user_id))
+    click.echo(f'Rebuilt {rows} analytics rollup row(s).')
+
+
+@click.command('import-applications')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', 'email', required=True, help='Email of the account to import into.')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Defaults to the file extension.')
+@click.option('--batch-size', type=int, help='Rows per INSERT/COPY batch (default IMPORT_BATCH_SIZE).')
+@with_appcontext
+def import_applications(path, email, fmt, batch_size):
+    """Bulk import applications from a CSV or NDJSON file."""
+    from flask import current_app
+    from app.importer import detect_format, import_applications, iter_records
+    from app.models.user import User
+    from app.shards import select_email
+
+    email = email.strip().lower()
+    user = User.query.filter_by(email=email).first() if select_email(email) else None
+    if user is None:
+        raise click.ClickException(f'No user with email {email}')
+
+    fmt = fmt or detect_format(path)
+    with open(path, 'rb') as stream:
+        result = import_applications(
+            user.id, iter_records(stream, fmt),
+            batch_size=batch_size or current_app.config['IMPORT_BATCH_SIZE']
+        )
+
+    for line, message in result.errors:
+        click.echo(f'line {line}: {message}', err=True)
+    if result.error_count > len(result.errors):
+        click.echo(f'... and {result.error_count - len(result.errors)} more error(s)', err=True)
+    click.echo(f'Imported {result.inserted} application(s), {result.error_count} error(s).')
+
+
+@click.command('db-upgrade')
+@click.option('--revision', default='head', show_default=True, help='Alembic revision to upgrade to.')
+@with_appcontext
+def db_upgrade(revision):
+    """Apply pending migrations to the app's database and shards (run once per release)."""
+    from flask import current_app
+    from app.migrations import upgrade
+    from app.shards import register_existing, seed_allocations
+
+    config = current_app.config
+    if upgrade(config['SQLALCHEMY_DATABASE_URI'], revision):
+        click.echo('Database was created without migrations; stamped it as the initial schema.')
+    click.echo(f'Database upgraded to {revision}.')
+    for url in config['DATABASE_SHARD_URLS']:
+        upgrade(url, revision)
+    if config['DATABASE_SHARD_URLS']:
+        click.echo(f"{len(config['DATABASE_SHARD_URLS'])} shard(s) upgraded to {revision}.")
+        # Ids of users created before sharding must never be handed out again
+        click.echo(f'Registered {register_existing()} existing user(s) in the shard directory.')
+        # New rows get ids above every existing one, on any shard
+        seed_allocations()
+
+
+@click.command('seed-data')
+@click.option('--users', type=int, default=10, show_default=True)
+@click.option('--applications', type=int, default=100, show_default=True, help='Mean applications per user.')
+@click.option('--reminders', type=float, default=0.5, show_default=True, help='Reminder rate per application.')
+@click.option('--seed', type=int, default=0, show_default=True, help='Same seed, same data.')
+@click.option('--first', type=int, default=0, show_default=True, help='Number of the first user<N>@example.com.')
+@with_appcontext
+def seed_data(users, applications, reminders, seed, first):
+    """Create users with deterministic synthetic job-search data."""
+    from app.seed import PASSWORD, seed_users
+
+    user_ids = seed_users(users, first=first, seed=seed, applications_per_user=applications,
+                          reminders_per_application=reminders)
+    click.echo(f'Created {len(user_ids)} user(s) user{first}..user{first + users - 1}@example.com '
+               f'(password {PASSWORD!r}).')
+
+
+@click.command('reminder-digest')
+@click.option('--date', 'day', type=click.DateTime(formats=['%Y-%m-%d']), help='Digest date (default today).')
+@click.option('--email/--no-email', default=False, help='Email each digest through MAIL_BACKEND.')
+@click.option('--batch-size', type=int, help='Users per batch (default DIGEST_BATCH_SIZE).')
+@click.option('--every', type=int, help='Keep running, once every this many seconds.')
+@with_appcontext
+def reminder_digest(day, email, batch_size, every):
+    """Precompute every user's due-reminder digest (safe to rerun)."""
+    import time
+    from datetime import date
+    from flask import current_app
+    from app.database import db
+    from app.digest import run
+    from app.mail import get_mailer
+    from app.shards import each_shard
+
+    config = current_app.config
+    mailer = get_mailer(config) if email else None
+    while True:
+        today = day.date() if day else date.today()
+        for shard in each_shard():
+            try:
+                result = run(today, batch_size=batch_size or config['DIGEST_BATCH_SIZE'], mailer=mailer,
+                             config=config)
+            except Exception:
+                if not every:
+                    raise
+                # A long-running worker logs and carries on: runs are
+                # idempotent, so the next one picks up where this failed
+                current_app.logger.exception(f"Reminder digest run failed{f' on {shard}' if shard else ''}")
+                db.session.rollback()
+                continue
+            click.echo(f"{today}{f' [{shard}]' if shard else ''}: {result.users} user(s) with due reminders, "
+                       f'{result.written} digest(s) written, {result.skipped} already current, '
+                       f'{result.emailed} emailed, {result.cleared} cleared.')
+        if not every:
+            break
+        db.session.remove()
+        time.sleep(every)
+
+
+@click.command('build-assets')
+@click.option('--tailwind', envvar='TAILWINDCSS_BIN', default='tailwindcss', show_default=True,
+              help='Tailwind CLI command (e.g. "npx tailwindcss").')
+@click.option('--fontawesome-dir', type=click.Path(exists=True, file_okay=False),
+              help='Font Awesome Free directory (default: the fontawesomefree package).')
+def build_assets(tailwind, fontawesome_dir):
+    """Build the fingerprinted, precompressed CSS bundles into app/static/dist."""
+    import subprocess
+    from app.assets import OUTPUT_DIR, brotli, build
+
+    try:
+        manifest, missing = build(tailwind, fontawesome_dir)
+    except (RuntimeError, OSError) as e:
+        raise click.ClickException(str(e))
+    except subprocess.CalledProcessError as e:
+        raise click.ClickException(f'Tailwind failed:\n{e.stderr.decode(errors="replace")}')
+    for name, filename in manifest.items():
+        click.echo(f'{name} -> {filename} ({os.path.getsize(os.path.join(OUTPUT_DIR, filename))} bytes)')
+    if missing:
+        click.echo(f"Unknown icons (not in the bundle): {', '.join('fa-' + name for name in missing)}", err=True)
+    if brotli is None:
+        click.echo('brotli is not installed: only .gz variants were written', err=True)
+
+
+@click.command('delete-account')
+@click.option('--user', 'email', required=True, help='Email of the account to delete.')
+@click.option('--batch-size', type=int, help='Applications per transaction (default ACCOUNT_DELETE_BATCH_SIZE).')
+@click.confirmation_option(prompt='Delete the account and all of its data?')
+@with_appcontext
+def delete_account(email, batch_size):
+    """Delete an account and everything it owns, in batches."""
+    from flask import current_app
+    from app import accounts
+    from app.models.user import User
+    from app.shards import select_email
+
+    email = email.strip().lower()
+    user_id = User.query.with_entities(User.id).filter_by(email=email).scalar() if select_email(email) else None
+    if user_id is None:
+        raise click.ClickException(f'No user with email {email}')
+    result = accounts.delete_account(user_id, batch_size or current_app.config['ACCOUNT_DELETE_BATCH_SIZE'])
+    click.echo(f'Deleted {email}: {result.applications} application(s) in {result.batches} batch(es), '
+               f'longest batch {result.longest_batch:.2f}s.')
+
+
+@click.command('replica-sync')
+@click.option('--lag', type=int, help='Keep running, copying every this many seconds (simulated replica lag).')
+@with_appcontext
+def replica_sync(lag):
+    """Copy the primary database over each replica (local testing only)."""
+    import time
+    from flask import current_app
+    from app.replicas import sync
+
+    config = current_app.config
+    if not config['DATABASE_REPLICA_URLS']:
+        raise click.ClickException('No DATABASE_REPLICA_URLS configured')
+    while True:
+        for url in config['DATABASE_REPLICA_URLS']:
+            sync(config['SQLALCHEMY_DATABASE_URI'], url)
+        click.echo(f"{time.strftime('%H:%M:%S')}: copied the primary to "
+                   f"{len(config['DATABASE_REPLICA_URLS'])} replica(s).")
+        if not lag:
+            break
+        time.sleep(lag)
+
+
+@click.command('shards-rebalance')
+@click.option('--wait', type=int, help='Seconds for workers to see directory changes '
+                                       '(default SHARD_DIRECTORY_TTL + 1).')
+@click.option('--limit', type=int, help='Move at most this many users.')
+@click.option('--dry-run', is_flag=True, help='List the moves without making them.')
+@with_appcontext
+def shards_rebalance(wait, limit, dry_run):
+    """Move users to the shard the hash ring assigns them, online (safe to rerun)."""
+    from flask import current_app
+    from app.shards import misplaced, rebalance
+
+    config = current_app.config
+    if not config['DATABASE_SHARD_URLS']:
+        raise click.ClickException('No DATABASE_SHARD_URLS configured')
+    if dry_run:
+        for user_id, source, target in misplaced(limit):
+            click.echo(f'user {user_id}: {source} -> {target}')
+        return
+    wait = config['SHARD_DIRECTORY_TTL'] + 1 if wait is None else wait
+    moved, deleted = rebalance(wait, limit, report=click.echo)
+    click.echo(f'Moved {moved} user(s), deleted {deleted} old cop{"y" if deleted == 1 else "ies"}.')
+
+
+def register_commands(app):
+    app.cli.add_command(db_upgrade)
+    app.cli.add_command(build_assets)
+    app.cli.add_command(reconcile_status_counts)
+    app.cli.add_command(reconcile_analytics)
+    app.cli.add_command(import_applications)
+    app.cli.add_command(seed_data)
+    app.cli.add_command(reminder_digest)
+    app.cli.add_command(delete_account)
+    app.cli.add_command(replica_sync)
+    app.cli.add_command(shards_rebalance)
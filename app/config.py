@@ -9,6 +9,92 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///job_tracker.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Engine/pool profile: sqlite-dev, postgres-small or postgres-burst (see
+    # app/pool.py; default from the URL). The DB_* settings override one value.
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE')
+    DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+    DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+    DB_POOL_TIMEOUT = int(os.environ['DB_POOL_TIMEOUT']) if os.environ.get('DB_POOL_TIMEOUT') else None
+    DB_POOL_RECYCLE = int(os.environ['DB_POOL_RECYCLE']) if os.environ.get('DB_POOL_RECYCLE') else None
+    DB_STATEMENT_TIMEOUT_MS = (int(os.environ['DB_STATEMENT_TIMEOUT_MS'])
+                               if os.environ.get('DB_STATEMENT_TIMEOUT_MS') else None)
+    
+    # Read replicas (comma-separated URLs) and their relative share of GET
+    # reads (comma-separated integers, default 1 each). After a write the
+    # browser reads from the primary for REPLICA_STICKY_SECONDS; see app/replicas.py
+    DATABASE_REPLICA_URLS = [url.strip().replace('postgres://', 'postgresql://', 1)
+                             for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    DATABASE_REPLICA_WEIGHTS = [int(weight) for weight in os.environ.get('DATABASE_REPLICA_WEIGHTS', '').split(',')
+                                if weight.strip()]
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    
+    # User-id sharding: comma-separated shard URLs, new shards appended at the
+    # end. The primary then only keeps the user directory, whose lookups each
+    # worker caches for SHARD_DIRECTORY_TTL seconds; see app/shards.py
+    DATABASE_SHARD_URLS = [url.strip().replace('postgres://', 'postgresql://', 1)
+                           for url in os.environ.get('DATABASE_SHARD_URLS', '').split(',') if url.strip()]
+    SHARD_DIRECTORY_TTL = int(os.environ.get('SHARD_DIRECTORY_TTL', 30))
+    
+    # Applications list pagination
+    APPLICATIONS_PER_PAGE = int(os.environ.get('APPLICATIONS_PER_PAGE', 25))
+    APPLICATIONS_MAX_PER_PAGE = 100
+    
+    # JSON API list page size
+    API_PAGE_SIZE = 50
+    API_MAX_PAGE_SIZE = 200
+    
+    # Rows per INSERT/COPY batch when importing applications
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+    
+    # Applications deleted per transaction when an account is deleted
+    ACCOUNT_DELETE_BATCH_SIZE = int(os.environ.get('ACCOUNT_DELETE_BATCH_SIZE', 1000))
+    
+    # Page size of each reminders bucket (overdue/today/upcoming/completed)
+    REMINDERS_PER_PAGE = int(os.environ.get('REMINDERS_PER_PAGE', 20))
+    
+    # Per-user response cache: 'memory' (per worker), 'sqlite' (shared by
+    # all workers on the host) or 'null' (disabled)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 300))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 2048))
+    # Defaults to cache.db in the app's instance folder; never a shared temp dir
+    CACHE_PATH = os.environ.get('CACHE_PATH')
+    
+    # Per-worker cache of logged-in user snapshots (seconds; 0 disables)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', 10000))
+    
+    # Users whose application typeahead index each worker keeps (0 disables)
+    TYPEAHEAD_MAX_USERS = int(os.environ.get('TYPEAHEAD_MAX_USERS', 1000))
+    
+    # Request metrics at /metrics (Bearer METRICS_TOKEN; without one, debug only); SERVER_TIMING
+    # adds app/db/render timings to every response for the browser devtools
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+    
+    # Cache lifetime of the fingerprinted files under /assets/ (see app.assets)
+    ASSETS_MAX_AGE = int(os.environ.get('ASSETS_MAX_AGE', 365 * 24 * 3600))
+    
+    # N+1 detector: 'raise' (default under TESTING), 'warn' (staging) or 'off'.
+    # Flags a statement shape issued NPLUSONE_THRESHOLD+ times in one request.
+    NPLUSONE_DETECTION = os.environ.get('NPLUSONE_DETECTION')
+    NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD', 5))
+    
+    # Reminder digest worker (`flask reminder-digest`) and its mail backend:
+    # 'null', 'console' or 'smtp' (MAIL_SERVER/MAIL_PORT, see app/mail.py)
+    DIGEST_BATCH_SIZE = int(os.environ.get('DIGEST_BATCH_SIZE', 500))
+    MAIL_BACKEND = os.environ.get('MAIL_BACKEND', 'null')
+    MAIL_SERVER = os.environ.get('MAIL_SERVER', 'localhost')
+    MAIL_PORT = int(os.environ.get('MAIL_PORT', 25))
+    MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
+    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+    MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', '').lower() in ('1', 'true', 'yes')
+    MAIL_FROM = os.environ.get('MAIL_FROM', 'Job Tracker <noreply@localhost>')
+    APP_URL = os.environ.get('APP_URL')
+    
+    # What a worker does when the database is behind the migrations: error, warn or off
+    SCHEMA_CHECK = os.environ.get('SCHEMA_CHECK', 'error')
+    
     # Fix for Railway PostgreSQL URL (postgres:// -> postgresql://)
     if SQLALCHEMY_DATABASE_URI and SQLALCHEMY_DATABASE_URI.startswith('postgres://'):
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace('postgres://', 'postgresql://', 1)
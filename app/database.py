@@ -1,4 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
+from app.replicas import RoutingSession
 
-db = SQLAlchemy()
-
+# Statements go to the user's shard or, for reads in GET requests, a replica
+# when either is configured (app/shards.py, app/replicas.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
@@ -0,0 +1,277 @@
+from datetime import date, datetime
+from itertools import groupby
+from sqlalchemy import case, event, inspect, literal, select, true
+from app.database import db
+from app.mail import make_message
+from app.models.application import Application
+from app.models.reminder import Reminder
+from app.models.reminder_digest import ReminderDigest
+from app.models.user import User
+from app.replicas import primary_reads
+
+# Precomputed reminder digests.
+#
+# The `flask reminder-digest` worker scans every open reminder due today or
+# earlier in one pass over ix_reminders_open_remind_on, in batches of users,
+# and upserts one digest row per user (optionally emailing it). Pages read the
+# row instead of querying reminders. A digest goes stale when the user's
+# reminders change (session hooks below) and is then rebuilt for that one
+# user on the next read. Marks also bump the row's version; a rebuild
+# clears `stale` only if the version it read beforehand is still current,
+# so a change committed mid-rebuild is never stored as fresh.
+#
+# Runs are idempotent: a user whose digest for the date is fresh is not
+# rewritten, and emailed_on records a sent email, so a crashed run is simply
+# started again. At most the one email in flight during a crash is resent.
+
+# Reminders kept per digest (the counts cover all of them)
+DIGEST_ITEMS = 20
+
+digests_table = ReminderDigest.__table__
+users_table = User.__table__
+
+
+def _due_query(today, user_ids=None):
+    stmt = select(
+        Application.user_id, Reminder.id, Reminder.application_id, Reminder.remind_on, Reminder.message,
+        Application.company, Application.role,
+    ).join(Application, Reminder.application_id == Application.id).where(
+        Reminder.completed == False,
+        Reminder.remind_on <= today,
+    )
+    if user_ids is not None:
+        stmt = stmt.where(Application.user_id.in_(user_ids))
+    return stmt.order_by(Application.user_id, Reminder.remind_on, Reminder.id)
+
+
+def build_digest(rows, today):
+    """Digest values from a user's due rows, oldest first."""
+    overdue_count = today_count = 0
+    items = []
+    for row in rows:
+        if row.remind_on < today:
+            overdue_count += 1
+        else:
+            today_count += 1
+        if len(items) < DIGEST_ITEMS:
+            items.append({
+                'id': row.id,
+                'application_id': row.application_id,
+                'company': row.company,
+                'role': row.role,
+                'message': row.message,
+                'remind_on': row.remind_on.isoformat(),
+            })
+    return {'overdue_count': overdue_count, 'today_count': today_count, 'items': items}
+
+
+def _store(connection, user_id, today, digest, version):
+    """Upsert the user's digest; ``version`` is the row's version read before the due rows.
+
+    The digest is only marked fresh if no mark_stale landed since then
+    (``version`` is None when the user had no row yet).
+    """
+    values = dict(digest, digest_date=today, generated_at=datetime.utcnow())
+    fresh = case((digests_table.c.version == version, False), else_=digests_table.c.stale)
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(digests_table).values(**values, user_id=user_id, stale=False, version=0)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[digests_table.c.user_id],
+            set_=dict({k: stmt.excluded[k] for k in values}, stale=fresh),
+        ))
+        return
+
+    result = connection.execute(digests_table.update().where(digests_table.c.user_id == user_id)
+                                .values(**values, stale=fresh))
+    if result.rowcount == 0:
+        connection.execute(digests_table.insert().values(**values, user_id=user_id, stale=False, version=0))
+
+
+def refresh_user(user_id, today):
+    # Stored as fresh, so read from the primary even in a GET
+    with primary_reads(db.session):
+        version = db.session.execute(
+            select(digests_table.c.version).where(digests_table.c.user_id == user_id)
+        ).scalar()
+        rows = db.session.execute(_due_query(today, [user_id])).all()
+    digest = build_digest(rows, today)
+    _store(db.session.connection(), user_id, today, digest, version)
+    db.session.commit()
+    return digest
+
+
+def get_digest(user_id, today=None):
+    """The user's due reminders as ``{overdue_count, today_count, items}``.
+
+    Item ``remind_on`` values are dates and each item carries
+    ``is_overdue``. Missing, stale or previous-day digests are rebuilt here.
+    """
+    today = today or date.today()
+    row = db.session.get(ReminderDigest, user_id)
+    if row is None or row.stale or row.digest_date != today:
+        digest = refresh_user(user_id, today)
+    else:
+        digest = {'overdue_count': row.overdue_count, 'today_count': row.today_count, 'items': row.items}
+
+    items = []
+    for item in digest['items']:
+        remind_on = date.fromisoformat(item['remind_on'])
+        items.append(dict(item, remind_on=remind_on, is_overdue=remind_on < today))
+    return dict(digest, items=items)
+
+
+def digest_email(config, user, digest, today):
+    due = digest['overdue_count'] + digest['today_count']
+    lines = [f"Hi {user['name']},", '', f"You have {due} reminder{'s' if due != 1 else ''} due"
+             f" ({digest['overdue_count']} overdue):", '']
+    for item in digest['items']:
+        when = 'today' if item['remind_on'] == today.isoformat() else f"since {item['remind_on']}"
+        lines.append(f"- {item['message']} ({item['company']}, {item['role']}) - {when}")
+    if due > len(digest['items']):
+        lines.append(f"- ... and {due - len(digest['items'])} more")
+    if config.get('APP_URL'):
+        lines += ['', f"{config['APP_URL'].rstrip('/')}/reminders/"]
+    return make_message(config, user['email'], f'{due} job search reminder(s) due', '\n'.join(lines))
+
+
+class DigestRun:
+    def __init__(self):
+        self.users = 0
+        self.written = 0
+        self.skipped = 0
+        self.emailed = 0
+        self.cleared = 0
+
+
+def _due_user_ids(today, after, limit):
+    return db.session.execute(
+        select(Application.user_id).join(Reminder, Reminder.application_id == Application.id).where(
+            Reminder.completed == False,
+            Reminder.remind_on <= today,
+            Application.user_id > after,
+        ).group_by(Application.user_id).order_by(Application.user_id).limit(limit)
+    ).scalars().all()
+
+
+def run(today, batch_size=500, mailer=None, config=None):
+    """Build (and optionally email) every user's digest for ``today``.
+
+    Users with due reminders are walked in user id order, ``batch_size``
+    at a time: one query for their existing digests, one for the batch's
+    due rows, then one commit.
+    """
+    result = DigestRun()
+    last_user_id = 0
+    while True:
+        user_ids = _due_user_ids(today, last_user_id, batch_size)
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+        existing = {row.user_id: row for row in db.session.execute(
+            select(digests_table.c.user_id, digests_table.c.digest_date, digests_table.c.stale,
+                   digests_table.c.version, digests_table.c.emailed_on).where(digests_table.c.user_id.in_(user_ids))
+        )}
+        rows = db.session.execute(_due_query(today, user_ids))
+        batch = [(user_id, build_digest(user_rows, today))
+                 for user_id, user_rows in groupby(rows, key=lambda row: row.user_id)]
+        _write_batch(batch, existing, today, result, mailer, config)
+
+    # Users not seen have nothing due: empty out older digests (stale ones
+    # are left for get_digest, they may have changed mid-run)
+    cleared = db.session.execute(digests_table.update().where(
+        digests_table.c.digest_date < today,
+        digests_table.c.stale == False,
+    ).values(overdue_count=0, today_count=0, items=[], digest_date=today, generated_at=datetime.utcnow()))
+    result.cleared = cleared.rowcount
+    db.session.commit()
+    return result
+
+
+def _write_batch(batch, existing, today, result, mailer, config):
+    # ``existing`` was read before the batch's due rows (see _store)
+    pending_email = []
+    for user_id, digest in batch:
+        result.users += 1
+        row = existing.get(user_id)
+        if row is not None and row.digest_date == today and not row.stale:
+            result.skipped += 1
+        else:
+            _store(db.session.connection(), user_id, today, digest, row.version if row is not None else None)
+            result.written += 1
+        if mailer is not None and not (row is not None and row.emailed_on == today):
+            pending_email.append((user_id, digest))
+    db.session.commit()
+
+    if not pending_email:
+        return
+    users = {row.id: row._mapping for row in db.session.execute(
+        select(User.id, User.email, User.name).where(User.id.in_([u for u, _ in pending_email]))
+    )}
+    # Commit after every email so a crash resends at most one
+    for user_id, digest in pending_email:
+        mailer.send(digest_email(config, users[user_id], digest, today))
+        db.session.execute(digests_table.update().where(digests_table.c.user_id == user_id)
+                           .values(emailed_on=today))
+        db.session.commit()
+        result.emailed += 1
+
+
+# Mark digests stale when reminders, or the company/role a digest shows for
+# them, change; inside the flush's transaction like app.status_counts
+
+@event.listens_for(db.session, 'after_flush')
+def _mark_stale(session, flush_context):
+    user_ids, application_ids = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Reminder):
+            application_ids.add(obj.application_id)
+        elif isinstance(obj, Application):
+            state = inspect(obj)
+            if obj in session.deleted or state.attrs.company.history.has_changes() \
+                    or state.attrs.role.history.has_changes():
+                user_ids.add(obj.user_id)
+
+    if not (user_ids or application_ids):
+        return
+    connection = session.connection()
+    if application_ids:
+        user_ids.update(connection.execute(
+            select(Application.user_id).where(Application.id.in_(application_ids))
+        ).scalars())
+    mark_stale(connection, user_ids)
+
+
+def mark_stale(connection, user_ids):
+    """Flag the users' digests for rebuilding; for Core writes that bypass the hook.
+
+    Users without a digest get a stale placeholder, so a rebuild that began
+    before this write cannot store its result as fresh either.
+    """
+    if not user_ids:
+        return
+    bump = {'stale': True, 'version': digests_table.c.version + 1}
+    placeholder = select(
+        users_table.c.id, literal(date.today()), literal(0), literal(0), literal([], digests_table.c['items'].type),
+        true(), literal(1), literal(datetime.utcnow()),
+    ).where(users_table.c.id.in_(user_ids))
+    columns = ['user_id', 'digest_date', 'overdue_count', 'today_count', 'items', 'stale', 'version', 'generated_at']
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        connection.execute(insert(digests_table).from_select(columns, placeholder).on_conflict_do_update(
+            index_elements=[digests_table.c.user_id], set_=bump,
+        ))
+        return
+
+    connection.execute(digests_table.update().where(digests_table.c.user_id.in_(user_ids)).values(**bump))
+    connection.execute(digests_table.insert().from_select(columns, placeholder.where(
+        ~users_table.c.id.in_(select(digests_table.c.user_id))
+    )))
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+import zipfile
+from datetime import date, datetime
+from sqlalchemy import select
+from app.database import db
+from app.models.application import Application
+from app.models.document import Document
+from app.models.interview import Interview
+from app.models.reminder import Reminder
+
+# Streaming export of a user's data.
+#
+# Rows are read with Core selects and yield_per (server-side cursors on
+# PostgreSQL), turned into text a row at a time and handed back as a
+# generator, so memory stays flat however large the account is.
+
+YIELD_PER = 1000
+
+TABLES = {
+    'applications': (Application, ('id', 'company', 'role', 'status', 'url', 'location', 'salary_range',
+                                   'date_applied', 'notes', 'created_at', 'updated_at')),
+    'interviews': (Interview, ('id', 'application_id', 'interview_type', 'scheduled_at', 'duration_minutes',
+                               'interviewer', 'location', 'notes', 'outcome', 'feedback',
+                               'created_at', 'updated_at')),
+    'documents': (Document, ('id', 'application_id', 'document_type', 'filename', 'url', 'notes',
+                             'created_at', 'updated_at')),
+    'reminders': (Reminder, ('id', 'application_id', 'remind_on', 'message', 'completed', 'created_at',
+                             'updated_at')),
+}
+
+CHILD_TABLES = ('interviews', 'documents', 'reminders')
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def iter_rows(user_id, table):
+    """Yield a user's rows of ``table`` as mappings, ordered by application."""
+    model, columns = TABLES[table]
+    stmt = select(*(getattr(model, c) for c in columns))
+    if model is Application:
+        stmt = stmt.where(Application.user_id == user_id).order_by(Application.id)
+    else:
+        stmt = stmt.join(Application, model.application_id == Application.id).where(
+            Application.user_id == user_id
+        ).order_by(model.application_id, model.id)
+    result = db.session.execute(stmt, execution_options={'yield_per': YIELD_PER})
+    for row in result.mappings():
+        yield row
+
+
+class _Sink(io.RawIOBase):
+    """Write-only buffer that hands back what was written since last drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _csv_lines(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow([row[c] for c in columns])
+        if i % 500 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_csv(user_id, table):
+    """CSV of one table; children carry ``application_id`` to join on."""
+    for chunk in _csv_lines(iter_rows(user_id, table), TABLES[table][1]):
+        yield chunk.encode()
+
+
+def export_ndjson(user_id):
+    """One JSON object per application with its children nested inside.
+
+    The four tables are streamed in application order and merged, so only
+    one application's children are held in memory at a time.
+    """
+    children = {table: iter_rows(user_id, table) for table in CHILD_TABLES}
+    pending = {table: next(rows, None) for table, rows in children.items()}
+
+    buffer = []
+    for application in iter_rows(user_id, 'applications'):
+        record = dict(application)
+        for table, rows in children.items():
+            record[table] = []
+            while pending[table] is not None and pending[table]['application_id'] == application['id']:
+                record[table].append(dict(pending[table]))
+                pending[table] = next(rows, None)
+        buffer.append(json.dumps(record, default=_json_default))
+        if len(buffer) >= 100:
+            yield ('\n'.join(buffer) + '\n').encode()
+            buffer = []
+    if buffer:
+        yield ('\n'.join(buffer) + '\n').encode()
+
+
+def export_bundle(user_id):
+    """A zip with one CSV per table, written and sent as it is produced."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for table in TABLES:
+            with archive.open(f'{table}.csv', 'w', force_zip64=True) as member:
+                for chunk in export_csv(user_id, table):
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    yield sink.drain()
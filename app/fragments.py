@@ -0,0 +1,23 @@
+from flask import get_template_attribute, request
+
+# Fragment responses for in-place updates.
+#
+# Forms marked `data-fragment="<element id>"` are posted in the background by
+# the script in base.html, with the htmx-style `HX-Request: true` and
+# `HX-Target: <element id>` headers. Views that see them return just the
+# updated partial, rendered from a template macro, and the script swaps it
+# in for that element (an empty body removes it). Without the header the
+# usual flash-and-redirect flow runs, so forms work without JavaScript.
+
+
+def wants_fragment():
+    return request.headers.get('HX-Request') == 'true'
+
+
+def fragment_target():
+    return request.headers.get('HX-Target', '')
+
+
+def render_fragment(template_name, macro_name, *args, **kwargs):
+    """Render one macro of ``template_name`` on its own."""
+    return get_template_attribute(template_name, macro_name)(*args, **kwargs)
@@ -0,0 +1,234 @@
+import codecs
+import csv
+import io
+import json
+from collections import Counter
+from datetime import date, datetime
+from sqlalchemy import func, select
+from app.analytics import record_untracked
+from app.cache import cache
+from app.database import db
+from app.models.application import Application, ApplicationStatus
+from app.shards import assign_ids
+from app.status_counts import apply_deltas
+
+# Bulk import of applications from CSV or NDJSON.
+#
+# Records are streamed one at a time, validated, and written in batches with
+# a single executemany INSERT (or COPY on PostgreSQL/psycopg2). Invalid rows
+# are reported and skipped; they never abort the rest of their batch.
+# Uploads are decoded a line at a time, so bytes that are not UTF-8 or CSV
+# that does not parse spoil only their own rows, never the whole import.
+
+FIELDS = ('company', 'role', 'status', 'url', 'location', 'salary_range', 'date_applied', 'notes')
+MAX_LENGTHS = {'company': 200, 'role': 200, 'status': 50, 'url': 500, 'location': 200, 'salary_range': 100}
+FORMATS = ('csv', 'ndjson')
+
+# Only the first errors are kept in memory; the rest are just counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def detect_format(filename, default='csv'):
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+class _Lines:
+    """Text lines of a binary (or text) stream, each decoded on its own.
+
+    A line that is not valid UTF-8 is decoded with replacement characters
+    and ``undecodable`` is set, for the caller to reject its row.
+    """
+
+    def __init__(self, stream):
+        self._lines = iter(stream)
+        self._first = True
+        self.undecodable = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self._lines)
+        if isinstance(line, str):
+            return line
+        if self._first:
+            self._first = False
+            line = line.removeprefix(codecs.BOM_UTF8)
+        try:
+            return line.decode('utf-8')
+        except UnicodeDecodeError:
+            self.undecodable = True
+            return line.decode('utf-8', errors='replace')
+
+
+def iter_records(stream, fmt):
+    """Yield ``(line_number, record)`` from a binary or text stream, one row at a time.
+
+    Rows that cannot be decoded or parsed are yielded as ``(line, ImportRowError)``.
+    """
+    lines = _Lines(stream)
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        try:
+            reader.fieldnames
+        except csv.Error as e:
+            yield reader.line_num, ImportRowError(f'malformed CSV header: {e}')
+            return
+        if lines.undecodable:
+            yield reader.line_num, ImportRowError('header is not valid UTF-8')
+            return
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                lines.undecodable = False
+                yield reader.line_num, ImportRowError(f'malformed CSV: {e}')
+                continue
+            if lines.undecodable:
+                lines.undecodable = False
+                yield reader.line_num, ImportRowError('not valid UTF-8')
+                continue
+            yield reader.line_num, record
+    elif fmt == 'ndjson':
+        for line_number, line in enumerate(lines, start=1):
+            if lines.undecodable:
+                lines.undecodable = False
+                yield line_number, ImportRowError('not valid UTF-8')
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, ImportRowError(f'invalid JSON: {e}')
+                continue
+            if not isinstance(record, dict):
+                yield line_number, ImportRowError('expected a JSON object')
+                continue
+            yield line_number, record
+    else:
+        raise ValueError(f'Unknown import format {fmt!r}, expected one of {FORMATS}')
+
+
+def validate(record):
+    """Turn a raw record into column values for ``applications``."""
+    values = {}
+    for field in FIELDS:
+        value = record.get(field)
+        if value is None:
+            continue
+        value = str(value).strip()
+        if value:
+            values[field] = value
+
+    if not values.get('company') or not values.get('role'):
+        raise ImportRowError('company and role are required')
+
+    status = values.setdefault('status', ApplicationStatus.SAVED)
+    if status not in ApplicationStatus.all():
+        raise ImportRowError(f'unknown status {status!r}')
+
+    for field, limit in MAX_LENGTHS.items():
+        if len(values.get(field, '')) > limit:
+            raise ImportRowError(f'{field} is longer than {limit} characters')
+
+    if 'date_applied' in values:
+        try:
+            values['date_applied'] = date.fromisoformat(values['date_applied'])
+        except ValueError:
+            raise ImportRowError(f"date_applied {values['date_applied']!r} is not YYYY-MM-DD")
+
+    return values
+
+
+def _copy_rows(connection, rows):
+    """Write a batch with COPY FROM STDIN (PostgreSQL via psycopg2)."""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if row[c] is None else row[c] for c in columns])
+    buffer.seek(0)
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY applications ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _write_batch(user_id, rows):
+    connection = db.session.connection()
+    # The bulk insert returns no ids; history is recorded for those above this
+    last_id = connection.execute(
+        select(func.max(Application.__table__.c.id)).where(Application.__table__.c.user_id == user_id)
+    ).scalar()
+    assign_ids(Application.__table__, rows)
+    if connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2':
+        _copy_rows(connection, rows)
+    else:
+        db.session.execute(Application.__table__.insert(), rows)
+
+    # Core writes bypass the session hooks, so keep the counters in step
+    statuses = Counter(row['status'] for row in rows)
+    apply_deltas(connection, {(user_id, status): n for status, n in statuses.items()})
+    record_untracked(connection, user_id, after_id=last_id)
+    db.session.commit()
+
+
+def import_applications(user_id, records, batch_size=1000):
+    """Insert validated ``(line, record)`` pairs for ``user_id`` in batches."""
+    result = ImportResult()
+    batch = []
+
+    for line, record in records:
+        if isinstance(record, ImportRowError):
+            result.add_error(line, str(record))
+            continue
+        try:
+            values = validate(record)
+        except ImportRowError as e:
+            result.add_error(line, str(e))
+            continue
+
+        now = datetime.utcnow()
+        row = dict.fromkeys(FIELDS)
+        row.update(values, user_id=user_id, created_at=now, updated_at=now)
+        batch.append(row)
+
+        if len(batch) >= batch_size:
+            _write_batch(user_id, batch)
+            result.inserted += len(batch)
+            batch = []
+
+    if batch:
+        _write_batch(user_id, batch)
+        result.inserted += len(batch)
+
+    if result.inserted:
+        cache.bump([user_id])
+    return result
@@ -0,0 +1,64 @@
+import smtplib
+import sys
+from email.message import EmailMessage
+
+# Outgoing mail backends, picked with MAIL_BACKEND. For local testing run a
+# debugging SMTP server (`python -m aiosmtpd -n -l localhost:1025`) and set
+# MAIL_BACKEND=smtp MAIL_PORT=1025.
+
+
+class NullMailer:
+    def send(self, message):
+        pass
+
+
+class ConsoleMailer:
+    """Writes messages to stdout instead of sending them."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, message):
+        self.stream.write(message.as_string() + '\n' + '-' * 72 + '\n')
+
+
+class SMTPMailer:
+    def __init__(self, host, port, username=None, password=None, use_tls=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send(self, message):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or '')
+            smtp.send_message(message)
+
+
+MAILERS = {
+    'null': lambda config: NullMailer(),
+    'console': lambda config: ConsoleMailer(),
+    'smtp': lambda config: SMTPMailer(config['MAIL_SERVER'], config['MAIL_PORT'], config['MAIL_USERNAME'],
+                                      config['MAIL_PASSWORD'], config['MAIL_USE_TLS']),
+}
+
+
+def get_mailer(config):
+    name = config['MAIL_BACKEND']
+    if name not in MAILERS:
+        raise ValueError(f'Unknown MAIL_BACKEND {name!r}, expected one of {sorted(MAILERS)}')
+    return MAILERS[name](config)
+
+
+def make_message(config, to, subject, body):
+    message = EmailMessage()
+    message['From'] = config['MAIL_FROM']
+    message['To'] = to
+    message['Subject'] = subject
+    message.set_content(body)
+    return message
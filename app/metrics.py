@@ -0,0 +1,229 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, abort, current_app, g, has_request_context, request, template_rendered, \
+    before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.database import db
+from app.statements import on_statement, statement_count
+
+# Per-request instrumentation exported in the Prometheus text format.
+#
+# Every request records wall time, SQL statement count, SQL time and
+# template render time, labelled by endpoint name (never the raw path, so
+# label cardinality stays bounded). Histograms live in the worker process:
+# each scrape of /metrics reports the worker that answered it.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(self._values.items()):
+            yield f'{self.name}{_labels(self.labels, labels)} {value}'
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        # labels -> [count per bucket (+Inf last), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = (('le', bound if bound == '+Inf' else repr(float(bound))),)
+                yield f'{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labels, labels)} {total}'
+            yield f'{self.name}_count{_labels(self.labels, labels)} {cumulative}'
+
+
+REQUESTS = Counter('http_requests_total', 'Requests handled, by endpoint, method and status.',
+                   ('endpoint', 'method', 'status'))
+REQUEST_DURATION = Histogram('http_request_duration_seconds',
+                             'Time until the response is returned (streamed bodies excluded).',
+                             LATENCY_BUCKETS, ('endpoint', 'method'))
+SQL_QUERIES = Histogram('http_request_sql_queries', 'SQL statements issued per request.',
+                        QUERY_BUCKETS, ('endpoint',))
+SQL_DURATION = Histogram('http_request_sql_duration_seconds', 'Total SQL execution time per request.',
+                         LATENCY_BUCKETS, ('endpoint',))
+TEMPLATE_DURATION = Histogram('http_request_template_duration_seconds', 'Total template render time per request.',
+                              LATENCY_BUCKETS, ('endpoint',))
+
+METRICS = (REQUESTS, REQUEST_DURATION, SQL_QUERIES, SQL_DURATION, TEMPLATE_DURATION)
+
+
+# SQL timing: counted on whichever request is active on this thread. The
+# start is kept on the statement's execution context, which is dropped
+# with it when the statement fails and after_cursor_execute never fires
+
+@on_statement
+def _sql_started(conn, context, statement, executemany):
+    if context is not None and 'metrics_start' in g:
+        context.metrics_sql_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'metrics_sql_start', None)
+    if started is not None and has_request_context() and 'metrics_start' in g:
+        g.metrics_sql_time += time.perf_counter() - started
+
+
+def _render_started(sender, template, context, **extra):
+    if 'metrics_start' in g:
+        g.metrics_render_start = time.perf_counter()
+
+
+def _render_finished(sender, template, context, **extra):
+    start = g.pop('metrics_render_start', None)
+    if start is not None:
+        g.metrics_template_time += time.perf_counter() - start
+
+
+def _pool_lines():
+    from app.pool import WAIT_BUCKETS, pool_status
+
+    status = pool_status(db.engine)
+    if 'checked_out' in status:
+        for name, key, help in (
+            ('db_pool_size', 'size', 'Configured pool size.'),
+            ('db_pool_checked_out', 'checked_out', 'Connections currently checked out.'),
+            ('db_pool_overflow', 'overflow', 'Overflow connections currently open.'),
+        ):
+            yield f'# HELP {name} {help}'
+            yield f'# TYPE {name} gauge'
+            yield f'{name} {status[key]}'
+    stats = getattr(db.engine.pool, 'stats', None)
+    if stats is None:
+        return
+    for name, value, help in (
+        ('db_pool_checkouts_total', stats.checkouts, 'Connection checkouts.'),
+        ('db_pool_timeouts_total', stats.timeouts, 'Checkouts that timed out waiting for a connection.'),
+        ('db_pool_connects_total', stats.connects, 'New DBAPI connections opened.'),
+        ('db_pool_invalidations_total', stats.invalidations, 'Connections dropped as stale or broken.'),
+    ):
+        yield f'# HELP {name} {help}'
+        yield f'# TYPE {name} counter'
+        yield f'{name} {value}'
+    yield '# HELP db_pool_checkout_wait_seconds Time to obtain a connection from the pool.'
+    yield '# TYPE db_pool_checkout_wait_seconds histogram'
+    cumulative = 0
+    for bound, count in zip(WAIT_BUCKETS, stats.wait_buckets):
+        cumulative += count
+        le = '+Inf' if bound == float('inf') else repr(bound)
+        yield f'db_pool_checkout_wait_seconds_bucket{{le="{le}"}} {cumulative}'
+    yield f'db_pool_checkout_wait_seconds_sum {stats.wait_total}'
+    yield f'db_pool_checkout_wait_seconds_count {cumulative}'
+
+
+def render():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(_pool_lines())
+    return '\n'.join(lines) + '\n'
+
+
+def require_token():
+    """Abort with 401 unless the request carries ``Bearer METRICS_TOKEN``.
+
+    Without a token the endpoints are only served in debug and testing;
+    anywhere else they 404 rather than expose metrics publicly.
+    """
+    token = current_app.config['METRICS_TOKEN']
+    if not token:
+        if not (current_app.debug or current_app.testing):
+            abort(404)
+        return
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        abort(401)
+
+
+def init_app(app):
+    template_rendered.connect(_render_finished, app)
+    before_render_template.connect(_render_started, app)
+
+    @app.before_request
+    def _start_request():
+        g.metrics_start = time.perf_counter()
+        g.metrics_sql_base = statement_count()
+        g.metrics_sql_time = 0.0
+        g.metrics_template_time = 0.0
+
+    @app.after_request
+    def _finish_request(response):
+        g.metrics_status = response.status_code
+        if current_app.config['SERVER_TIMING'] and 'metrics_start' in g:
+            elapsed = time.perf_counter() - g.metrics_start
+            response.headers['Server-Timing'] = ', '.join((
+                f'app;dur={elapsed * 1000:.1f}',
+                f'db;dur={g.metrics_sql_time * 1000:.1f};desc="{statement_count() - g.metrics_sql_base} queries"',
+                f'render;dur={g.metrics_template_time * 1000:.1f}',
+            ))
+        return response
+
+    # Teardown also runs for unhandled exceptions, which never reach after_request
+    @app.teardown_request
+    def _record_request(exc):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        endpoint = request.endpoint or 'unmatched'
+        status = g.pop('metrics_status', 500)
+        REQUESTS.inc((endpoint, request.method, str(status)))
+        REQUEST_DURATION.observe((endpoint, request.method), elapsed)
+        SQL_QUERIES.observe((endpoint,), statement_count() - g.metrics_sql_base)
+        SQL_DURATION.observe((endpoint,), g.metrics_sql_time)
+        TEMPLATE_DURATION.observe((endpoint,), g.metrics_template_time)
+
+    @app.route('/metrics')
+    def metrics():
+        require_token()
+        return Response(render(), mimetype='text/plain; version=0.0.4')
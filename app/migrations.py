@@ -0,0 +1,156 @@
+import ast
+import os
+import time
+from functools import lru_cache
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from app.database import db
+from app.shards import shard_binds
+
+# Schema changes ship as Alembic revisions and are applied once per release
+# (`flask db-upgrade`). Workers never create or reflect tables at boot; on
+# their first request they compare alembic_version with the bundled head
+# (again every SCHEMA_RECHECK_SECONDS while it differs, so a worker that
+# booted before the upgrade finished recovers on its own), so CLI
+# commands (the upgrade itself included) are never blocked.
+# That check reads the revision files and alembic_version directly rather
+# than importing Alembic, which would double a worker's first request.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds before a failed schema check is repeated
+SCHEMA_RECHECK_SECONDS = 5
+
+# (mismatch message or None, monotonic time checked) per database URL, for this process
+_checked = {}
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def alembic_config(url=None):
+    from alembic.config import Config as AlembicConfig
+
+    config = AlembicConfig(os.path.join(ROOT, 'alembic.ini'))
+    config.set_main_option('script_location', os.path.join(ROOT, 'alembic'))
+    if url:
+        # ConfigParser interpolation: escape '%' in passwords
+        config.set_main_option('sqlalchemy.url', url.replace('%', '%%'))
+    return config
+
+
+# The first revision: the schema db.create_all() built before migrations
+BASELINE_REVISION = '0001'
+
+
+def adopt(url):
+    """Stamp a database built by db.create_all() as BASELINE_REVISION.
+
+    Such databases have no alembic_version, so 0001 would fail on "table
+    users already exists". Depending on the release that built them they
+    may also have objects from 0002-0006, which those revisions skip when
+    present. Returns whether the
+    database was stamped; empty and already-migrated databases are left
+    alone.
+    """
+    from alembic import command
+    from sqlalchemy import create_engine, inspect
+
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            tables = set(inspect(connection).get_table_names())
+    finally:
+        engine.dispose()
+    if 'alembic_version' in tables or 'users' not in tables:
+        return False
+    command.stamp(alembic_config(url), BASELINE_REVISION)
+    return True
+
+
+def upgrade(url, revision='head'):
+    """Migrate ``url`` to ``revision``, adopting a create_all() database first."""
+    from alembic import command
+
+    adopted = adopt(url)
+    command.upgrade(alembic_config(url), revision)
+    return adopted
+
+
+def _revision_ids(value):
+    if value is None:
+        return ()
+    return (value,) if isinstance(value, str) else tuple(value)
+
+
+@lru_cache(maxsize=None)
+def head_revisions():
+    """Revisions in alembic/versions that no other revision builds on."""
+    revisions, parents = set(), set()
+    versions = os.path.join(ROOT, 'alembic', 'versions')
+    for filename in os.listdir(versions):
+        if not filename.endswith('.py'):
+            continue
+        with open(os.path.join(versions, filename), encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename)
+        for node in tree.body:
+            if isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                names = {t.id for t in targets if isinstance(t, ast.Name)}
+                if 'revision' in names:
+                    revisions.add(ast.literal_eval(node.value))
+                elif 'down_revision' in names:
+                    parents.update(_revision_ids(ast.literal_eval(node.value)))
+    return frozenset(revisions - parents)
+
+
+def current_revisions(connection):
+    try:
+        rows = connection.execute(text('SELECT version_num FROM alembic_version')).scalars()
+        return frozenset(rows)
+    except DBAPIError:
+        # Never migrated
+        return frozenset()
+
+
+def check_schema(app):
+    """Compare the database revision with the code's.
+
+    A match is remembered for the life of the process, a mismatch for
+    SCHEMA_RECHECK_SECONDS.
+
+    SCHEMA_CHECK decides what happens on a mismatch: 'error' fails every
+    request (so health checks keep a stale release out), 'warn' logs once
+    and carries on, 'off' skips the check entirely.
+    """
+    mode = app.config['SCHEMA_CHECK']
+    if mode == 'off':
+        return
+
+    # The primary and every shard (see app.shards); replicas follow the primary
+    databases = {app.config['SQLALCHEMY_DATABASE_URI']: None}
+    databases.update({url: key for key, url in shard_binds(app.config).items()})
+    for url, bind_key in databases.items():
+        previous, checked_at = _checked.get(url, (False, None))
+        message = previous
+        if previous is False or (previous and time.monotonic() - checked_at >= SCHEMA_RECHECK_SECONDS):
+            with db.engines[bind_key].connect() as connection:
+                current = current_revisions(connection)
+            heads = head_revisions()
+            message = None
+            if current != heads:
+                message = (f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+                           f"code expects {', '.join(sorted(heads))}; run `flask db-upgrade`")
+                if message != previous:
+                    app.logger.warning(message)
+            _checked[url] = (message, time.monotonic())
+
+        if message and mode == 'error':
+            raise SchemaOutOfDate(message)
+
+
+def init_app(app):
+    @app.before_request
+    def _check_schema():
+        check_schema(app)
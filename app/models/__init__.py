@@ -3,6 +3,15 @@ from app.models.application import Application
 from app.models.interview import Interview
 from app.models.document import Document
 from app.models.reminder import Reminder
+from app.models.user_status_count import UserStatusCount
+from app.models.reminder_digest import ReminderDigest
+from app.models.user_directory import UserDirectoryEntry
+from app.models.id_allocation import IdAllocation
+from app.models.application_status_event import ApplicationStatusEvent
+from app.models.status_funnel_count import StatusFunnelCount
+from app.models.status_duration_bucket import StatusDurationBucket
 
-__all__ = ['User', 'Application', 'Interview', 'Document', 'Reminder']
+__all__ = ['User', 'Application', 'Interview', 'Document', 'Reminder', 'UserStatusCount', 'ReminderDigest',
+           'UserDirectoryEntry', 'IdAllocation', 'ApplicationStatusEvent', 'StatusFunnelCount',
+           'StatusDurationBucket']
 
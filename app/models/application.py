@@ -33,9 +33,13 @@ class ApplicationStatus:
 
 class Application(db.Model):
     __tablename__ = 'applications'
+    __table_args__ = (
+        # Backs keyset pagination of the applications list
+        db.Index('ix_applications_user_updated_id', 'user_id', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     company = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(200), nullable=False)
     status = db.Column(db.String(50), default=ApplicationStatus.SAVED, index=True)
@@ -47,10 +51,18 @@ class Application(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    interviews = db.relationship('Interview', backref='application', lazy='dynamic', cascade='all, delete-orphan')
-    documents = db.relationship('Document', backref='application', lazy='dynamic', cascade='all, delete-orphan')
-    reminders = db.relationship('Reminder', backref='application', lazy='dynamic', cascade='all, delete-orphan')
+    # Relationships (plain collections so views can selectinload them).
+    # passive_deletes: deleting an application leaves unloaded children to
+    # the foreign keys' ON DELETE CASCADE instead of loading each one
+    interviews = db.relationship('Interview', backref='application', cascade='all, delete-orphan',
+                                 passive_deletes=True, order_by='Interview.scheduled_at')
+    documents = db.relationship('Document', backref='application', cascade='all, delete-orphan',
+                                passive_deletes=True, order_by='Document.id')
+    reminders = db.relationship('Reminder', backref='application', cascade='all, delete-orphan',
+                                passive_deletes=True, order_by='Reminder.remind_on')
+    open_reminders = db.relationship('Reminder', viewonly=True, order_by='Reminder.remind_on',
+                                     primaryjoin='and_(Application.id == Reminder.application_id, '
+                                                 'Reminder.completed == False)')
     
     @property
     def status_display(self):
@@ -0,0 +1,26 @@
+from datetime import datetime
+from app.database import db
+
+
+class ApplicationStatusEvent(db.Model):
+    """One status transition of an application; rows are only ever appended.
+
+    ``from_status`` is None for the status an application was created
+    with. Written by ``app.analytics``, which also keeps the rollups built
+    from these rows.
+    """
+    __tablename__ = 'application_status_events'
+    __table_args__ = (
+        # An application's history in order, for the rollups
+        db.Index('ix_application_status_events_application_id', 'application_id', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    from_status = db.Column(db.String(50))
+    to_status = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ApplicationStatusEvent {self.application_id} {self.from_status}->{self.to_status}>'
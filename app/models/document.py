@@ -22,12 +22,13 @@ class Document(db.Model):
     __tablename__ = 'documents'
     
     id = db.Column(db.Integer, primary_key=True)
-    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False, index=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id', ondelete='CASCADE'), nullable=False, index=True)
     document_type = db.Column(db.String(50), default=DocumentType.OTHER)
     filename = db.Column(db.String(255), nullable=False)
     url = db.Column(db.String(500))  # External link (Google Drive, Dropbox, etc.)
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     @property
     def type_display(self):
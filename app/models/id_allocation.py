@@ -0,0 +1,17 @@
+from app.database import db
+
+
+class IdAllocation(db.Model):
+    """Next free id of each table of user data, when sharding.
+
+    Lives in the primary database and is read and written there through
+    ``app.shards`` only, like the user directory. Rows get their ids here
+    so that ids are unique across shards and survive a move.
+    """
+    __tablename__ = 'id_allocations'
+    
+    table_name = db.Column(db.String(64), primary_key=True)
+    next_id = db.Column(db.BigInteger, nullable=False)
+    
+    def __repr__(self):
+        return f'<IdAllocation {self.table_name} {self.next_id}>'
@@ -44,7 +44,7 @@ class Interview(db.Model):
     __tablename__ = 'interviews'
     
     id = db.Column(db.Integer, primary_key=True)
-    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False, index=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id', ondelete='CASCADE'), nullable=False, index=True)
     interview_type = db.Column(db.String(50), default=InterviewType.OTHER)
     scheduled_at = db.Column(db.DateTime, nullable=False)
     duration_minutes = db.Column(db.Integer, default=60)
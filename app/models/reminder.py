@@ -4,13 +4,21 @@ from app.database import db
 
 class Reminder(db.Model):
     __tablename__ = 'reminders'
+    __table_args__ = (
+        # Backs the per-bucket reminder queries (open/completed by date)
+        db.Index('ix_reminders_application_completed_remind_on', 'application_id', 'completed', 'remind_on'),
+        # Open reminders by date, for the digest worker's due scan
+        db.Index('ix_reminders_open_remind_on', 'remind_on', 'application_id',
+                 postgresql_where=db.text('completed = false'), sqlite_where=db.text('completed = 0')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False, index=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id', ondelete='CASCADE'), nullable=False, index=True)
     remind_on = db.Column(db.Date, nullable=False, index=True)
     message = db.Column(db.String(500), nullable=False)
     completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     @property
     def is_due(self):
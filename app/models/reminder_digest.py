@@ -0,0 +1,30 @@
+from app.database import db
+
+
+class ReminderDigest(db.Model):
+    """A user's due reminders (overdue and today), precomputed.
+
+    Written by the ``reminder-digest`` worker and on demand by
+    ``app.digest.get_digest``; marked stale by the session hooks in
+    ``app.digest`` whenever the user's reminders change. Each mark bumps
+    ``version``, so a rebuild only clears ``stale`` if no mark arrived
+    while it was reading.
+    """
+    __tablename__ = 'reminder_digests'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    digest_date = db.Column(db.Date, nullable=False)
+    overdue_count = db.Column(db.Integer, nullable=False, default=0)
+    today_count = db.Column(db.Integer, nullable=False, default=0)
+    items = db.Column(db.JSON, nullable=False, default=list)
+    stale = db.Column(db.Boolean, nullable=False, default=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    generated_at = db.Column(db.DateTime, nullable=False)
+    emailed_on = db.Column(db.Date)
+    
+    @property
+    def due_count(self):
+        return self.overdue_count + self.today_count
+    
+    def __repr__(self):
+        return f'<ReminderDigest {self.user_id} {self.digest_date} due={self.due_count}>'
@@ -0,0 +1,20 @@
+from app.database import db
+
+
+class StatusDurationBucket(db.Model):
+    """Histogram of how long a user's applications stayed in a status.
+
+    ``bucket`` indexes ``app.analytics.DURATION_BUCKETS``; ``count`` stays
+    that long and ``total_seconds`` their summed length. Maintained by
+    ``app.analytics`` from the status events.
+    """
+    __tablename__ = 'status_duration_buckets'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total_seconds = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<StatusDurationBucket {self.user_id} {self.status}[{self.bucket}]={self.count}>'
@@ -0,0 +1,16 @@
+from app.database import db
+
+
+class StatusFunnelCount(db.Model):
+    """How many of a user's applications got at least as far as a funnel stage.
+
+    Maintained by ``app.analytics`` from the status events.
+    """
+    __tablename__ = 'status_funnel_counts'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    reached = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<StatusFunnelCount {self.user_id} {self.status}={self.reached}>'
@@ -12,9 +12,12 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(256), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Secret part of the interview calendar feed URL (see app.calendar)
+    calendar_token = db.Column(db.String(64), unique=True, index=True)
     
-    # Relationships
-    applications = db.relationship('Application', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    # Relationships (deletes cascade in the database, see app.accounts)
+    applications = db.relationship('Application', backref='user', lazy='dynamic', cascade='all, delete-orphan',
+                                   passive_deletes=True)
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
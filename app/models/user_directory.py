@@ -0,0 +1,22 @@
+from app.database import db
+
+
+class UserDirectoryEntry(db.Model):
+    """Which shard holds each user, by id and email.
+
+    Lives in the primary database and is read and written there through
+    ``app.shards`` only, never through the session. Ids are allocated here
+    so that user ids are unique across shards.
+    """
+    __tablename__ = 'user_directory'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    shard = db.Column(db.String(32), nullable=False)
+    # Writes are refused while the user's rows are being copied to another shard
+    moving = db.Column(db.Boolean, nullable=False, default=False)
+    # Shard still holding the old copy after a move, until it is deleted
+    moved_from = db.Column(db.String(32))
+    
+    def __repr__(self):
+        return f'<UserDirectoryEntry {self.id} {self.shard}>'
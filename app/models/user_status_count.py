@@ -0,0 +1,17 @@
+from app.database import db
+
+
+class UserStatusCount(db.Model):
+    """Running count of a user's applications per status.
+
+    Maintained by the session hooks in ``app.status_counts`` so the
+    dashboard never has to aggregate the applications table.
+    """
+    __tablename__ = 'user_status_counts'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<UserStatusCount {self.user_id} {self.status}={self.count}>'
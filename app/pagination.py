@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import date, datetime
+from app.database import db
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(sort_value, id):
+    payload = json.dumps([_dump(sort_value), id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _load(sort_value), int(id)
+    except (ValueError, TypeError, KeyError, json.JSONDecodeError):
+        raise InvalidCursor(cursor)
+
+
+class KeysetPage:
+    """One page of a query ordered by (sort_column, id).
+
+    Cursors encode the sort key of the boundary row rather than an offset,
+    so rows inserted or edited while the user is paging never shift the
+    window or cause rows to be skipped/duplicated.
+    """
+
+    def __init__(self, items, has_next, has_prev, key):
+        self.items = items
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = encode_cursor(*key(items[-1])) if has_next and items else None
+        self.prev_cursor = encode_cursor(*key(items[0])) if has_prev and items else None
+
+
+def keyset_paginate(query, sort_column, id_column, per_page, after=None, before=None, key=None,
+                    descending=True):
+    """Paginate ``query`` over ``(sort_column, id_column)``.
+
+    Rows come highest first unless ``descending`` is False. Pass ``after``
+    to fetch the page following a cursor, or ``before`` to fetch the page
+    preceding it. One extra row is fetched to tell whether another page
+    exists in the direction of travel. ``key`` maps a result row to its
+    ``(sort_value, id)`` pair and defaults to reading the ORM attributes
+    named after the two columns.
+    """
+    if key is None:
+        key = lambda row: (getattr(row, sort_column.key), getattr(row, id_column.key))
+
+    def beyond(cursor, forward):
+        value, cursor_id = decode_cursor(cursor)
+        if forward == descending:
+            return db.or_(sort_column < value, db.and_(sort_column == value, id_column < cursor_id))
+        return db.or_(sort_column > value, db.and_(sort_column == value, id_column > cursor_id))
+
+    def ordering(forward):
+        if forward == descending:
+            return sort_column.desc(), id_column.desc()
+        return sort_column.asc(), id_column.asc()
+
+    if before:
+        rows = query.filter(beyond(before, forward=False)).order_by(
+            *ordering(forward=False)).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        return KeysetPage(items, has_next=True, has_prev=has_prev, key=key)
+
+    if after:
+        query = query.filter(beyond(after, forward=True))
+
+    rows = query.order_by(*ordering(forward=True)).limit(per_page + 1).all()
+    return KeysetPage(rows[:per_page], has_next=len(rows) > per_page, has_prev=bool(after), key=key)
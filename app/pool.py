@@ -0,0 +1,223 @@
+import os
+import threading
+import time
+from sqlalchemy import event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+from app.database import db
+from app.metrics import require_token
+
+# Engine/pool profiles, picked with DB_ENGINE_PROFILE (default: from the URL).
+#
+# Sizes are per worker process: with N gunicorn workers the database sees
+# up to N * (pool_size + max_overflow) connections, so keep that under its
+# max_connections. statement_timeout_ms is enforced server side.
+ENGINE_PROFILES = {
+    'sqlite-dev': {
+        'busy_timeout': 15,
+    },
+    'postgres-small': {
+        'pool_size': 5,
+        'max_overflow': 2,
+        'pool_timeout': 10,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+        'statement_timeout_ms': 30000,
+        'connect_timeout': 5,
+    },
+    'postgres-burst': {
+        'pool_size': 8,
+        'max_overflow': 12,
+        'pool_timeout': 5,
+        'pool_recycle': 900,
+        'pool_pre_ping': True,
+        'statement_timeout_ms': 15000,
+        'connect_timeout': 5,
+    },
+}
+
+# Config keys that override single profile settings
+OVERRIDES = {
+    'DB_POOL_SIZE': 'pool_size',
+    'DB_MAX_OVERFLOW': 'max_overflow',
+    'DB_POOL_TIMEOUT': 'pool_timeout',
+    'DB_POOL_RECYCLE': 'pool_recycle',
+    'DB_STATEMENT_TIMEOUT_MS': 'statement_timeout_ms',
+}
+
+# Upper bounds (seconds) of the checkout wait histogram
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))
+
+
+def default_profile(uri):
+    return 'sqlite-dev' if make_url(uri).get_backend_name() == 'sqlite' else 'postgres-small'
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured profile and overrides."""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    name = config.get('DB_ENGINE_PROFILE') or default_profile(uri)
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f'Unknown DB_ENGINE_PROFILE {name!r}, expected one of {sorted(ENGINE_PROFILES)}')
+
+    profile = dict(ENGINE_PROFILES[name])
+    for key, setting in OVERRIDES.items():
+        if config.get(key) is not None:
+            profile[setting] = config[key]
+
+    options = {}
+    connect_args = {}
+    backend = make_url(uri).get_backend_name()
+    if backend != 'sqlite':
+        # SQLite keeps SQLAlchemy's own pool choice (a single connection
+        # for in-memory databases); sizing only means something for servers
+        options['poolclass'] = InstrumentedQueuePool
+        for setting in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping'):
+            if setting in profile:
+                options[setting] = profile[setting]
+
+    if backend == 'postgresql':
+        server_settings = []
+        if profile.get('statement_timeout_ms'):
+            server_settings.append(f"-c statement_timeout={profile['statement_timeout_ms']}")
+            # A transaction left open by a crashed request must not hold locks forever
+            server_settings.append(f"-c idle_in_transaction_session_timeout={profile['statement_timeout_ms'] * 4}")
+        if server_settings:
+            connect_args['options'] = ' '.join(server_settings)
+        if profile.get('connect_timeout'):
+            connect_args['connect_timeout'] = profile['connect_timeout']
+    elif backend == 'sqlite' and profile.get('busy_timeout'):
+        # SQLite has no statement timeout; this bounds waits on a locked file
+        connect_args['timeout'] = profile['busy_timeout']
+
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+class PoolStats:
+    """Checkout counters for one pool, shared by the pools it is recreated as."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self.checked_out_max = 0
+
+    def record_checkout(self, waited, checked_out):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.checked_out_max = max(self.checked_out_max, checked_out)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if waited <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+
+    def record_timeout(self, waited):
+        with self._lock:
+            self.timeouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout, including waits for a free slot."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeout:
+            self.stats.record_timeout(time.perf_counter() - start)
+            raise
+        self.stats.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+    def recreate(self):
+        # dispose() and invalidation swap the pool; keep counting across them
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def pool_status(engine):
+    """Point-in-time view of ``engine``'s pool for this worker process."""
+    pool = engine.pool
+    status = {'pid': os.getpid(), 'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update(
+            checkouts=stats.checkouts,
+            timeouts=stats.timeouts,
+            connects=stats.connects,
+            invalidations=stats.invalidations,
+            checked_out_max=stats.checked_out_max,
+            wait_ms_avg=round(stats.wait_total / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+            wait_ms_max=round(stats.wait_max * 1000, 3),
+            wait_buckets={('+Inf' if bound == float('inf') else str(bound)): n
+                          for bound, n in zip(WAIT_BUCKETS, stats.wait_buckets)},
+        )
+    return status
+
+
+def _count(engine, counter):
+    stats = getattr(engine.pool, 'stats', None)
+    if stats is not None:
+        stats.count(counter)
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, record):
+    # Off by default in SQLite; ON DELETE CASCADE relies on it
+    dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+
+def _instrument(engine):
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _enable_sqlite_foreign_keys)
+
+    # New DBAPI connections, and connections dropped as stale/broken (pre-ping)
+    event.listen(engine, 'connect', lambda dbapi_connection, record: _count(engine, 'connects'))
+    event.listen(engine, 'invalidate', lambda dbapi_connection, record, exc: _count(engine, 'invalidations'))
+
+
+def init_app(app):
+    with app.app_context():
+        engines = dict(db.engines)
+
+    # The primary and every replica bind
+    for engine in engines.values():
+        _instrument(engine)
+
+    @app.route('/health/pool')
+    def pool_health():
+        # Pool internals, so behind the same token as /metrics
+        require_token()
+        status = pool_status(db.engine)
+        replicas = {key: pool_status(engine) for key, engine in db.engines.items() if key is not None}
+        if replicas:
+            status['replicas'] = replicas
+        return status
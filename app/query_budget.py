@@ -0,0 +1,32 @@
+from functools import wraps
+from flask import current_app
+from app.statements import statement_count
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    """Assert that a view issues at most ``limit`` SQL statements.
+
+    Statements issued before the view runs (e.g. Flask-Login's user loader)
+    are not counted. Exceeding the budget raises ``QueryBudgetExceeded``
+    when QUERY_BUDGET_RAISE is set (the default under TESTING) and logs a
+    warning otherwise.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            start = statement_count()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                count = statement_count() - start
+                if count > limit:
+                    message = f'{view.__name__} issued {count} SQL statements (budget {limit})'
+                    if current_app.config.get('QUERY_BUDGET_RAISE', current_app.testing):
+                        raise QueryBudgetExceeded(message)
+                    current_app.logger.warning(message)
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+import os
+import re
+import sys
+from functools import wraps
+from flask import current_app, g
+from app.statements import on_statement
+
+# Detects N+1 patterns: the same statement shape issued over and over in
+# one request, typically a lazy load inside a template loop.
+#
+# Statements are fingerprinted (parameters are already placeholders;
+# whitespace, literals and expanded IN lists are folded) and counted per
+# request. When a shape reaches the threshold the call site is captured:
+# the template line when the query came from a template, otherwise the
+# innermost line of application code. Cost per statement is one regex pass
+# and a dict update, and nothing at all when detection is off.
+
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Instrumentation modules are never the culprit
+IGNORED_FILES = {os.path.join(APP_ROOT, name) for name in ('query_patterns.py', 'query_budget.py', 'metrics.py',
+                                                            'statements.py')}
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'\(\s*(?:\?|%\([^)]*\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\([^)]*\)s|%s|:\w+))*\s*\)')
+_SPACE = re.compile(r'\s+')
+_COLUMNS = re.compile(r'^SELECT .+? FROM ')
+
+
+class RepeatedQueriesDetected(AssertionError):
+    pass
+
+
+def fingerprint(statement):
+    statement = _LITERALS.sub('?', statement)
+    statement = _IN_LIST.sub('(?)', statement)
+    return _SPACE.sub(' ', statement).strip()
+
+
+def call_site():
+    """``file:line`` of the template or app code that issued the statement."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        template = frame.f_globals.get('__jinja_template__')
+        if template is not None:
+            name = template.name or '<template>'
+            return f'templates/{name}:{template.get_corresponding_lineno(frame.f_lineno)}'
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_ROOT) and filename not in IGNORED_FILES:
+            return f'{os.path.relpath(filename, APP_ROOT)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+@on_statement
+def _count_shape(conn, context, statement, executemany):
+    # executemany is already one round trip per batch
+    if executemany or 'query_patterns' not in g:
+        return
+    shape = fingerprint(statement)
+    seen = g.query_patterns
+    entry = seen.get(shape)
+    if entry is None:
+        seen[shape] = [1, None]
+        return
+    entry[0] += 1
+    if entry[0] == current_app.config['NPLUSONE_THRESHOLD']:
+        entry[1] = call_site()
+
+
+def report(patterns, threshold):
+    """Lines describing every shape issued at least ``threshold`` times."""
+    return [
+        f"{count}x from {site}: {_COLUMNS.sub('SELECT ... FROM ', shape)[:300]}"
+        for shape, (count, site) in sorted(patterns.items(), key=lambda item: -item[1][0])
+        if count >= threshold
+    ]
+
+
+def repeated_queries_allowed(view):
+    """Exempt a view that repeats a statement by design (e.g. batched writes)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.pop('query_patterns', None)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_app(app):
+    mode = app.config.get('NPLUSONE_DETECTION') or ('raise' if app.testing else 'off')
+    if mode == 'off':
+        return
+
+    @app.before_request
+    def _start_counting():
+        g.query_patterns = {}
+
+    @app.after_request
+    def _check_patterns(response):
+        patterns = g.pop('query_patterns', None)
+        if patterns:
+            lines = report(patterns, app.config['NPLUSONE_THRESHOLD'])
+            if lines:
+                message = 'Repeated queries in one request (likely N+1):\n  ' + '\n  '.join(lines)
+                if mode == 'raise':
+                    raise RepeatedQueriesDetected(message)
+                app.logger.warning(message)
+        return response
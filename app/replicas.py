@@ -0,0 +1,194 @@
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from flask import current_app, has_request_context, request, session as cookie_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import make_url
+from sqlalchemy.sql.elements import TextClause
+
+# Read/write routing between the primary database and read replicas.
+#
+# Each DATABASE_REPLICA_URLS entry becomes a bind ('replica1', 'replica2',
+# ...). The session sends a statement to a replica only when it is a plain
+# SELECT issued in a GET/HEAD request; one replica is picked per request,
+# weighted by DATABASE_REPLICA_WEIGHTS. Everything else goes to the
+# primary: DML, SELECT ... FOR UPDATE, flushes, session.connection(), and
+# every read a session makes after it has written (read-your-writes).
+#
+# A response to a request that wrote pins the browser to the primary for
+# REPLICA_STICKY_SECONDS, so the page after a POST/redirect shows the
+# change before the replicas have it. Keep it above the replicas' lag.
+#
+# `flask replica-sync --lag N` fakes replication for local testing: it
+# copies the primary over each replica every N seconds, so replicas trail
+# it the way a lagging streaming replica would.
+
+READ_METHODS = {'GET', 'HEAD'}
+PRIMARY = 'primary'
+STICKY_KEY = '_db_primary_until'
+
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS entries for the configured replicas."""
+    return {f'replica{n}': url for n, url in enumerate(config['DATABASE_REPLICA_URLS'], 1)}
+
+
+def replica_weights(config):
+    """``{bind_key: weight}``; replicas without a weight get 1."""
+    weights = list(config['DATABASE_REPLICA_WEIGHTS'])
+    keys = list(replica_binds(config))
+    if len(weights) > len(keys):
+        raise ValueError(f'{len(weights)} DATABASE_REPLICA_WEIGHTS for {len(keys)} DATABASE_REPLICA_URLS')
+    weights += [1] * (len(keys) - len(weights))
+    if any(weight < 0 for weight in weights) or (keys and not any(weights)):
+        raise ValueError('DATABASE_REPLICA_WEIGHTS must be non-negative with at least one above zero')
+    return dict(zip(keys, weights))
+
+
+def is_read(clause):
+    """Whether ``clause`` only reads, and so may run on a replica."""
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() == 'SELECT'
+    return getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+
+def use_primary(view):
+    """Serve every query of ``view`` from the primary, even on GET."""
+    view.use_primary = True
+    return view
+
+
+def _request_route():
+    weights = current_app.extensions.get('replicas')
+    if not weights or not has_request_context() or request.method not in READ_METHODS:
+        return PRIMARY
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, 'use_primary', False) or cookie_session.get(STICKY_KEY, 0) > time.time():
+        return PRIMARY
+    return random.choices(list(weights), list(weights.values()))[0]
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica bind when the request allows it.
+
+    When sharding is configured every statement goes to the selected shard
+    instead (see app/shards.py).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            shards = current_app.extensions.get('shards')
+            if shards is not None:
+                return shards.get_bind(self, clause)
+            route = self.route(clause)
+            if route != PRIMARY:
+                return self._db.engines[route]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def route(self, clause):
+        """The bind key ``clause`` should run on, or PRIMARY."""
+        if self.info.get('wrote'):
+            return PRIMARY
+        if not is_read(clause):
+            # Flushes and session.connection() arrive here without a clause
+            self.info['wrote'] = True
+            return PRIMARY
+        route = self.info.get('route')
+        if route is None:
+            route = self.info['route'] = _request_route()
+        return route
+
+
+@contextmanager
+def replica_reads(session):
+    """Send ``session``'s reads to a replica outside a request (reports, checks).
+
+    Writes still pin the session to the primary.
+    """
+    weights = current_app.extensions.get('replicas')
+    previous = session.info.get('route')
+    if weights:
+        session.info['route'] = random.choices(list(weights), list(weights.values()))[0]
+    try:
+        yield
+    finally:
+        session.info.pop('route', None)
+        if previous is not None:
+            session.info['route'] = previous
+
+
+@contextmanager
+def primary_reads(session):
+    """Send ``session``'s reads to the primary for the block, even in a GET.
+
+    For reads whose results are stored (cache fills, digests): a lagging
+    replica would persist state older than the writes it claims to cover.
+    """
+    previous = session.info.get('route')
+    session.info['route'] = PRIMARY
+    try:
+        yield
+    finally:
+        session.info.pop('route', None)
+        if previous is not None:
+            session.info['route'] = previous
+
+
+def sync(primary_url, replica_url):
+    """Overwrite the replica with a consistent snapshot of the primary.
+
+    SQLite files are copied page by page with the online backup API.
+    PostgreSQL replicas (already migrated) get every table reloaded in one
+    transaction from a REPEATABLE READ snapshot.
+    """
+    primary, replica = make_url(primary_url), make_url(replica_url)
+    if primary.get_backend_name() == replica.get_backend_name() == 'sqlite':
+        source, target = sqlite3.connect(primary.database), sqlite3.connect(replica.database)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        return
+
+    from sqlalchemy import create_engine
+    from app.database import db
+
+    tables = db.metadata.sorted_tables
+    source_engine, target_engine = create_engine(primary), create_engine(replica)
+    try:
+        with source_engine.connect().execution_options(isolation_level='REPEATABLE READ') as source, \
+                target_engine.begin() as target:
+            for table in reversed(tables):
+                target.execute(table.delete())
+            for table in tables:
+                result = source.execution_options(yield_per=5000).execute(table.select())
+                for rows in result.mappings().partitions():
+                    target.execute(table.insert(), [dict(row) for row in rows])
+    finally:
+        source_engine.dispose()
+        target_engine.dispose()
+
+
+def init_app(app):
+    weights = replica_weights(app.config)
+    if not weights:
+        return
+    if app.config['DATABASE_SHARD_URLS']:
+        raise ValueError('DATABASE_REPLICA_URLS cannot be combined with DATABASE_SHARD_URLS')
+    app.extensions['replicas'] = weights
+
+    from app.database import db
+
+    @app.before_request
+    def _reset_route():
+        # Routing is decided afresh for every request
+        db.session.info.pop('route', None)
+        db.session.info.pop('wrote', None)
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if db.session.info.get('wrote'):
+            cookie_session[STICKY_KEY] = time.time() + app.config['REPLICA_STICKY_SECONDS']
+        return response
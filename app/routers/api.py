@@ -0,0 +1,223 @@
+import hashlib
+from datetime import date, datetime
+from functools import wraps
+from flask import Blueprint, Response, jsonify, request, current_app
+from flask_login import current_user
+from sqlalchemy import func
+from app.database import db
+from app.models.application import Application, ApplicationStatus
+from app.models.document import Document
+from app.models.interview import Interview
+from app.models.reminder import Reminder
+from app.pagination import keyset_paginate, InvalidCursor
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Bump when the JSON shape changes so cached representations are refetched
+API_REVISION = 1
+
+# Serializable columns per resource; ?fields= picks a subset ('id' is always sent)
+RESOURCES = {
+    'applications': (Application, ('id', 'company', 'role', 'status', 'url', 'location', 'salary_range',
+                                   'date_applied', 'notes', 'created_at', 'updated_at')),
+    'interviews': (Interview, ('id', 'application_id', 'interview_type', 'scheduled_at', 'duration_minutes',
+                               'interviewer', 'location', 'notes', 'outcome', 'feedback',
+                               'created_at', 'updated_at')),
+    'reminders': (Reminder, ('id', 'application_id', 'remind_on', 'message', 'completed',
+                             'created_at', 'updated_at')),
+    'documents': (Document, ('id', 'application_id', 'document_type', 'filename', 'url', 'notes',
+                             'created_at', 'updated_at')),
+}
+
+
+class APIError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@api_bp.errorhandler(APIError)
+def handle_api_error(error):
+    return jsonify({'error': error.message}), error.status
+
+
+@api_bp.errorhandler(404)
+def handle_not_found(error):
+    return jsonify({'error': 'not found'}), 404
+
+
+def api_login_required(view):
+    """Like ``login_required`` but answers 401 JSON instead of redirecting."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({'error': 'authentication required'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _selected_fields(resource):
+    allowed = RESOURCES[resource][1]
+    requested = request.args.get('fields')
+    if not requested:
+        return allowed
+    fields = [f.strip() for f in requested.split(',') if f.strip()]
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise APIError(f"unknown field(s): {', '.join(unknown)}")
+    return ('id',) + tuple(f for f in allowed if f in fields and f != 'id')
+
+
+def _owned(resource):
+    """Base query over ``resource`` restricted to the current user's rows."""
+    model = RESOURCES[resource][0]
+    if model is Application:
+        return db.session.query(model).filter(Application.user_id == current_user.id)
+    return db.session.query(model).join(Application, model.application_id == Application.id).filter(
+        Application.user_id == current_user.id
+    )
+
+
+def _etag(*parts):
+    basis = '|'.join(str(p) for p in (API_REVISION, request.path, sorted(request.args.items(multi=True))) + parts)
+    return hashlib.sha256(basis.encode()).hexdigest()[:32]
+
+
+def _not_modified(etag):
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def _serialize(row, fields):
+    data = {}
+    for field in fields:
+        value = row[field]
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        data[field] = value
+    return data
+
+
+def _respond(payload, etag):
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _list(resource, query):
+    model = RESOURCES[resource][0]
+    fields = _selected_fields(resource)
+
+    # Fingerprint the whole filtered set with one aggregate; if the client
+    # already has it, answer 304 without fetching or serializing any rows
+    count, last_updated, last_id = query.with_entities(
+        func.count(model.id), func.max(model.updated_at), func.max(model.id)
+    ).order_by(None).one()
+    etag = _etag(count, last_updated, last_id)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    limit = min(max(request.args.get('limit', current_app.config['API_PAGE_SIZE'], type=int), 1),
+                current_app.config['API_MAX_PAGE_SIZE'])
+    columns = query.with_entities(*(getattr(model, f) for f in fields))
+    if 'updated_at' not in fields:
+        columns = columns.add_columns(model.updated_at)
+    try:
+        page = keyset_paginate(columns, model.updated_at, model.id, limit,
+                               after=request.args.get('after'), before=request.args.get('before'),
+                               key=lambda row: (row.updated_at, row.id))
+    except InvalidCursor:
+        raise APIError('invalid cursor')
+
+    return _respond({
+        'data': [_serialize(row._mapping, fields) for row in page.items],
+        'count': count,
+        'next': page.next_cursor,
+        'prev': page.prev_cursor,
+    }, etag)
+
+
+def _detail(resource, id):
+    model = RESOURCES[resource][0]
+    fields = _selected_fields(resource)
+
+    row = _owned(resource).filter(model.id == id).with_entities(
+        *(getattr(model, f) for f in fields), model.updated_at.label('_updated_at')
+    ).first()
+    if row is None:
+        raise APIError('not found', 404)
+
+    etag = _etag(row._updated_at)
+    return _not_modified(etag) or _respond({'data': _serialize(row._mapping, fields)}, etag)
+
+
+def _child_query(resource):
+    query = _owned(resource)
+    application_id = request.args.get('application_id', type=int)
+    if application_id:
+        query = query.filter(RESOURCES[resource][0].application_id == application_id)
+    return query
+
+
+@api_bp.route('/applications')
+@api_login_required
+def list_applications():
+    query = _owned('applications')
+    status = request.args.get('status')
+    if status:
+        if status not in ApplicationStatus.all():
+            raise APIError(f'unknown status {status!r}')
+        query = query.filter(Application.status == status)
+    return _list('applications', query)
+
+
+@api_bp.route('/applications/<int:id>')
+@api_login_required
+def get_application(id):
+    return _detail('applications', id)
+
+
+@api_bp.route('/interviews')
+@api_login_required
+def list_interviews():
+    return _list('interviews', _child_query('interviews'))
+
+
+@api_bp.route('/interviews/<int:id>')
+@api_login_required
+def get_interview(id):
+    return _detail('interviews', id)
+
+
+@api_bp.route('/reminders')
+@api_login_required
+def list_reminders():
+    query = _child_query('reminders')
+    completed = request.args.get('completed')
+    if completed in ('true', 'false'):
+        query = query.filter(Reminder.completed == (completed == 'true'))
+    return _list('reminders', query)
+
+
+@api_bp.route('/reminders/<int:id>')
+@api_login_required
+def get_reminder(id):
+    return _detail('reminders', id)
+
+
+@api_bp.route('/documents')
+@api_login_required
+def list_documents():
+    return _list('documents', _child_query('documents'))
+
+
+@api_bp.route('/documents/<int:id>')
+@api_login_required
+def get_document(id):
+    return _detail('documents', id)
@@ -1,8 +1,18 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify
 from flask_login import login_required, current_user
 from datetime import date
+from sqlalchemy.orm import selectinload
+from app.cache import cache, snapshot
+from app import bulk, importer
 from app.database import db
+from app.fragments import render_fragment, wants_fragment
+from app.importer import FIELDS, FORMATS, detect_format, iter_records
 from app.models.application import Application, ApplicationStatus
+from app.query_budget import query_budget
+from app.query_patterns import repeated_queries_allowed
+from app.pagination import keyset_paginate, InvalidCursor
+from app.search import search_applications, search_terms
+from app.typeahead import DEFAULT_LIMIT, typeahead
 
 applications_bp = Blueprint('applications', __name__, url_prefix='/applications')
 
@@ -12,27 +22,64 @@ applications_bp = Blueprint('applications', __name__, url_prefix='/applications'
 def index():
     status_filter = request.args.get('status', '')
     search = request.args.get('search', '').strip()
+    after = request.args.get('after')
+    before = request.args.get('before')
     
-    query = Application.query.filter_by(user_id=current_user.id)
+    per_page = min(
+        request.args.get('per_page', current_app.config['APPLICATIONS_PER_PAGE'], type=int),
+        current_app.config['APPLICATIONS_MAX_PER_PAGE']
+    )
+    per_page = max(per_page, 1)
+    
+    params = {'status': status_filter, 'search': search, 'per_page': per_page,
+              'after': after, 'before': before}
+    try:
+        context = cache.user_cached(
+            current_user.id, 'applications.index', params,
+            lambda: _build_index(current_user.id, status_filter, search, per_page, after, before)
+        )
+    except InvalidCursor:
+        return redirect(url_for('applications.index', status=status_filter or None, search=search or None))
+    
+    return render_template('applications/index.html', 
+                         search_terms=search_terms(search),
+                         per_page=per_page,
+                         status_choices=ApplicationStatus.choices(),
+                         current_status=status_filter,
+                         search=search,
+                         **context)
+
+
+def _build_index(user_id, status_filter, search, per_page, after, before):
+    query = Application.query.filter_by(user_id=user_id)
     
     if status_filter:
         query = query.filter_by(status=status_filter)
     
+    score = None
     if search:
-        query = query.filter(
-            db.or_(
-                Application.company.ilike(f'%{search}%'),
-                Application.role.ilike(f'%{search}%')
-            )
-        )
+        query, score = search_applications(query, search)
     
-    applications = query.order_by(Application.updated_at.desc()).all()
+    if score is not None:
+        # Ranked search results: page by relevance, most relevant first
+        page = keyset_paginate(query, score, Application.id, per_page,
+                               after=after, before=before,
+                               key=lambda row: (row.score, row.Application.id))
+        applications = [row.Application for row in page.items]
+    else:
+        page = keyset_paginate(query, Application.updated_at, Application.id, per_page,
+                               after=after, before=before)
+        applications = page.items
     
-    return render_template('applications/index.html', 
-                         applications=applications,
-                         status_choices=ApplicationStatus.choices(),
-                         current_status=status_filter,
-                         search=search)
+    # Plain dicts rather than ORM objects so the context can be cached
+    return {
+        'applications': [
+            snapshot(a, 'id', 'company', 'role', 'location', 'notes', 'date_applied',
+                     'status_display', 'status_color')
+            for a in applications
+        ],
+        'page': {'next_cursor': page.next_cursor, 'prev_cursor': page.prev_cursor},
+    }
 
 
 @applications_bp.route('/new', methods=['GET', 'POST'])
@@ -84,11 +131,68 @@ def new():
                          application=None)
 
 
+@applications_bp.route('/import', methods=['GET', 'POST'])
+@login_required
+@repeated_queries_allowed
+def import_applications():
+    result = None
+    
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Choose a CSV or NDJSON file to import.', 'error')
+            return redirect(url_for('applications.import_applications'))
+        
+        fmt = request.form.get('format') or detect_format(upload.filename)
+        if fmt not in FORMATS:
+            flash('Unsupported file format.', 'error')
+            return redirect(url_for('applications.import_applications'))
+        
+        # Werkzeug spools large uploads to disk; read them back line by line
+        result = importer.import_applications(
+            current_user.id, iter_records(upload.stream, fmt),
+            batch_size=current_app.config['IMPORT_BATCH_SIZE']
+        )
+        
+        if result.inserted:
+            flash(f'Imported {result.inserted} application(s).', 'success')
+        if result.error_count:
+            flash(f'{result.error_count} row(s) could not be imported.', 'error')
+    
+    return render_template('applications/import.html',
+                         result=result,
+                         status_choices=ApplicationStatus.choices(),
+                         fields=FIELDS)
+
+
+@applications_bp.route('/typeahead')
+@login_required
+@query_budget(1)
+def typeahead_search():
+    # Served from the per-worker prefix index; one query only when it is rebuilt
+    results = typeahead.search(current_user.id, request.args.get('q', ''),
+                               request.args.get('limit', DEFAULT_LIMIT, type=int))
+    return jsonify({'results': results})
+
+
 @applications_bp.route('/<int:id>')
 @login_required
+@query_budget(4)
 def show(id):
-    application = Application.query.filter_by(id=id, user_id=current_user.id).first_or_404()
-    return render_template('applications/show.html', application=application, status_choices=ApplicationStatus.choices())
+    # One statement for the application plus one per child collection,
+    # however many children there are; the template issues no queries
+    application = Application.query.filter_by(id=id, user_id=current_user.id).options(
+        selectinload(Application.interviews),
+        selectinload(Application.documents),
+        selectinload(Application.open_reminders)
+    ).first_or_404()
+    
+    return render_template('applications/show.html',
+                         application=application,
+                         interviews=application.interviews,
+                         documents=application.documents,
+                         reminders=application.open_reminders,
+                         status_choices=ApplicationStatus.choices())
 
 
 @applications_bp.route('/<int:id>/edit', methods=['GET', 'POST'])
@@ -152,7 +256,46 @@ def update_status(id):
     if new_status in ApplicationStatus.all():
         application.status = new_status
         db.session.commit()
-        flash(f'Status updated to {application.status_display}', 'success')
+        if not wants_fragment():
+            flash(f'Status updated to {application.status_display}', 'success')
     
+    if wants_fragment():
+        return render_fragment('applications/_macros.html', 'header_card', application, ApplicationStatus.choices())
     return redirect(request.referrer or url_for('applications.show', id=id))
 
+
+@applications_bp.route('/bulk', methods=['POST'])
+@login_required
+def bulk_action():
+    back = request.referrer or url_for('applications.index')
+    action = request.form.get('action')
+    ids = request.form.getlist('ids', type=int)[:current_app.config['APPLICATIONS_MAX_PER_PAGE']]
+    if not ids:
+        flash('Select at least one application.', 'error')
+        return redirect(back)
+    
+    if action == 'status':
+        new_status = request.form.get('status')
+        if new_status not in ApplicationStatus.all():
+            flash('Choose a status.', 'error')
+            return redirect(back)
+        changed = bulk.set_status(current_user.id, ids, new_status)
+        flash(f'{changed} application(s) moved to {dict(ApplicationStatus.choices())[new_status]}.', 'success')
+    elif action == 'delete':
+        deleted = bulk.delete_applications(current_user.id, ids)
+        flash(f'{deleted} application(s) deleted.', 'info')
+    elif action == 'reminder':
+        message = request.form.get('message', '').strip()
+        try:
+            remind_on = date.fromisoformat(request.form.get('remind_on', ''))
+        except ValueError:
+            remind_on = None
+        if not message or remind_on is None:
+            flash('A reminder needs a date and a message.', 'error')
+            return redirect(back)
+        added = bulk.add_reminder(current_user.id, ids, remind_on, message[:500])
+        flash(f'Reminder set on {added} application(s).', 'success')
+    else:
+        flash('Unknown bulk action.', 'error')
+    
+    return redirect(back)
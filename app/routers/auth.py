@@ -1,7 +1,10 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, login_required, current_user
+from app import accounts, shards
 from app.database import db
+from app.query_patterns import repeated_queries_allowed
 from app.models.user import User
+from app.user_cache import user_cache
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -16,7 +19,7 @@ def login():
         password = request.form.get('password', '')
         remember = request.form.get('remember', False)
         
-        user = User.query.filter_by(email=email).first()
+        user = User.query.filter_by(email=email).first() if shards.select_email(email) else None
         
         if user and user.check_password(password):
             login_user(user, remember=remember)
@@ -53,7 +56,7 @@ def signup():
         if len(password) < 6:
             errors.append('Password must be at least 6 characters.')
         
-        if User.query.filter_by(email=email).first():
+        if shards.select_email(email) and User.query.filter_by(email=email).first():
             errors.append('Email already registered.')
         
         if errors:
@@ -62,7 +65,7 @@ def signup():
             return render_template('signup.html', name=name, email=email)
         
         # Create user
-        user = User(name=name, email=email)
+        user = User(id=shards.allocate(email), name=name, email=email)
         user.set_password(password)
         db.session.add(user)
         db.session.commit()
@@ -77,7 +80,28 @@ def signup():
 @auth_bp.route('/logout')
 @login_required
 def logout():
+    user_cache.forget(current_user.id)
     logout_user()
     flash('You have been logged out.', 'info')
     return redirect(url_for('auth.login'))
 
+
+@auth_bp.route('/account')
+@login_required
+def account():
+    return render_template('account.html')
+
+
+@auth_bp.route('/account/delete', methods=['POST'])
+@login_required
+@repeated_queries_allowed
+def delete_account():
+    if not current_user.check_password(request.form.get('password', '')):
+        flash('Password is incorrect; your account was not deleted.', 'error')
+        return redirect(url_for('auth.account'))
+    
+    user_id = current_user.id
+    logout_user()
+    accounts.delete_account(user_id, batch_size=current_app.config['ACCOUNT_DELETE_BATCH_SIZE'])
+    flash('Your account and all its data have been deleted.', 'info')
+    return redirect(url_for('auth.login'))
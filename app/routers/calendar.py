@@ -0,0 +1,59 @@
+import secrets
+from flask import Blueprint, Response, abort, flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from app import shards
+from app.calendar import get_feed
+from app.database import db
+from app.models.user import User
+from app.replicas import use_primary
+
+calendar_bp = Blueprint('calendar', __name__, url_prefix='/calendar')
+
+
+@calendar_bp.route('/')
+@login_required
+def index():
+    token = current_user.calendar_token
+    feed_url = url_for('calendar.feed', token=token, _external=True) if token else None
+    return render_template('calendar/index.html', feed_url=feed_url)
+
+
+@calendar_bp.route('/token', methods=['POST'])
+@login_required
+def reset_token():
+    user = db.session.get(User, current_user.id)
+    user.calendar_token = secrets.token_urlsafe(24)
+    db.session.commit()
+    flash('New calendar link created. Links shared before no longer work.', 'success')
+    return redirect(url_for('calendar.index'))
+
+
+@calendar_bp.route('/<token>.ics')
+@use_primary
+def feed(token):
+    # No login: calendar clients authenticate with the secret in the URL.
+    # Read from the primary: the client fetching a new link has no sticky cookie
+    user_id = shards.find(lambda: db.session.query(User.id).filter(User.calendar_token == token).scalar())
+    if user_id is None:
+        abort(404)
+
+    body, etag, last_modified = get_feed(user_id)
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+
+    # If-None-Match wins when both are sent (RFC 9110)
+    if request.if_none_match:
+        not_modified = etag in request.if_none_match
+    else:
+        not_modified = None not in (request.if_modified_since, last_modified) and \
+            last_modified <= request.if_modified_since.replace(tzinfo=None)
+    if not_modified:
+        return response
+
+    response.status_code = 200
+    response.set_data(body)
+    response.mimetype = 'text/calendar'
+    response.headers['Content-Disposition'] = 'inline; filename="interviews.ics"'
+    return response
@@ -1,11 +1,13 @@
 from flask import Blueprint, render_template, redirect, url_for
 from flask_login import login_required, current_user
-from datetime import date, datetime, timedelta
-from sqlalchemy import func
-from app.database import db
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.orm import contains_eager
+from app.analytics import get_analytics
+from app.cache import cache, snapshot
+from app.digest import get_digest
 from app.models.application import Application, ApplicationStatus
 from app.models.interview import Interview, InterviewOutcome
-from app.models.reminder import Reminder
+from app.status_counts import get_status_counts
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -13,15 +15,21 @@ dashboard_bp = Blueprint('dashboard', __name__)
 @dashboard_bp.route('/')
 @login_required
 def index():
-    # Get status counts
-    status_counts = db.session.query(
-        Application.status,
-        func.count(Application.id)
-    ).filter(
-        Application.user_id == current_user.id
-    ).group_by(Application.status).all()
+    today = date.today()
+    context = cache.user_cached(
+        current_user.id, 'dashboard', {'today': today.isoformat()},
+        lambda: _build_dashboard(current_user.id, today),
+        ttl=_dashboard_ttl
+    )
     
-    status_counts_dict = dict(status_counts)
+    return render_template('dashboard.html',
+                         ApplicationStatus=ApplicationStatus,
+                         **context)
+
+
+def _build_dashboard(user_id, today):
+    # Get status counts (maintained incrementally, see app.status_counts)
+    status_counts_dict = get_status_counts(user_id)
     
     # Calculate totals
     total_applications = sum(status_counts_dict.values())
@@ -33,24 +41,21 @@ def index():
     offer_count = status_counts_dict.get(ApplicationStatus.OFFER, 0)
     rejected_count = status_counts_dict.get(ApplicationStatus.REJECTED, 0)
     
-    # Get due reminders (today and overdue)
-    due_reminders = Reminder.query.join(Application).filter(
-        Application.user_id == current_user.id,
-        Reminder.completed == False,
-        Reminder.remind_on <= date.today()
-    ).order_by(Reminder.remind_on).limit(5).all()
+    # Due reminders (today and overdue), precomputed by the digest worker
+    digest = get_digest(user_id, today)
     
     # Get upcoming interviews (next 7 days)
+    now = datetime.utcnow()
     upcoming_interviews = Interview.query.join(Application).filter(
-        Application.user_id == current_user.id,
+        Application.user_id == user_id,
         Interview.outcome == InterviewOutcome.PENDING,
-        Interview.scheduled_at >= datetime.utcnow(),
-        Interview.scheduled_at <= datetime.utcnow() + timedelta(days=7)
-    ).order_by(Interview.scheduled_at).limit(5).all()
+        Interview.scheduled_at >= now,
+        Interview.scheduled_at <= now + timedelta(days=7)
+    ).options(contains_eager(Interview.application)).order_by(Interview.scheduled_at).limit(5).all()
     
     # Get recent applications
     recent_applications = Application.query.filter_by(
-        user_id=current_user.id
+        user_id=user_id
     ).order_by(Application.updated_at.desc()).limit(5).all()
     
     # Stats for display
@@ -61,13 +66,38 @@ def index():
         {'label': 'Rejected', 'value': rejected_count, 'color': 'red', 'icon': 'fa-times-circle'},
     ]
     
-    return render_template('dashboard.html',
-                         stats=stats,
-                         status_counts=status_counts_dict,
-                         due_reminders=due_reminders,
-                         upcoming_interviews=upcoming_interviews,
-                         recent_applications=recent_applications,
-                         ApplicationStatus=ApplicationStatus)
+    # Plain dicts rather than ORM objects so the context can be cached
+    return {
+        'stats': stats,
+        'status_counts': status_counts_dict,
+        'due_reminders': [
+            dict(item, application={'company': item['company']})
+            for item in digest['items'][:5]
+        ],
+        'due_count': digest['overdue_count'] + digest['today_count'],
+        'upcoming_interviews': [
+            dict(snapshot(i, 'id', 'application_id', 'scheduled_at', 'type_display'),
+                 application=snapshot(i.application, 'company'))
+            for i in upcoming_interviews
+        ],
+        'recent_applications': [
+            snapshot(a, 'id', 'company', 'role', 'status_display', 'status_color')
+            for a in recent_applications
+        ],
+        # Funnel and time in stage, read from the rollups (see app.analytics)
+        'analytics': get_analytics(user_id),
+    }
+
+
+def _dashboard_ttl(context):
+    # Due reminders roll over at midnight (the cache key also carries the
+    # date) and an upcoming interview drops off the list once it starts
+    now = datetime.now()
+    seconds = (datetime.combine(now.date() + timedelta(days=1), time.min) - now).total_seconds()
+    if context['upcoming_interviews']:
+        starts_at = context['upcoming_interviews'][0]['scheduled_at']
+        seconds = min(seconds, (starts_at - datetime.utcnow()).total_seconds())
+    return seconds
 
 
 @dashboard_bp.route('/welcome')
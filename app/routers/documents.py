@@ -16,12 +16,9 @@ def new():
     if application_id:
         application = Application.query.filter_by(id=application_id, user_id=current_user.id).first_or_404()
     
-    applications = Application.query.filter_by(user_id=current_user.id).order_by(Application.company).all()
-    
     return render_template('documents/form.html',
                          document=None,
                          application=application,
-                         applications=applications,
                          type_choices=DocumentType.choices())
 
 
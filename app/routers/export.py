@@ -0,0 +1,37 @@
+from datetime import date
+from flask import Blueprint, Response, abort, stream_with_context
+from flask_login import login_required, current_user
+from app.exporter import TABLES, export_bundle, export_csv, export_ndjson
+
+export_bp = Blueprint('export', __name__, url_prefix='/export')
+
+
+def _download(generator, filename, mimetype):
+    # No Content-Length: the body is sent chunked as rows are produced
+    return Response(stream_with_context(generator), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+@export_bp.route('/bundle.zip')
+@login_required
+def bundle():
+    return _download(export_bundle(current_user.id),
+                     f'job-tracker-{date.today().isoformat()}.zip', 'application/zip')
+
+
+@export_bp.route('/applications.ndjson')
+@login_required
+def ndjson():
+    return _download(export_ndjson(current_user.id),
+                     f'job-tracker-{date.today().isoformat()}.ndjson', 'application/x-ndjson')
+
+
+@export_bp.route('/<table>.csv')
+@login_required
+def table_csv(table):
+    if table not in TABLES:
+        abort(404)
+    return _download(export_csv(current_user.id, table),
+                     f'{table}-{date.today().isoformat()}.csv', 'text/csv')
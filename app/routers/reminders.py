@@ -1,9 +1,13 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
 from datetime import date, timedelta
+from sqlalchemy import case, func
+from sqlalchemy.orm import contains_eager
 from app.database import db
+from app.fragments import fragment_target, render_fragment, wants_fragment
 from app.models.application import Application
 from app.models.reminder import Reminder
+from app.pagination import keyset_paginate, InvalidCursor
 
 reminders_bp = Blueprint('reminders', __name__, url_prefix='/reminders')
 
@@ -12,28 +16,69 @@ reminders_bp = Blueprint('reminders', __name__, url_prefix='/reminders')
 @login_required
 def index():
     show_completed = request.args.get('completed', 'false') == 'true'
+    today = date.today()
+    per_page = current_app.config['REMINDERS_PER_PAGE']
     
-    query = Reminder.query.join(Application).filter(Application.user_id == current_user.id)
-    
-    if not show_completed:
-        query = query.filter(Reminder.completed == False)
-    
-    reminders = query.order_by(Reminder.remind_on).all()
-    
-    # Group reminders
-    overdue = [r for r in reminders if r.is_overdue]
-    today = [r for r in reminders if r.remind_on == date.today() and not r.completed]
-    upcoming = [r for r in reminders if r.remind_on > date.today() and not r.completed]
-    completed = [r for r in reminders if r.completed] if show_completed else []
+    base = Reminder.query.join(Application).filter(
+        Application.user_id == current_user.id
+    ).options(contains_eager(Reminder.application))
+    
+    # Each bucket is its own LIMITed query with its own cursor; completed
+    # history is only queried when asked for
+    buckets = {
+        'overdue': (base.filter(Reminder.completed == False, Reminder.remind_on < today), False),
+        'today': (base.filter(Reminder.completed == False, Reminder.remind_on == today), False),
+        'upcoming': (base.filter(Reminder.completed == False, Reminder.remind_on > today), False),
+    }
+    if show_completed:
+        buckets['completed'] = (base.filter(Reminder.completed == True), True)
+    
+    pages = {}
+    try:
+        for name, (query, descending) in buckets.items():
+            pages[name] = keyset_paginate(query, Reminder.remind_on, Reminder.id, per_page,
+                                          after=request.args.get(f'{name}_after'),
+                                          before=request.args.get(f'{name}_before'),
+                                          descending=descending)
+    except InvalidCursor:
+        return redirect(url_for('reminders.index', completed='true' if show_completed else None))
+    
+    def page_url(bucket, **cursor):
+        args = {k: v for k, v in request.args.items() if not k.startswith(f'{bucket}_')}
+        args.update({f'{bucket}_{k}': v for k, v in cursor.items()})
+        return url_for('reminders.index', **args)
     
     return render_template('reminders/index.html',
-                         overdue=overdue,
-                         today=today,
-                         upcoming=upcoming,
-                         completed=completed,
+                         overdue=pages['overdue'].items,
+                         today=pages['today'].items,
+                         upcoming=pages['upcoming'].items,
+                         completed=pages['completed'].items if show_completed else [],
+                         pages=pages,
+                         counts=_bucket_counts(current_user.id, today, show_completed),
+                         page_url=page_url,
                          show_completed=show_completed)
 
 
+def _bucket_counts(user_id, today, include_completed):
+    """Size of every bucket, from a single CASE-based aggregate."""
+    def bucket(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+    
+    open_ = Reminder.completed == False
+    columns = [
+        bucket(db.and_(open_, Reminder.remind_on < today)).label('overdue'),
+        bucket(db.and_(open_, Reminder.remind_on == today)).label('today'),
+        bucket(db.and_(open_, Reminder.remind_on > today)).label('upcoming'),
+    ]
+    if include_completed:
+        columns.append(bucket(Reminder.completed == True).label('completed'))
+    
+    row = db.session.query(*columns).select_from(Reminder).join(Application).filter(
+        Application.user_id == user_id
+    ).one()
+    return row._asdict()
+
+
 @reminders_bp.route('/new')
 @login_required
 def new():
@@ -43,15 +88,12 @@ def new():
     if application_id:
         application = Application.query.filter_by(id=application_id, user_id=current_user.id).first_or_404()
     
-    applications = Application.query.filter_by(user_id=current_user.id).order_by(Application.company).all()
-    
     # Default to 1 week from now
     default_date = (date.today() + timedelta(days=7)).isoformat()
     
     return render_template('reminders/form.html',
                          reminder=None,
                          application=application,
-                         applications=applications,
                          default_date=default_date)
 
 
@@ -136,11 +178,16 @@ def complete(id):
     reminder = Reminder.query.join(Application).filter(
         Reminder.id == id,
         Application.user_id == current_user.id
-    ).first_or_404()
+    ).options(contains_eager(Reminder.application)).first_or_404()
     
     reminder.completed = True
     db.session.commit()
     
+    if wants_fragment():
+        # The same reminder is a row on /reminders and an item on the application page
+        if fragment_target().startswith('application-reminder-'):
+            return render_fragment('applications/_macros.html', 'reminder_item', reminder)
+        return render_fragment('reminders/_macros.html', 'reminder_row', reminder)
     flash('Reminder marked as complete.', 'success')
     return redirect(request.referrer or url_for('reminders.index'))
 
@@ -156,6 +203,8 @@ def delete(id):
     db.session.delete(reminder)
     db.session.commit()
     
+    if wants_fragment():
+        return ''
     flash('Reminder deleted.', 'info')
     return redirect(request.referrer or url_for('reminders.index'))
 
@@ -0,0 +1,150 @@
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import DDL, event, inspect, select, table, column, literal_column, func, text
+from app.database import db
+from app.models.application import Application
+
+# Full-text search over an application's company, role, location and notes.
+#
+# PostgreSQL: a STORED generated ``search_vector`` tsvector column with a GIN
+# index, so the database keeps it current on every write.
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# Anything else (or a SQLite build without FTS5) falls back to LIKE.
+
+SEARCH_FIELDS = ('company', 'role', 'location', 'notes')
+
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(company, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(role, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(notes, '')), 'C')"
+)
+
+PG_DDL = [
+    f"ALTER TABLE applications ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({PG_SEARCH_VECTOR}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_applications_search_vector ON applications USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5("
+    "company, role, location, notes, content='applications', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS applications_fts_ai AFTER INSERT ON applications BEGIN "
+    "INSERT INTO applications_fts(rowid, company, role, location, notes) "
+    "VALUES (new.id, new.company, new.role, new.location, new.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS applications_fts_ad AFTER DELETE ON applications BEGIN "
+    "INSERT INTO applications_fts(applications_fts, rowid, company, role, location, notes) "
+    "VALUES ('delete', old.id, old.company, old.role, old.location, old.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS applications_fts_au AFTER UPDATE OF company, role, location, notes "
+    "ON applications BEGIN "
+    "INSERT INTO applications_fts(applications_fts, rowid, company, role, location, notes) "
+    "VALUES ('delete', old.id, old.company, old.role, old.location, old.notes); "
+    "INSERT INTO applications_fts(rowid, company, role, location, notes) "
+    "VALUES (new.id, new.company, new.role, new.location, new.notes); END",
+]
+
+# Column weights for bm25(), in SEARCH_FIELDS order
+SQLITE_WEIGHTS = (10.0, 10.0, 5.0, 1.0)
+
+# Fresh databases built with create_all() get the search structures too
+for statement in PG_DDL:
+    event.listen(Application.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+for statement in SQLITE_DDL:
+    event.listen(Application.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
+_backends = {}
+
+
+def search_backend():
+    """Return 'postgresql', 'sqlite' or None (LIKE fallback) for the bound engine."""
+    engine = db.engine
+    if engine.url not in _backends:
+        inspector = inspect(engine)
+        backend = None
+        if engine.dialect.name == 'postgresql':
+            columns = {c['name'] for c in inspector.get_columns('applications')}
+            if 'search_vector' in columns:
+                backend = 'postgresql'
+        elif engine.dialect.name == 'sqlite':
+            if inspector.has_table('applications_fts'):
+                backend = 'sqlite'
+        _backends[engine.url] = backend
+    return _backends[engine.url]
+
+
+def search_terms(search):
+    """Split free text into plain word tokens, dropping query syntax."""
+    return re.findall(r'\w+', search.lower())
+
+
+def search_applications(query, search):
+    """Restrict an ``Application`` query to rows matching ``search``.
+
+    Returns ``(query, score)``: the query yields ``(Application, score)``
+    rows and ``score`` is the relevance expression to order by (higher is
+    better), or ``(query, None)`` when nothing searchable was entered and the
+    caller should keep its default ordering.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return query, None
+
+    backend = search_backend()
+
+    if backend == 'postgresql':
+        tsquery = func.to_tsquery('english', ' & '.join(f'{t}:*' for t in terms))
+        vector = literal_column('applications.search_vector')
+        score = func.ts_rank(vector, tsquery)
+        query = query.filter(vector.op('@@')(tsquery)).add_columns(score.label('score'))
+        return query, score
+
+    if backend == 'sqlite':
+        fts = table('applications_fts', column('rowid'))
+        matches = select(
+            fts.c.rowid.label('application_id'),
+            (-func.bm25(literal_column('applications_fts'), *SQLITE_WEIGHTS)).label('score')
+        ).select_from(fts).where(
+            text('applications_fts MATCH :fts_query').bindparams(
+                fts_query=' '.join(f'"{t}"*' for t in terms))
+        ).subquery()
+        query = query.join(matches, matches.c.application_id == Application.id).add_columns(matches.c.score)
+        return query, matches.c.score
+
+    for term in terms:
+        query = query.filter(db.or_(*(getattr(Application, f).ilike(f'%{term}%') for f in SEARCH_FIELDS)))
+    return query, None
+
+
+def highlight(value, terms):
+    """HTML-escape ``value`` and wrap words starting with a search term in <mark>."""
+    if not value:
+        return value
+    if not terms:
+        return escape(value)
+    pattern = re.compile(r'\b(?:%s)\w*' % '|'.join(re.escape(t) for t in terms), re.IGNORECASE)
+    out, last = [], 0
+    for match in pattern.finditer(value):
+        out.append(escape(value[last:match.start()]))
+        out.append(Markup('<mark class="bg-yellow-200 rounded">%s</mark>') % match.group(0))
+        last = match.end()
+    out.append(escape(value[last:]))
+    return Markup('').join(out)
+
+
+def snippet(value, terms, width=80):
+    """A highlighted window of ``value`` around the first search term hit."""
+    if not value or not terms:
+        return None
+    match = re.search(r'\b(?:%s)' % '|'.join(re.escape(t) for t in terms), value, re.IGNORECASE)
+    if not match:
+        return None
+    start = max(match.start() - width // 2, 0)
+    end = min(start + width, len(value))
+    excerpt = value[start:end]
+    return Markup('%s%s%s') % ('…' if start else '', highlight(excerpt, terms), '…' if end < len(value) else '')
+
+
+def init_app(app):
+    app.add_template_filter(highlight, 'highlight')
+    app.add_template_filter(snippet, 'search_snippet')
@@ -0,0 +1,218 @@
+import math
+import random
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from app import shards
+from app.analytics import record_transitions
+from app.cache import cache
+from app.database import db
+from app.models.application import Application, ApplicationStatus
+from app.models.document import Document, DocumentType
+from app.models.interview import Interview, InterviewOutcome, InterviewType
+from app.models.reminder import Reminder
+from app.models.user import User
+from app.status_counts import apply_deltas
+
+# Deterministic synthetic data for development and benchmarks.
+#
+# The same seed always yields the same rows. Each user gets a log-normal
+# number of applications around the requested mean (a few heavy users,
+# many light ones), with a status mix and child rows shaped like a real
+# search: interviews only past the screening stage, reminders mostly on
+# open applications, documents once something was sent.
+
+PASSWORD = 'password'
+
+# Relative frequency of each status
+STATUS_WEIGHTS = {
+    ApplicationStatus.SAVED: 14,
+    ApplicationStatus.APPLIED: 42,
+    ApplicationStatus.PHONE_SCREEN: 9,
+    ApplicationStatus.INTERVIEWING: 7,
+    ApplicationStatus.FINAL_ROUND: 3,
+    ApplicationStatus.OFFER: 2,
+    ApplicationStatus.REJECTED: 19,
+    ApplicationStatus.WITHDRAWN: 4,
+}
+
+# Interviews held per application, by status (min, max)
+INTERVIEWS_BY_STATUS = {
+    ApplicationStatus.PHONE_SCREEN: (1, 1),
+    ApplicationStatus.INTERVIEWING: (1, 3),
+    ApplicationStatus.FINAL_ROUND: (2, 4),
+    ApplicationStatus.OFFER: (3, 5),
+    ApplicationStatus.REJECTED: (0, 2),
+    ApplicationStatus.WITHDRAWN: (0, 1),
+}
+
+OPEN_STATUSES = {ApplicationStatus.SAVED, ApplicationStatus.APPLIED, ApplicationStatus.PHONE_SCREEN,
+                 ApplicationStatus.INTERVIEWING, ApplicationStatus.FINAL_ROUND}
+
+COMPANIES = ('Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises',
+             'Soylent', 'Cyberdyne', 'Tyrell', 'Wonka', 'Aperture', 'Vandelay', 'Pied Piper', 'Massive Dynamic')
+ROLES = ('Software Engineer', 'Senior Software Engineer', 'Backend Engineer', 'Frontend Engineer',
+         'Data Engineer', 'Site Reliability Engineer', 'Engineering Manager', 'Product Engineer')
+LOCATIONS = ('Remote', 'Berlin', 'London', 'New York', 'San Francisco', 'Toronto', 'Amsterdam', 'Lisbon')
+NOTE_WORDS = ('python', 'postgres', 'team', 'referral', 'recruiter', 'salary', 'equity', 'hybrid',
+              'startup', 'follow', 'culture', 'stack', 'growth', 'kubernetes', 'flask', 'benefits')
+
+
+class Generator:
+    def __init__(self, seed=0, applications_per_user=100, interviews_scale=1.0, reminders_per_application=0.5,
+                 documents_per_application=1.0, today=None):
+        self.random = random.Random(seed)
+        self.applications_per_user = applications_per_user
+        self.interviews_scale = interviews_scale
+        self.reminders_per_application = reminders_per_application
+        self.documents_per_application = documents_per_application
+        self.today = today or date.today()
+        self.now = datetime.combine(self.today, datetime.min.time()) + timedelta(hours=12)
+
+    def application_count(self):
+        if self.applications_per_user <= 0:
+            return 0
+        # Log-normal with the requested mean; sigma 0.8 gives a long tail
+        sigma = 0.8
+        mu = math.log(self.applications_per_user) - sigma ** 2 / 2
+        return max(1, round(self.random.lognormvariate(mu, sigma)))
+
+    def application(self, user_id):
+        r = self.random
+        status = r.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+        created = self.now - timedelta(days=r.uniform(0, 180))
+        updated = min(self.now, created + timedelta(days=r.expovariate(1 / 10)))
+        return {
+            'user_id': user_id,
+            'company': f'{r.choice(COMPANIES)} {r.randint(1, 500)}',
+            'role': r.choice(ROLES),
+            'status': status,
+            'url': f'https://jobs.example.com/{r.randint(10000, 99999)}' if r.random() < 0.7 else None,
+            'location': r.choice(LOCATIONS),
+            'salary_range': f'${r.randint(8, 20) * 10}k - ${r.randint(21, 30) * 10}k' if r.random() < 0.4 else None,
+            'date_applied': created.date() if status != ApplicationStatus.SAVED else None,
+            'notes': ' '.join(r.choices(NOTE_WORDS, k=r.randint(0, 30))) or None,
+            'created_at': created,
+            'updated_at': updated,
+        }
+
+    def interviews(self, application_id, application):
+        r = self.random
+        low, high = INTERVIEWS_BY_STATUS.get(application['status'], (0, 0))
+        count = round(r.randint(low, high) * self.interviews_scale)
+        rows = []
+        at = application['created_at']
+        for i in range(count):
+            at = at + timedelta(days=r.randint(3, 14), hours=r.randint(0, 8))
+            upcoming = at > self.now
+            rows.append({
+                'application_id': application_id,
+                'interview_type': InterviewType.PHONE_SCREEN if i == 0 else r.choice(
+                    (InterviewType.TECHNICAL, InterviewType.BEHAVIORAL, InterviewType.ONSITE, InterviewType.FINAL)),
+                'scheduled_at': at.replace(minute=0, second=0, microsecond=0),
+                'duration_minutes': r.choice((30, 45, 60, 90)),
+                'interviewer': f'Interviewer {r.randint(1, 200)}',
+                'location': 'Video call',
+                'notes': None,
+                'outcome': InterviewOutcome.PENDING if upcoming else r.choice(
+                    (InterviewOutcome.PASSED, InterviewOutcome.PASSED, InterviewOutcome.FAILED)),
+                'feedback': None,
+                'created_at': application['created_at'],
+                'updated_at': min(at, self.now),
+            })
+        return rows
+
+    def reminders(self, application_id, application):
+        r = self.random
+        is_open = application['status'] in OPEN_STATUSES
+        rate = self.reminders_per_application * (1.5 if is_open else 0.3)
+        rows = []
+        while r.random() < rate / (len(rows) + 1):
+            remind_on = self.today + timedelta(days=r.randint(-20, 30))
+            rows.append({
+                'application_id': application_id,
+                'remind_on': remind_on,
+                'message': r.choice(('Follow up with recruiter', 'Send thank-you note', 'Check application status',
+                                     'Prepare for interview', 'Ask for feedback')),
+                'completed': (remind_on < self.today and r.random() < 0.7) or not is_open,
+                'created_at': application['created_at'],
+                'updated_at': application['updated_at'],
+            })
+        return rows
+
+    def documents(self, application_id, application):
+        r = self.random
+        if application['status'] == ApplicationStatus.SAVED or self.documents_per_application <= 0:
+            return []
+        types = [DocumentType.RESUME]
+        if r.random() < 0.6:
+            types.append(DocumentType.COVER_LETTER)
+        if r.random() < 0.1:
+            types.append(DocumentType.PORTFOLIO)
+        types = types[:max(1, round(len(types) * self.documents_per_application))]
+        return [{
+            'application_id': application_id,
+            'document_type': document_type,
+            'filename': f'{document_type}_{application_id}.pdf',
+            'url': None,
+            'notes': None,
+            'created_at': application['created_at'],
+            'updated_at': application['created_at'],
+        } for document_type in types]
+
+
+def seed_users(users, first=0, seed=0, **options):
+    """Create ``users`` users with generated data; returns their ids.
+
+    Users are named ``user<N>@example.com`` from ``first`` onwards and all
+    share the password ``password``. Rows are written with executemany
+    per user, so the session hooks are bypassed and status counters and
+    caches are updated here.
+    """
+    generator = Generator(seed=seed, **options)
+    password_hash = generate_password_hash(PASSWORD)
+    user_ids = []
+
+    for n in range(first, first + users):
+        email = f'user{n}@example.com'
+        user = User(id=shards.allocate(email), name=f'User {n}', email=email, password_hash=password_hash,
+                    created_at=generator.now - timedelta(days=200))
+        db.session.add(user)
+        db.session.flush()
+        user_ids.append(user.id)
+
+        seed_applications(generator, user.id, generator.application_count())
+        db.session.commit()
+
+    cache.bump(user_ids)
+    return user_ids
+
+
+def seed_applications(generator, user_id, count, batch_size=5000):
+    """Add ``count`` generated applications with their children to an existing user.
+
+    Does not commit or bump the user's cache version.
+    """
+    for start in range(0, count, batch_size):
+        applications = [generator.application(user_id) for _ in range(min(batch_size, count - start))]
+        ids = db.session.execute(
+            insert(Application.__table__).returning(Application.__table__.c.id, sort_by_parameter_order=True),
+            shards.assign_ids(Application.__table__, applications),
+        ).scalars().all()
+
+        children = {Interview: [], Reminder: [], Document: []}
+        for application_id, application in zip(ids, applications):
+            children[Interview].extend(generator.interviews(application_id, application))
+            children[Reminder].extend(generator.reminders(application_id, application))
+            children[Document].extend(generator.documents(application_id, application))
+        for model, rows in children.items():
+            if rows:
+                db.session.execute(model.__table__.insert(), shards.assign_ids(model.__table__, rows))
+
+        statuses = Counter(application['status'] for application in applications)
+        apply_deltas(db.session.connection(), {(user_id, status): n for status, n in statuses.items()})
+        record_transitions(db.session.connection(), [
+            (application_id, user_id, None, application['status'], application['created_at'])
+            for application_id, application in zip(ids, applications)
+        ])
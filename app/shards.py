@@ -0,0 +1,495 @@
+import bisect
+import hashlib
+import time
+from collections import defaultdict
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, false, func, literal, select, text, update
+from app.cache import MemoryBackend, NullBackend, cache
+from app.database import db
+from app.models.id_allocation import IdAllocation
+from app.models.reminder_digest import ReminderDigest
+from app.models.user import User
+from app.models.user_directory import UserDirectoryEntry
+from app.replicas import is_read
+
+# Horizontal sharding by user id.
+#
+# Each DATABASE_SHARD_URLS entry becomes a bind ('shard1', 'shard2', ...)
+# holding whole users: the users row and everything hanging off it. The
+# primary (DATABASE_URL) keeps the user directory, which maps every user
+# id and email to its shard and allocates ids so they are unique across
+# shards. Users that predate sharding are registered as living on the
+# primary ('primary') until they are moved.
+#
+# The session sends every statement to the shard selected for it. The
+# user loader selects the current user's, login and signup select by
+# email, and CLI workers walk all shards with each_shard(), so router
+# queries are unchanged. A statement with no shard selected raises
+# ShardNotSelected rather than guessing.
+#
+# New users are placed by a consistent-hash ring over the shard keys, so
+# appending a shard reassigns about 1/N of the ids. `flask shards-rebalance`
+# moves users whose directory entry differs from the ring, online: their
+# writes are refused (503) while their rows are copied, reads carry on.
+# Directory lookups are cached per worker for SHARD_DIRECTORY_TTL seconds,
+# and the move waits that long before copying and again before deleting
+# the old copy, so no worker writes to a shard the user has left.
+#
+# Rows of user data get their ids from the primary too (id_allocations,
+# one counter per table, handed out per flush or Core insert), so a moved
+# user's rows keep their ids: links, cached pages and calendar UIDs stay
+# valid. Only rows created before the allocator can clash on the target;
+# those are renumbered.
+
+PRIMARY = 'primary'
+
+# Ring points per shard; more points, more even shares
+VNODES = 64
+
+# Directory entries cached per worker
+DIRECTORY_CACHE_ENTRIES = 10000
+
+# Parent ids per IN (...) when copying a user's child rows
+COPY_CHUNK_SIZE = 1000
+
+# Seconds a client is asked to wait while its account is being moved
+RETRY_AFTER = 5
+
+directory = UserDirectoryEntry.__table__
+allocations = IdAllocation.__table__
+users = User.__table__
+digests = ReminderDigest.__table__
+
+
+class ShardNotSelected(RuntimeError):
+    pass
+
+
+class UserMoving(RuntimeError):
+    """A write for a user whose rows are being copied to another shard."""
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent-hash ring: a user belongs to the first shard point after its id's hash."""
+
+    def __init__(self, keys, vnodes=VNODES):
+        points = sorted((_hash(f'{key}-{n}'), key) for key in keys for n in range(vnodes))
+        self._points = [point for point, _ in points]
+        self._keys = [key for _, key in points]
+
+    def shard_for(self, user_id):
+        index = bisect.bisect(self._points, _hash(str(user_id))) % len(self._points)
+        return self._keys[index]
+
+
+def shard_binds(config):
+    """SQLALCHEMY_BINDS entries for the configured shards."""
+    return {f'shard{n}': url for n, url in enumerate(config['DATABASE_SHARD_URLS'], 1)}
+
+
+class Shards:
+    """The ring and the cached directory of one app."""
+
+    def __init__(self, keys, directory_ttl):
+        self.keys = list(keys)
+        self.ring = HashRing(self.keys)
+        self.directory = MemoryBackend(DIRECTORY_CACHE_ENTRIES, directory_ttl) if directory_ttl else NullBackend()
+        self.allocated = {table.name for table in _allocated_tables()}
+
+    def get_bind(self, session, clause):
+        shard = session.info.get('shard')
+        if shard is None:
+            raise ShardNotSelected('No shard selected: use app.shards.select_user() or each_shard()')
+        if session.info.get('shard_moving') and not is_read(clause):
+            raise UserMoving('This account is being moved; try again in a few seconds')
+        return engine(shard)
+
+
+def _shards():
+    return current_app.extensions.get('shards')
+
+
+def engine(shard):
+    return db.engines[None if shard == PRIMARY else shard]
+
+
+def _select(shard, moving=False):
+    db.session.info['shard'] = shard
+    db.session.info['shard_moving'] = moving
+
+
+def directory_entry(user_id):
+    """``(shard, moving)`` for the user, or None if the directory has no such id."""
+    shards = _shards()
+    entry = shards.directory.get(user_id)
+    if entry is None:
+        with db.engine.connect() as connection:
+            row = connection.execute(
+                select(directory.c.shard, directory.c.moving).where(directory.c.id == user_id)
+            ).first()
+        if row is None:
+            return None
+        entry = (row.shard, row.moving)
+        shards.directory.set(user_id, entry)
+    return entry
+
+
+def select_user(user_id):
+    """Point the session at the user's shard; False if no shard has them.
+
+    Always True when sharding is off.
+    """
+    if _shards() is None:
+        return True
+    entry = directory_entry(user_id)
+    if entry is None:
+        return False
+    _select(*entry)
+    return True
+
+
+def select_email(email):
+    """Point the session at the shard of the user with ``email``; False if none.
+
+    Always True when sharding is off.
+    """
+    if _shards() is None:
+        return True
+    with db.engine.connect() as connection:
+        row = connection.execute(
+            select(directory.c.shard, directory.c.moving).where(directory.c.email == email)
+        ).first()
+    if row is None:
+        return False
+    _select(row.shard, row.moving)
+    return True
+
+
+def allocate(email):
+    """Id for a new user with ``email``, placed by the ring, with its shard selected.
+
+    None when sharding is off (the database assigns the id). An entry left
+    by a signup that never reached its shard is reused.
+    """
+    shards = _shards()
+    if shards is None:
+        return None
+    with db.engine.begin() as connection:
+        row = connection.execute(
+            select(directory.c.id, directory.c.shard).where(directory.c.email == email)
+        ).first()
+        if row is None:
+            user_id = connection.execute(
+                directory.insert().values(email=email, shard=PRIMARY, moving=False).returning(directory.c.id)
+            ).scalar_one()
+            shard = shards.ring.shard_for(user_id)
+            connection.execute(update(directory).where(directory.c.id == user_id).values(shard=shard))
+        else:
+            user_id, shard = row
+    _select(shard)
+    return user_id
+
+
+def forget(user_id):
+    """Remove a deleted user from the directory."""
+    shards = _shards()
+    if shards is None:
+        return
+    with db.engine.begin() as connection:
+        connection.execute(delete(directory).where(directory.c.id == user_id))
+    shards.directory.delete(user_id)
+
+
+def each_shard(user_id=None):
+    """Select every shard in turn, the primary first, for workers and reports.
+
+    With ``user_id``, only that user's shard. Yields the shard key, or once
+    with None when sharding is off.
+    """
+    shards = _shards()
+    if shards is None:
+        yield None
+        return
+    if user_id is not None:
+        if select_user(user_id):
+            yield db.session.info['shard']
+        return
+    for shard in [PRIMARY] + shards.keys:
+        _select(shard)
+        yield shard
+
+
+def find(query):
+    """First result of ``query()`` other than None, searching every shard.
+
+    For lookups by something other than the user (a calendar token); the
+    shard it was found on stays selected.
+    """
+    for _ in each_shard():
+        result = query()
+        if result is not None:
+            return result
+    return None
+
+
+def _allocated_tables():
+    """Tables of user data with a surrogate ``id``, whose ids come from the allocator."""
+    return [table for table, _, _ in _owned_tables()
+            if table is not users and [column.name for column in table.primary_key] == ['id']]
+
+
+def allocate_ids(table, count):
+    """``count`` new ids for ``table``, unique across the primary and every shard."""
+    stmt = update(allocations).where(allocations.c.table_name == table.name) \
+        .values(next_id=allocations.c.next_id + count).returning(allocations.c.next_id)
+    if db.session.info.get('shard') == PRIMARY:
+        # Users still on the primary: inside the session's own transaction,
+        # as a second connection would wait on its write lock under SQLite
+        next_id = db.session.connection().execute(stmt).scalar()
+    else:
+        with db.engine.begin() as connection:
+            next_id = connection.execute(stmt).scalar()
+    if next_id is None:
+        raise RuntimeError(f'No id allocation for {table.name}: run `flask db-upgrade`')
+    return list(range(next_id - count, next_id))
+
+
+def assign_ids(table, rows):
+    """Give Core insert ``rows`` (dicts) allocated ids when sharding; returns them."""
+    shards = _shards()
+    if shards is not None and table.name in shards.allocated and rows:
+        for row, id_ in zip(rows, allocate_ids(table, len(rows))):
+            row['id'] = id_
+    return rows
+
+
+def allocates_ids(table):
+    """Whether inserts into ``table`` must carry allocated ids (see assign_ids)."""
+    shards = _shards()
+    return shards is not None and table.name in shards.allocated
+
+
+@event.listens_for(db.session, 'before_flush')
+def _allocate_new_ids(session, flush_context, instances):
+    shards = _shards() if has_app_context() else None
+    if shards is None:
+        return
+    pending = defaultdict(list)
+    for obj in session.new:
+        table = getattr(obj, '__table__', None)
+        if table is not None and table.name in shards.allocated and obj.id is None:
+            pending[table].append(obj)
+    for table, objs in pending.items():
+        for obj, id_ in zip(objs, allocate_ids(table, len(objs))):
+            obj.id = id_
+
+
+def seed_allocations():
+    """Start each table's allocation above every id on the primary and shards; returns them.
+
+    Rerunning only ever raises them (for rows added by workers that predate
+    the allocator during a deploy).
+    """
+    tables = _allocated_tables()
+    highest = dict.fromkeys((table.name for table in tables), 0)
+    for shard in [PRIMARY] + _shards().keys:
+        with engine(shard).connect() as connection:
+            for table in tables:
+                highest[table.name] = max(highest[table.name],
+                                          connection.execute(select(func.max(table.c.id))).scalar() or 0)
+    with db.engine.begin() as connection:
+        current = dict(connection.execute(select(allocations.c.table_name, allocations.c.next_id)).all())
+        for name, top in highest.items():
+            if name not in current:
+                connection.execute(allocations.insert().values(table_name=name, next_id=top + 1))
+            elif current[name] <= top:
+                connection.execute(update(allocations).where(allocations.c.table_name == name)
+                                   .values(next_id=top + 1))
+        return dict(connection.execute(select(allocations.c.table_name, allocations.c.next_id)).all())
+
+
+def register_existing():
+    """Add users of the primary missing from the directory as living there; returns how many."""
+    with db.engine.begin() as connection:
+        registered = connection.execute(directory.insert().from_select(
+            ['id', 'email', 'shard', 'moving'],
+            select(users.c.id, users.c.email, literal(PRIMARY), false())
+            .where(users.c.id.not_in(select(directory.c.id))),
+        )).rowcount
+        if connection.dialect.name == 'postgresql':
+            # Explicit ids do not advance the sequence
+            connection.execute(text("SELECT setval(pg_get_serial_sequence('user_directory', 'id'), "
+                                    "COALESCE(MAX(id), 0) + 1, false) FROM user_directory"))
+    return registered
+
+
+def misplaced(limit=None):
+    """``[(user_id, from_shard, to_shard)]`` for users the ring places elsewhere."""
+    ring = _shards().ring
+    moves = []
+    with db.engine.connect() as connection:
+        # Users left mid-move by an interrupted run first
+        for user_id, shard in connection.execute(
+            select(directory.c.id, directory.c.shard).order_by(directory.c.moving.desc(), directory.c.id)
+        ):
+            target = ring.shard_for(user_id)
+            if shard != target:
+                moves.append((user_id, shard, target))
+                if limit and len(moves) >= limit:
+                    break
+    return moves
+
+
+def _set_directory(user_ids, **values):
+    with db.engine.begin() as connection:
+        connection.execute(update(directory).where(directory.c.id.in_(user_ids)).values(**values))
+
+
+def _owned_tables():
+    """``(table, owning column, parent table)`` for every table of user data, parents first.
+
+    A table with a foreign key to users is owned through it, whatever else
+    it references.
+    """
+    tables = [(users, users.c.id, None)]
+    owners = {users}
+    for table in db.metadata.sorted_tables:
+        if table in owners:
+            continue
+        fks = sorted(table.foreign_keys, key=lambda fk: (fk.column.table is not users, fk.parent.name))
+        for fk in fks:
+            if fk.column.table in owners:
+                tables.append((table, fk.parent, fk.column.table))
+                owners.add(table)
+                break
+    return tables
+
+
+def copy_user(user_id, source, target):
+    """Copy the user's rows from ``source`` to ``target`` in one transaction; returns ``(rows, renumbered)``.
+
+    Tables are found through their foreign keys to users and on down. Rows
+    keep their ids, which the allocator made unique across shards; a row
+    created before it whose id is taken on ``target`` gets a new one (and
+    references to it follow), counted in ``renumbered``.
+    """
+    copied = renumbered = 0
+    new_ids = {}
+    with engine(source).connect() as src, engine(target).begin() as dst:
+        # Whatever an interrupted earlier attempt left behind
+        dst.execute(delete(users).where(users.c.id == user_id))
+        for table, owner, parent in _owned_tables():
+            parent_ids = [user_id] if parent in (None, users) else list(new_ids[parent])
+            # Every reference to a renumbered row follows it to its new id
+            remaps = [(fk.parent.name, new_ids[fk.column.table]) for fk in table.foreign_keys
+                      if fk.column.table is not users and fk.column.table in new_ids]
+            surrogate = table is not users and [column.name for column in table.primary_key] == ['id']
+            ids = new_ids[table] = {}
+            for start in range(0, len(parent_ids), COPY_CHUNK_SIZE):
+                chunk = parent_ids[start:start + COPY_CHUNK_SIZE]
+                rows = [dict(row) for row in src.execute(select(table).where(owner.in_(chunk))).mappings()]
+                if not rows:
+                    continue
+                for row in rows:
+                    for name, remap in remaps:
+                        if row[name] is not None:
+                            row[name] = remap[row[name]]
+                    if table is digests:
+                        # Rebuilt on arrival, in case its items name renumbered rows
+                        row['stale'] = True
+                if surrogate:
+                    taken = set(dst.execute(
+                        select(table.c.id).where(table.c.id.in_([row['id'] for row in rows]))
+                    ).scalars())
+                    clashing = [row for row in rows if row['id'] in taken]
+                    fresh = iter(allocate_ids(table, len(clashing)) if clashing else ())
+                    for row in rows:
+                        old_id = row['id']
+                        if old_id in taken:
+                            row['id'] = next(fresh)
+                        ids[old_id] = row['id']
+                    renumbered += len(clashing)
+                dst.execute(table.insert(), rows)
+                copied += len(rows)
+    return copied, renumbered
+
+
+def _finish_moves():
+    """Delete the old copies of moved users; returns how many."""
+    with db.engine.connect() as connection:
+        moved = connection.execute(
+            select(directory.c.id, directory.c.moved_from).where(directory.c.moved_from.isnot(None))
+        ).all()
+    for user_id, shard in moved:
+        with engine(shard).begin() as connection:
+            # Cascades to everything the user owns on that shard
+            connection.execute(delete(users).where(users.c.id == user_id))
+        _set_directory([user_id], moved_from=None)
+    return len(moved)
+
+
+def rebalance(wait, limit=None, report=None):
+    """Move misplaced users to their ring shard, online; returns ``(moved, old copies deleted)``.
+
+    ``wait`` must exceed SHARD_DIRECTORY_TTL. Safe to rerun after a crash:
+    users left mid-move are moved first and old copies are cleaned up.
+    """
+    if _shards() is None:
+        raise RuntimeError('DATABASE_SHARD_URLS is not configured')
+    register_existing()
+    seed_allocations()
+    with db.engine.connect() as connection:
+        leftovers = connection.execute(
+            select(directory.c.id).where(directory.c.moved_from.isnot(None)).limit(1)
+        ).first()
+    if leftovers is not None:
+        time.sleep(wait)
+        _finish_moves()
+
+    moves = misplaced(limit)
+    if not moves:
+        return 0, 0
+    user_ids = [user_id for user_id, _, _ in moves]
+    _set_directory(user_ids, moving=True)
+    # Every worker now refuses these users' writes
+    time.sleep(wait)
+    renumbered_users = []
+    for user_id, source, target in moves:
+        rows, renumbered = copy_user(user_id, source, target)
+        _set_directory([user_id], shard=target, moving=False, moved_from=source)
+        if renumbered:
+            renumbered_users.append(user_id)
+        if report:
+            report(f'user {user_id}: {source} -> {target}, {rows} row(s)'
+                   + (f', {renumbered} renumbered' if renumbered else ''))
+    # Every worker now reads these users from their new shard
+    time.sleep(wait)
+    deleted = _finish_moves()
+
+    # Renumbered rows: cached pages and feeds link to their old ids (only
+    # this process's cache unless CACHE_BACKEND is shared)
+    cache.bump(renumbered_users)
+    for user_id in renumbered_users:
+        cache.backend.delete(f'ics:{user_id}')
+    return len(moves), deleted
+
+
+def init_app(app):
+    keys = list(shard_binds(app.config))
+    if not keys:
+        return
+    app.extensions['shards'] = Shards(keys, app.config['SHARD_DIRECTORY_TTL'])
+
+    @app.before_request
+    def _reset_shard():
+        # Selected afresh for every request, by the user loader or login
+        db.session.info.pop('shard', None)
+        db.session.info.pop('shard_moving', None)
+
+    @app.errorhandler(UserMoving)
+    def _user_moving(error):
+        return str(error), 503, {'Retry-After': str(RETRY_AFTER)}
@@ -0,0 +1,34 @@
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# The one per-statement hook behind request instrumentation.
+#
+# Every SQL statement executed while a request is active bumps a single
+# counter on `g`; metrics, query budgets and the N+1 detector read it as
+# a difference from where they started (so nested app contexts and
+# statements before a view are handled alike). Code that needs the
+# statement itself registers with `on_statement` instead of adding another
+# Engine listener, so each statement costs one event dispatch.
+
+_observers = []
+
+
+def on_statement(observer):
+    """Call ``observer(conn, context, statement, executemany)`` for each statement in a request."""
+    _observers.append(observer)
+    return observer
+
+
+def statement_count():
+    """Statements executed so far in the current request's app context."""
+    return g.get('sql_statement_count', 0) if has_request_context() else 0
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _statement(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    g.sql_statement_count = g.get('sql_statement_count', 0) + 1
+    for observer in _observers:
+        observer(conn, context, statement, executemany)
@@ -0,0 +1,143 @@
+from collections import Counter
+from sqlalchemy import event, func, inspect
+from app.database import db
+from app.models.application import Application
+from app.models.user import User
+from app.models.user_status_count import UserStatusCount
+
+counts_table = UserStatusCount.__table__
+
+
+def _upsert(connection, user_id, status, delta):
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(counts_table).values(user_id=user_id, status=status, count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[counts_table.c.user_id, counts_table.c.status],
+            set_={'count': counts_table.c.count + stmt.excluded['count']}
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        counts_table.update().where(
+            counts_table.c.user_id == user_id,
+            counts_table.c.status == status
+        ).values(count=counts_table.c.count + delta)
+    )
+    if result.rowcount == 0:
+        connection.execute(counts_table.insert().values(user_id=user_id, status=status, count=delta))
+
+
+def apply_deltas(connection, deltas):
+    """Add ``{(user_id, status): delta}`` to the counters on ``connection``.
+
+    Code that changes applications with Core statements (bypassing the
+    session hooks below) must call this in the same transaction.
+    """
+    for (user_id, status), delta in deltas.items():
+        if delta and user_id is not None and status is not None:
+            _upsert(connection, user_id, status, delta)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_status_changes(session, flush_context):
+    # Pre-flush state and attribute history are still available here, and
+    # we are inside the flush's transaction, so counters commit or roll back
+    # together with the application rows.
+    deltas = Counter()
+    deleted_users = {obj.id for obj in session.deleted if isinstance(obj, User)}
+
+    for obj in session.new:
+        if isinstance(obj, Application):
+            deltas[(obj.user_id, obj.status)] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Application):
+            state = inspect(obj)
+            user_id = state.attrs.user_id.history.deleted or [obj.user_id]
+            status = state.attrs.status.history.deleted or [obj.status]
+            deltas[(user_id[0], status[0])] -= 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Application) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        user_history = state.attrs.user_id.history
+        status_history = state.attrs.status.history
+        if not (user_history.has_changes() or status_history.has_changes()):
+            continue
+        old_user = user_history.deleted[0] if user_history.deleted else obj.user_id
+        old_status = status_history.deleted[0] if status_history.deleted else obj.status
+        if (old_user, old_status) != (obj.user_id, obj.status):
+            deltas[(old_user, old_status)] -= 1
+            deltas[(obj.user_id, obj.status)] += 1
+
+    # Deleted accounts lose their counter rows outright (as ON DELETE CASCADE
+    # would), so no delta may recreate them
+    for key in [k for k in deltas if k[0] in deleted_users]:
+        del deltas[key]
+    if deleted_users:
+        session.connection().execute(counts_table.delete().where(counts_table.c.user_id.in_(deleted_users)))
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def get_status_counts(user_id):
+    """``{status: count}`` for a user, read from the counters table."""
+    rows = db.session.query(UserStatusCount.status, UserStatusCount.count).filter(
+        UserStatusCount.user_id == user_id,
+        UserStatusCount.count != 0
+    ).all()
+    return dict(rows)
+
+
+def live_status_counts(user_id=None):
+    """``{(user_id, status): count}`` computed with GROUP BY over applications."""
+    query = db.session.query(
+        Application.user_id,
+        Application.status,
+        func.count(Application.id)
+    ).filter(Application.status.isnot(None))
+    if user_id is not None:
+        query = query.filter(Application.user_id == user_id)
+    return {(u, s): c for u, s, c in query.group_by(Application.user_id, Application.status)}
+
+
+def stored_status_counts(user_id=None):
+    query = db.session.query(UserStatusCount).filter(UserStatusCount.count != 0)
+    if user_id is not None:
+        query = query.filter(UserStatusCount.user_id == user_id)
+    return {(row.user_id, row.status): row.count for row in query}
+
+
+def find_mismatches(user_id=None):
+    """Keys whose stored counter differs from the live aggregate, with both values."""
+    live = live_status_counts(user_id)
+    stored = stored_status_counts(user_id)
+    return {
+        key: (stored.get(key, 0), live.get(key, 0))
+        for key in set(live) | set(stored)
+        if stored.get(key, 0) != live.get(key, 0)
+    }
+
+
+def reconcile(user_id=None):
+    """Rebuild counters from the applications table. Returns rows written."""
+    delete = counts_table.delete()
+    if user_id is not None:
+        delete = delete.where(counts_table.c.user_id == user_id)
+    db.session.execute(delete)
+
+    live = live_status_counts(user_id)
+    if live:
+        db.session.execute(counts_table.insert(), [
+            {'user_id': u, 'status': s, 'count': c} for (u, s), c in live.items()
+        ])
+    db.session.commit()
+    return len(live)
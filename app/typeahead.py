@@ -0,0 +1,129 @@
+import bisect
+import re
+from sqlalchemy import func, select
+from app.cache import MemoryBackend, NullBackend, cache
+from app.database import db
+from app.models.application import Application
+from app.replicas import primary_reads
+
+# Company/role typeahead for the application pickers.
+#
+# Each user's applications are held per worker as a PrefixIndex: only id,
+# company and role, plus a sorted array of search terms (the text from
+# each word start onwards, so "corp" finds "Acme Corp"). Lookups are a
+# bisect and a short scan. An index is built on first use and remembers
+# the user's cache data version (app.cache) it was built at; any write to
+# the user's applications bumps that version, so the next lookup rebuilds
+# it with one narrow query. With CACHE_BACKEND=null the version is the
+# applications' count and latest updated_at instead.
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_WORD_START = re.compile(r'(?<!\w)\w')
+
+applications = Application.__table__
+
+
+class PrefixIndex:
+    """Sorted search terms over ``[(id, company, role)]``."""
+
+    def __init__(self, rows):
+        # Ordered by company then role, for the empty query
+        self.items = sorted(rows, key=lambda row: (row[1].lower(), row[2].lower(), row[0]))
+        terms = []
+        for position, (_, company, role) in enumerate(self.items):
+            text = f'{company} {role}'.lower()
+            terms.extend((text[match.start():], position) for match in _WORD_START.finditer(text))
+        terms.sort()
+        self.terms = [term for term, _ in terms]
+        self.positions = [position for _, position in terms]
+
+    def __len__(self):
+        return len(self.items)
+
+    def _range(self, prefix):
+        return bisect.bisect_left(self.terms, prefix), bisect.bisect_left(self.terms, prefix + '\uffff')
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Up to ``limit`` ``(id, company, role)`` with a word starting with each word of ``query``.
+
+        Matches of the whole query as one phrase come first, then the rest
+        found through the query's rarest word; scans stop after ``limit`` hits.
+        """
+        words = query.lower().split()
+        if not words:
+            return self.items[:limit]
+        found = []
+        seen = set()
+
+        def scan(start, end, patterns=()):
+            for index in range(start, end):
+                if len(found) >= limit:
+                    return
+                position = self.positions[index]
+                if position in seen:
+                    continue
+                item = self.items[position]
+                if patterns:
+                    text = f'{item[1]} {item[2]}'.lower()
+                    if not all(pattern.search(text) for pattern in patterns):
+                        continue
+                seen.add(position)
+                found.append(item)
+
+        scan(*self._range(' '.join(words)))
+        if len(words) > 1:
+            start, end = min((self._range(word) for word in words), key=lambda span: span[1] - span[0])
+            scan(start, end, [re.compile(r'(?<!\w)' + re.escape(word)) for word in words])
+        return found
+
+
+class Typeahead:
+    """Per-worker ``{user_id: (data version, PrefixIndex)}``, bounded and TTL-expiring."""
+
+    def __init__(self):
+        self.backend = NullBackend()
+
+    def init_app(self, app):
+        entries = app.config['TYPEAHEAD_MAX_USERS']
+        self.backend = MemoryBackend(entries, app.config['CACHE_DEFAULT_TTL']) if entries else NullBackend()
+
+    def version(self, user_id):
+        """What the user's index is keyed by: their cache data version.
+
+        The null cache backend hands out a new version on every call, so
+        there the row count and latest update stand in for it (one
+        aggregate query instead of a rebuild per keystroke).
+        """
+        if not isinstance(cache.backend, NullBackend):
+            return cache.data_version(user_id)
+        return tuple(db.session.execute(
+            select(func.count(), func.max(applications.c.updated_at)).where(applications.c.user_id == user_id)
+        ).one())
+
+    def index(self, user_id):
+        version = self.version(user_id)
+        entry = self.backend.get(user_id)
+        if entry is None or entry[0] != version:
+            # Kept under ``version``, so read where that version's writes are
+            with primary_reads(db.session):
+                rows = db.session.execute(
+                    select(applications.c.id, func.coalesce(applications.c.company, ''),
+                           func.coalesce(applications.c.role, ''))
+                    .where(applications.c.user_id == user_id)
+                ).all()
+            entry = (version, PrefixIndex([tuple(row) for row in rows]))
+            self.backend.set(user_id, entry)
+        return entry[1]
+
+    def search(self, user_id, query, limit=DEFAULT_LIMIT):
+        """``[{'id', 'company', 'role'}]`` of the user's applications matching ``query``."""
+        limit = max(1, min(limit, MAX_LIMIT))
+        return [
+            {'id': id_, 'company': company, 'role': role}
+            for id_, company, role in self.index(user_id).search(query, limit)
+        ]
+
+
+typeahead = Typeahead()
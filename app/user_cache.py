@@ -0,0 +1,87 @@
+from flask_login import UserMixin
+from sqlalchemy import event
+from app.cache import MemoryBackend, NullBackend
+from app.database import db
+from app.models.user import User
+
+# Fields kept in the per-worker identity cache. Enough for current_user.id,
+# the navigation bar and every router query; anything else loads the row.
+SNAPSHOT_FIELDS = ('id', 'email', 'name', 'created_at')
+
+
+class CachedUser(UserMixin):
+    """Stand-in for ``User`` built from a cached snapshot.
+
+    Attributes outside the snapshot (``check_password``, ``applications``...)
+    are delegated to the ORM row, which is loaded on first such access.
+    """
+
+    def __init__(self, data):
+        self.__dict__.update(data)
+
+    @property
+    def orm(self):
+        if '_orm' not in self.__dict__:
+            self._orm = db.session.get(User, self.id)
+        return self._orm
+
+    def __getattr__(self, name):
+        # Only called for attributes missing from the snapshot
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.orm, name)
+
+    def __repr__(self):
+        return f'<CachedUser {self.email}>'
+
+
+class UserCache:
+    """Bounded, TTL-expiring identity cache used by the Flask-Login loader.
+
+    It is per worker, so a change made through another worker is seen here
+    once the entry's TTL runs out (USER_CACHE_TTL, seconds; 0 disables).
+    """
+
+    def __init__(self):
+        self.backend = NullBackend()
+
+    def init_app(self, app):
+        ttl = app.config['USER_CACHE_TTL']
+        self.backend = MemoryBackend(app.config['USER_CACHE_MAX_ENTRIES'], ttl) if ttl else NullBackend()
+
+    def load(self, user_id):
+        data = self.backend.get(user_id)
+        if data is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return None
+            data = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+            self.backend.set(user_id, data)
+        return CachedUser(data)
+
+    def forget(self, user_id):
+        self.backend.delete(user_id)
+
+
+user_cache = UserCache()
+
+
+# Drop snapshots of users changed (password, name...) or deleted, after commit
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('user_cache_changed', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _forget_changed_users(session):
+    for user_id in session.info.pop('user_cache_changed', ()):
+        user_cache.forget(user_id)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('user_cache_changed', None)
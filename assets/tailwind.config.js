@@ -0,0 +1,23 @@
+// Tailwind CSS v3 config for `flask build-assets`; paths are relative to the repo root.
+module.exports = {
+  content: ['./app/templates/**/*.html', './app/**/*.py'],
+  theme: {
+    extend: {
+      colors: {
+        primary: {
+          50: '#f0f9ff',
+          100: '#e0f2fe',
+          200: '#bae6fd',
+          300: '#7dd3fc',
+          400: '#38bdf8',
+          500: '#0ea5e9',
+          600: '#0284c7',
+          700: '#0369a1',
+          800: '#075985',
+          900: '#0c4a6e',
+        },
+      },
+    },
+  },
+  plugins: [],
+};
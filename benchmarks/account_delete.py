@@ -0,0 +1,127 @@
+"""Delete a large synthetic account and record time, transaction length and peak RSS.
+
+    python -m benchmarks.account_delete [--applications 10000] [--batch-size 1000]
+
+Seeds one user with exactly --applications generated applications (plus
+their interviews, documents and reminders) in a throwaway SQLite database,
+then deletes the account in a fresh subprocess per strategy, each on its
+own copy of the database:
+
+    batched  app.accounts.delete_account, one transaction per batch
+    single   one DELETE of the user row, cascading in a single transaction
+
+"longest transaction" is how long the database was held by one write;
+for SQLite that is how long every other writer waits.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.config import Config
+from app.migrations import upgrade
+
+EMAIL = 'delete-bench@example.com'
+STRATEGIES = ('batched', 'single')
+
+
+def config_for(path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+    return BenchConfig
+
+
+def seed(path, applications):
+    from app.database import db
+    from app.models.user import User
+    from app.seed import Generator, seed_applications
+
+    upgrade(f'sqlite:///{path}')
+    app = create_app(config_for(path))
+    with app.app_context():
+        user = User(name='Delete Bench', email=EMAIL)
+        user.set_password('benchmark')
+        db.session.add(user)
+        db.session.flush()
+        seed_applications(Generator(seed=0), user.id, applications)
+        db.session.commit()
+        return {table: db.session.execute(db.text(f'SELECT count(*) FROM {table}')).scalar()
+                for table in ('applications', 'interviews', 'documents', 'reminders')}
+
+
+def measure(path, strategy, batch_size):
+    from app import accounts
+    from app.database import db
+    from app.models.user import User
+
+    app = create_app(config_for(path))
+    with app.app_context():
+        user_id = db.session.query(User.id).filter_by(email=EMAIL).scalar()
+        db.session.commit()
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        start = time.perf_counter()
+        if strategy == 'batched':
+            result = accounts.delete_account(user_id, batch_size)
+            batches, longest = result.batches, result.longest_batch
+        else:
+            db.session.execute(User.__table__.delete().where(User.__table__.c.id == user_id))
+            db.session.commit()
+            batches, longest = 1, time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+
+        left = db.session.execute(db.text('SELECT count(*) FROM applications')).scalar()
+
+    print(json.dumps({
+        'strategy': strategy,
+        'seconds': round(elapsed, 3),
+        'batches': batches,
+        'longest_transaction_seconds': round(longest, 3),
+        'applications_left': left,
+        'baseline_rss_kb': baseline,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--applications', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--measure', nargs=3, metavar=('DB_PATH', 'STRATEGY', 'BATCH_SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        path, strategy, batch_size = args.measure
+        measure(path, strategy, int(batch_size))
+        return
+
+    workdir = tempfile.mkdtemp()
+    try:
+        seeded = os.path.join(workdir, 'seeded.db')
+        counts = seed(seeded, args.applications)
+        print('seeded ' + ', '.join(f'{n} {table}' for table, n in counts.items()))
+        for strategy in STRATEGIES:
+            path = os.path.join(workdir, f'{strategy}.db')
+            shutil.copyfile(seeded, path)
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.account_delete', '--measure', path, strategy,
+                                  str(args.batch_size)], check=True, capture_output=True, text=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            growth = result['peak_rss_kb'] - result['baseline_rss_kb']
+            print(f"{strategy:8s} {result['seconds']:7.3f}s in {result['batches']:3d} transaction(s), "
+                  f"longest {result['longest_transaction_seconds']:.3f}s  "
+                  f"peak RSS {result['peak_rss_kb'] / 1024:6.1f} MiB (+{growth / 1024:.1f} MiB)  "
+                  f"left {result['applications_left']}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
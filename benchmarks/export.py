@@ -0,0 +1,123 @@
+"""Export a large synthetic account and record time and peak RSS.
+
+    python -m benchmarks.export [--applications 50000]
+
+Seeds a throwaway SQLite database, then streams each export format
+through the Flask test client in a fresh subprocess, so every peak RSS
+figure starts from a clean interpreter.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.config import Config
+from app.migrations import upgrade
+
+EMAIL = 'export-bench@example.com'
+PASSWORD = 'benchmark'
+URLS = {
+    'csv': '/export/applications.csv',
+    'ndjson': '/export/applications.ndjson',
+    'bundle': '/export/bundle.zip',
+}
+
+
+def config_for(path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+    return BenchConfig
+
+
+def seed(path, applications):
+    from app.database import db
+    from app.models.application import Application
+    from app.models.interview import Interview
+    from app.models.reminder import Reminder
+    from app.models.user import User
+
+    upgrade(f'sqlite:///{path}')
+    app = create_app(config_for(path))
+    with app.app_context():
+        user = User(name='Export Bench', email=EMAIL)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+
+        now = datetime.utcnow()
+        for start in range(0, applications, 5000):
+            ids = range(start + 1, min(start + 5000, applications) + 1)
+            db.session.execute(Application.__table__.insert(), [
+                {'id': i, 'user_id': user.id, 'company': f'Company {i}', 'role': 'Engineer',
+                 'status': 'applied', 'notes': 'Synthetic notes ' * 8, 'created_at': now, 'updated_at': now}
+                for i in ids
+            ])
+            db.session.execute(Interview.__table__.insert(), [
+                {'application_id': i, 'scheduled_at': now + timedelta(days=i % 30), 'interview_type': 'technical',
+                 'duration_minutes': 60, 'outcome': 'pending', 'created_at': now, 'updated_at': now}
+                for i in ids if i % 2 == 0
+            ])
+            db.session.execute(Reminder.__table__.insert(), [
+                {'application_id': i, 'remind_on': date.today(), 'message': 'Follow up', 'completed': False,
+                 'created_at': now}
+                for i in ids if i % 3 == 0
+            ])
+        db.session.commit()
+
+
+def measure(path, fmt):
+    app = create_app(config_for(path))
+    client = app.test_client()
+    client.post('/login', data={'email': EMAIL, 'password': PASSWORD})
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    response = client.get(URLS[fmt], buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'format': fmt,
+        'seconds': round(elapsed, 2),
+        'bytes': size,
+        'baseline_rss_kb': baseline,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--applications', type=int, default=50000)
+    parser.add_argument('--measure', nargs=2, metavar=('DB_PATH', 'FORMAT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        seed(path, args.applications)
+        print(f'{args.applications} applications seeded')
+        for fmt in URLS:
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.export', '--measure', path, fmt],
+                                 check=True, capture_output=True, text=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            growth = result['peak_rss_kb'] - result['baseline_rss_kb']
+            print(f"{fmt:7s} {result['seconds']:6.2f}s {result['bytes'] / 1e6:7.1f} MB  "
+                  f"peak RSS {result['peak_rss_kb'] / 1024:6.1f} MiB (+{growth / 1024:.1f} MiB during export)")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+"""Latency, queries per request and memory for every GET route.
+
+    python -m benchmarks.routes [--users 20] [--applications 100] [--requests 200]
+                                [--concurrency 4] [--server testclient|gunicorn]
+                                [--output results.json] [--compare previous.json]
+
+Seeds a migrated database (a throwaway SQLite file unless --database-url
+is given) with app.seed, then drives each GET route of the blueprints in
+app/routers at fixed concurrency, each client logged in as a different
+seeded user. --server gunicorn runs the same load against a local
+gunicorn over HTTP instead of the Flask test client.
+
+Per route it reports p50/p95/p99 latency (ms), mean SQL statements per
+request (from the Server-Timing header, so streamed exports, which query
+after the headers are sent, show 0) and errors; RSS is sampled after the
+run. --output saves everything as JSON, --compare prints the p95 and
+query deltas against an earlier run.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Never benchmarked: they change the session or are not user pages
+SKIPPED_ENDPOINTS = {'auth.logout', 'auth.login', 'auth.signup'}
+
+# URL arguments build_url can fill; routes taking any other are skipped
+FILLABLE_ARGUMENTS = {'id', 'table'}
+
+# Which seeded table fills an <int:id> argument, by blueprint / API resource
+ID_SOURCES = {
+    'applications': 'applications', 'api.get_application': 'applications',
+    'interviews': 'interviews', 'api.get_interview': 'interviews',
+    'reminders': 'reminders', 'api.get_reminder': 'reminders',
+    'documents': 'documents', 'api.get_document': 'documents',
+}
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def rss_mib(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def routes(app):
+    """``(endpoint, rule)`` for every benchmarked GET route.
+
+    Routes with arguments other than an id (asset files, calendar tokens)
+    are left out.
+    """
+    found = []
+    for rule in app.url_map.iter_rules():
+        if 'GET' in rule.methods and '.' in rule.endpoint and rule.endpoint not in SKIPPED_ENDPOINTS \
+                and rule.arguments <= FILLABLE_ARGUMENTS:
+            found.append((rule.endpoint, rule))
+    return sorted(found, key=lambda item: item[0])
+
+
+def owned_ids(user_id):
+    from app.database import db
+    from app.models.application import Application
+    from app.models.document import Document
+    from app.models.interview import Interview
+    from app.models.reminder import Reminder
+
+    ids = {'applications': db.session.query(Application.id).filter(Application.user_id == user_id)}
+    for table, model in (('interviews', Interview), ('reminders', Reminder), ('documents', Document)):
+        ids[table] = db.session.query(model.id).join(Application).filter(Application.user_id == user_id)
+    return {table: [row[0] for row in query] for table, query in ids.items()}
+
+
+def build_url(endpoint, rule, ids, rng):
+    from flask import url_for
+
+    values = {}
+    if 'table' in rule.arguments:
+        values['table'] = 'applications'
+    if 'id' in rule.arguments:
+        source = ID_SOURCES.get(endpoint) or ID_SOURCES.get(endpoint.split('.')[0])
+        if not ids.get(source):
+            return None
+        values['id'] = rng.choice(ids[source])
+    return url_for(endpoint, **values)
+
+
+class TestClientDriver:
+    def __init__(self, app):
+        self.app = app
+
+    def session(self, email, password):
+        client = self.app.test_client()
+        client.post('/login', data={'email': email, 'password': password})
+        return client
+
+    def get(self, client, url):
+        response = client.get(url)
+        response.get_data()  # drain streamed bodies
+        return response.status_code, response.headers.get('Server-Timing', '')
+
+    def rss(self):
+        return {'process': rss_mib(os.getpid())}
+
+    def close(self):
+        pass
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class GunicornDriver:
+    def __init__(self, database_url, workers):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.port = s.getsockname()[1]
+        env = dict(os.environ, DATABASE_URL=database_url, SERVER_TIMING='1')
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'app.main:app', '--workers', str(workers),
+             '--bind', f'127.0.0.1:{self.port}', '--log-level', 'warning'],
+            cwd=ROOT, env=env,
+        )
+        self.base = f'http://127.0.0.1:{self.port}'
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(self.base + '/health', timeout=1)
+                return
+            except OSError:
+                time.sleep(0.1)
+        self.close()
+        raise RuntimeError('gunicorn did not come up')
+
+    def session(self, email, password):
+        jar = http.cookiejar.CookieJar()
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar), _NoRedirect)
+        data = urllib.parse.urlencode({'email': email, 'password': password}).encode()
+        try:
+            opener.open(self.base + '/login', data=data)
+        except urllib.error.HTTPError as e:
+            if e.code != 302:
+                raise
+        return opener
+
+    def get(self, opener, url):
+        try:
+            with opener.open(self.base + url) as response:
+                response.read()
+                return response.status, response.headers.get('Server-Timing', '')
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Server-Timing', '')
+
+    def rss(self):
+        workers = subprocess.run(['pgrep', '-P', str(self.process.pid)], capture_output=True, text=True).stdout
+        return {
+            'master': rss_mib(self.process.pid),
+            'workers': [rss_mib(int(pid)) for pid in workers.split()],
+        }
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+def run_route(app, driver, sessions, endpoint, rule, requests, concurrency, seed):
+    latencies, queries, errors = [], [], 0
+    lock = threading.Lock()
+
+    # Requests are fixed up front so every run issues the same ones. Each
+    # thread rotates through its own slice of the seeded users' sessions
+    plans = []
+    with app.test_request_context():
+        for index in range(concurrency):
+            rng = random.Random(f'{seed}:{endpoint}:{index}')
+            mine = sessions[index::concurrency] or [sessions[index % len(sessions)]]
+            plan = []
+            for n in range(requests // concurrency):
+                client, ids = mine[n % len(mine)]
+                url = build_url(endpoint, rule, ids, rng)
+                if url:
+                    plan.append((client, url))
+            plans.append(plan)
+
+    def worker(plan):
+        nonlocal errors
+        for client, url in plan:
+            start = time.perf_counter()
+            status, timing = driver.get(client, url)
+            elapsed = (time.perf_counter() - start) * 1000
+            match = QUERIES.search(timing)
+            with lock:
+                latencies.append(elapsed)
+                if match:
+                    queries.append(int(match.group(1)))
+                if status >= 400:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker, args=(plan,)) for plan in plans]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if not latencies:
+        return None
+    return {
+        'rule': rule.rule,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.mean(latencies), 2),
+        'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+    }
+
+
+def run_routes(app, driver, user_ids, ids, requests, concurrency, seed, pattern=None):
+    """``{endpoint: result}`` for every route matching ``pattern``, each seeded user logged in."""
+    from app.seed import PASSWORD
+
+    # Seeded users are user<n>@example.com, n counting from 0
+    sessions = [(driver.session(f'user{n}@example.com', PASSWORD), ids[user_id])
+                for n, user_id in enumerate(user_ids)]
+    results = {}
+    for endpoint, rule in routes(app):
+        if pattern and not re.search(pattern, endpoint):
+            continue
+        result = run_route(app, driver, sessions, endpoint, rule, requests, concurrency, seed)
+        if result:
+            results[endpoint] = result
+            print(f"{endpoint:40} p50 {result['p50_ms']:>8} p95 {result['p95_ms']:>8} "
+                  f"p99 {result['p99_ms']:>8} ms  queries {result['queries_per_request']}"
+                  + (f"  errors {result['errors']}" if result['errors'] else ''), file=sys.stderr)
+    return results
+
+
+def compare(previous, current):
+    print(f"\n{'endpoint':40} {'p95 before':>11} {'p95 now':>9} {'change':>8} {'queries':>12}")
+    for endpoint, now in current['routes'].items():
+        before = previous.get('routes', {}).get(endpoint)
+        if not before:
+            print(f'{endpoint:40} {"-":>11} {now["p95_ms"]:>9} {"new":>8}')
+            continue
+        change = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+        queries = f"{before['queries_per_request']} -> {now['queries_per_request']}"
+        print(f"{endpoint:40} {before['p95_ms']:>11} {now['p95_ms']:>9} {change:>+7.1f}% {queries:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--applications', type=int, default=100, help='Mean applications per user.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per route.')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--server', choices=('testclient', 'gunicorn'), default='testclient')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers.')
+    parser.add_argument('--database-url', help='Empty database to migrate and seed (default: temporary SQLite).')
+    parser.add_argument('--routes', help='Only endpoints matching this regex.')
+    parser.add_argument('--output', help='Write the results as JSON here.')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against.')
+    args = parser.parse_args()
+
+    path = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database_url = f'sqlite:///{path}'
+
+    from app import create_app
+    from app.config import Config
+    from app.migrations import upgrade
+    from app.seed import seed_users
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SERVER_TIMING = True
+
+    upgrade(database_url)
+    app = create_app(BenchConfig)
+    with app.app_context():
+        started = time.perf_counter()
+        user_ids = seed_users(args.users, seed=args.seed, applications_per_user=args.applications)
+        seed_seconds = time.perf_counter() - started
+        ids = {user_id: owned_ids(user_id) for user_id in user_ids}
+
+    driver = GunicornDriver(database_url, args.workers) if args.server == 'gunicorn' else TestClientDriver(app)
+    try:
+        results = run_routes(app, driver, user_ids, ids, args.requests, args.concurrency, args.seed, args.routes)
+        rss = driver.rss()
+    finally:
+        driver.close()
+        if path:
+            os.remove(path)
+
+    commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                            capture_output=True, text=True).stdout.strip() or None
+    report = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'config': {
+            'server': args.server, 'workers': args.workers if args.server == 'gunicorn' else None,
+            'users': args.users, 'applications': args.applications, 'seed': args.seed,
+            'requests': args.requests, 'concurrency': args.concurrency,
+            'database': database_url.split(':', 1)[0] if path is None else 'sqlite (temporary)',
+        },
+        'seed_seconds': round(seed_seconds, 2),
+        'rss_mib': rss,
+        'routes': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Cold-start time of a worker: import, app factory and first request.
+
+    python -m benchmarks.startup [--runs 10] [--database-url URL]
+
+Each run is a fresh interpreter, as a new gunicorn worker would be. The
+database is migrated once up front (a throwaway SQLite file unless
+--database-url is given), so runs measure boot work only. Prints JSON
+with the median and worst time of each phase, in milliseconds, for
+tracking across deploys.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Runs inside the child interpreter; DATABASE_URL is read by app.config
+CHILD = """
+import json, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get('/health')
+assert response.status_code == 200, response.status_code
+served = time.perf_counter()
+print(json.dumps({
+    'import': (imported - start) * 1000,
+    'factory': (created - imported) * 1000,
+    'first_request': (served - created) * 1000,
+    'total': (served - start) * 1000,
+}))
+"""
+
+
+def run_once(database_url):
+    env = dict(os.environ, DATABASE_URL=database_url, SCHEMA_CHECK='error')
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--database-url', help='Migrated database to boot against (default: temporary SQLite).')
+    args = parser.parse_args()
+
+    from app.migrations import upgrade
+
+    path = None
+    database_url = args.database_url
+    if database_url is None:
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database_url = f'sqlite:///{path}'
+        upgrade(database_url)
+
+    try:
+        run_once(database_url)  # warm the OS page cache and .pyc files
+        samples = [run_once(database_url) for _ in range(args.runs)]
+    finally:
+        if path:
+            os.remove(path)
+
+    print(json.dumps({
+        phase: {
+            'median_ms': round(statistics.median(s[phase] for s in samples), 1),
+            'max_ms': round(max(s[phase] for s in samples), 1),
+        }
+        for phase in samples[0]
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Dashboard requests/sec with and without the cached user loader.
+
+    python -m benchmarks.user_loader [--requests 2000]
+
+Runs against a throwaway SQLite database through the Flask test client,
+so the numbers measure per-request server work only.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.migrations import upgrade
+from app.models.application import Application
+from app.models.user import User
+
+
+def build_app(user_cache_ttl):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        USER_CACHE_TTL = user_cache_ttl
+
+    upgrade(BenchConfig.SQLALCHEMY_DATABASE_URI)
+    app = create_app(BenchConfig)
+    with app.app_context():
+        user = User(name='Bench', email='bench@example.com')
+        user.set_password('benchmark')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all(
+            Application(user_id=user.id, company=f'Company {i}', role='Engineer')
+            for i in range(50)
+        )
+        db.session.commit()
+    return app, path
+
+
+def run(user_cache_ttl, requests):
+    app, path = build_app(user_cache_ttl)
+    try:
+        client = app.test_client()
+        client.post('/login', data={'email': 'bench@example.com', 'password': 'benchmark'})
+        client.get('/')  # warm the response and identity caches
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get('/')
+        elapsed = time.perf_counter() - start
+        return requests / elapsed
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    before = run(0, args.requests)
+    after = run(Config.USER_CACHE_TTL or 60, args.requests)
+    print(f'dashboard, uncached user loader: {before:8.1f} req/s')
+    print(f'dashboard, cached user loader:   {after:8.1f} req/s  ({after / before:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import shutil
+import pytest
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.migrations import upgrade
+from app.models.user import User
+
+PASSWORD = 'secret123'
+
+
+@pytest.fixture(scope='session')
+def migrated_db(tmp_path_factory):
+    # Migrated once; every test gets its own copy
+    path = tmp_path_factory.mktemp('template') / 'job_tracker.db'
+    upgrade(f'sqlite:///{path}')
+    return path
+
+
+@pytest.fixture
+def app(migrated_db, tmp_path):
+    path = tmp_path / 'job_tracker.db'
+    shutil.copyfile(migrated_db, path)
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        TESTING = True
+        CACHE_BACKEND = 'memory'
+        MAIL_BACKEND = 'null'
+        DATABASE_REPLICA_URLS = []
+        DATABASE_SHARD_URLS = []
+
+    return create_app(TestConfig)
+
+
+@pytest.fixture
+def user_id(app):
+    with app.app_context():
+        user = User(name='Test User', email='test@example.com')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def client(app, user_id):
+    """A test client logged in as the ``user_id`` user."""
+    client = app.test_client()
+    response = client.post('/login', data={'email': 'test@example.com', 'password': PASSWORD})
+    assert response.status_code == 302
+    return client
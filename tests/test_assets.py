@@ -0,0 +1,15 @@
+from app.assets import used_icons
+
+
+def test_used_icons_scans_templates_and_python(tmp_path):
+    templates = tmp_path / 'templates'
+    templates.mkdir()
+    (templates / 'page.html').write_text('<i class="fas fa-sync fa-spin"></i> <i class="fas {{ stat.icon }}"></i>')
+    (tmp_path / 'views.py').write_text("stats = [{'icon': 'fa-times-circle'}]\n")
+    (tmp_path / 'notes.txt').write_text('fa-ignored')
+
+    assert used_icons(str(templates), str(tmp_path)) == {'sync', 'times-circle'}
+
+
+def test_dashboard_stat_icons_are_bundled():
+    assert {'briefcase', 'spinner', 'trophy', 'times-circle'} <= used_icons()
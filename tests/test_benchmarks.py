@@ -0,0 +1,14 @@
+from app.seed import seed_users
+from benchmarks import routes as harness
+
+
+def test_route_harness_runs_against_every_route(app):
+    with app.app_context():
+        user_ids = seed_users(2, applications_per_user=5)
+        ids = {user_id: harness.owned_ids(user_id) for user_id in user_ids}
+
+    results = harness.run_routes(app, harness.TestClientDriver(app), user_ids, ids, requests=2, concurrency=1, seed=0)
+
+    assert set(results) <= {endpoint for endpoint, _ in harness.routes(app)}
+    assert 'dashboard.index' in results
+    assert {endpoint: result['errors'] for endpoint, result in results.items() if result['errors']} == {}
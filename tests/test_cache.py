@@ -0,0 +1,46 @@
+import os
+import stat
+import pytest
+from app.cache import SQLiteBackend
+
+
+def test_sqlite_cache_file_is_private(tmp_path):
+    path = tmp_path / 'cache.db'
+    backend = SQLiteBackend(str(path))
+    backend.set('key', {'value': 1})
+
+    assert backend.get('key') == {'value': 1}
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_sqlite_cache_tightens_an_open_file(tmp_path):
+    path = tmp_path / 'cache.db'
+    path.touch()
+    os.chmod(path, 0o666)
+    SQLiteBackend(str(path))
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_sqlite_cache_refuses_a_symlink(tmp_path):
+    target = tmp_path / 'elsewhere.db'
+    target.touch()
+    os.symlink(target, tmp_path / 'cache.db')
+    with pytest.raises(OSError):
+        SQLiteBackend(str(tmp_path / 'cache.db'))
+
+
+@pytest.mark.skipif(not hasattr(os, 'geteuid') or os.geteuid() != 0, reason='needs root to chown')
+def test_sqlite_cache_refuses_another_users_file(tmp_path):
+    path = tmp_path / 'cache.db'
+    path.touch()
+    os.chown(path, 65534, 65534)
+    with pytest.raises(ValueError, match='owned by another user'):
+        SQLiteBackend(str(path))
+
+
+def test_sqlite_cache_defaults_to_the_instance_folder(app, tmp_path):
+    from app.cache import BACKENDS
+
+    app.config['CACHE_PATH'] = None
+    app.instance_path = str(tmp_path / 'instance')
+    assert BACKENDS['sqlite'](app).path == os.path.join(app.instance_path, 'cache.db')
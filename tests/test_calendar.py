@@ -0,0 +1,42 @@
+import time
+from datetime import datetime
+from app.cache import cache
+from app.database import db
+from app.models.application import Application
+from app.models.interview import Interview
+from app.models.user import User
+
+UPDATED = datetime(2024, 5, 1, 9, 30, 15, 123456)
+
+
+def _feed_token(app, user_id):
+    with app.app_context():
+        application = Application(user_id=user_id, company='Acme', role='Engineer', status='interviewing')
+        db.session.add(application)
+        db.session.flush()
+        interview = Interview(application_id=application.id, scheduled_at=datetime(2024, 5, 2, 10))
+        db.session.add(interview)
+        db.session.get(User, user_id).calendar_token = 'feed-token'
+        db.session.commit()
+        db.session.query(Application).filter_by(id=application.id).update({'updated_at': UPDATED})
+        db.session.query(Interview).filter_by(id=interview.id).update({'updated_at': UPDATED})
+        db.session.commit()
+    return 'feed-token'
+
+
+def test_last_modified_comes_from_the_data_not_the_worker(app, user_id):
+    token = _feed_token(app, user_id)
+    client = app.test_client()
+    first = client.get(f'/calendar/{token}.ics')
+    assert first.status_code == 200
+    assert first.last_modified.replace(tzinfo=None) == UPDATED.replace(microsecond=0)
+
+    # Another worker renders the feed later from an empty cache
+    time.sleep(1.1)
+    with app.app_context():
+        cache.backend.delete(f'ics:{user_id}')
+    second = client.get(f'/calendar/{token}.ics')
+    assert second.headers['Last-Modified'] == first.headers['Last-Modified']
+
+    revalidated = client.get(f'/calendar/{token}.ics', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert revalidated.status_code == 304
@@ -0,0 +1,90 @@
+from datetime import date
+from sqlalchemy import select
+from app.database import db
+from app.digest import build_digest, digests_table, get_digest, mark_stale, _due_query, _store
+from app.models.application import Application
+from app.models.reminder import Reminder
+from app.models.reminder_digest import ReminderDigest
+
+
+def _add_reminder(user_id, message):
+    application = Application(user_id=user_id, company='Acme', role='Engineer', status='applied')
+    db.session.add(application)
+    db.session.flush()
+    db.session.add(Reminder(application_id=application.id, remind_on=date.today(), message=message))
+    db.session.commit()
+
+
+def _digest_row(user_id):
+    return db.session.execute(select(digests_table).where(digests_table.c.user_id == user_id)).one()
+
+
+def test_first_change_leaves_a_stale_placeholder(app, user_id):
+    with app.app_context():
+        _add_reminder(user_id, 'Follow up')
+        assert _digest_row(user_id).stale is True
+
+        assert get_digest(user_id)['today_count'] == 1
+        row = _digest_row(user_id)
+        assert (row.stale, row.today_count) == (False, 1)
+
+
+def test_rebuild_does_not_clear_a_newer_stale_mark(app, user_id):
+    today = date.today()
+    with app.app_context():
+        _add_reminder(user_id, 'First')
+        version = _digest_row(user_id).version
+        rows = db.session.execute(_due_query(today, [user_id])).all()
+        # Another request adds a reminder while this rebuild is running
+        _add_reminder(user_id, 'Second')
+        _store(db.session.connection(), user_id, today, build_digest(rows, today), version)
+        db.session.commit()
+
+        row = _digest_row(user_id)
+        assert (row.stale, row.today_count) == (True, 1)
+        assert get_digest(user_id)['today_count'] == 2
+        assert _digest_row(user_id).stale is False
+
+
+def test_mark_stale_skips_unknown_users(app, user_id):
+    with app.app_context():
+        mark_stale(db.session.connection(), [user_id, user_id + 1000])
+        db.session.commit()
+        assert [row.user_id for row in db.session.execute(select(digests_table))] == [user_id]
+        assert db.session.get(ReminderDigest, user_id).stale
+
+
+class _Stop(Exception):
+    pass
+
+
+def test_digest_worker_survives_a_failed_run(app, monkeypatch):
+    import time
+
+    calls = []
+
+    def run(today, **kwargs):
+        calls.append(today)
+        if len(calls) == 1:
+            raise ConnectionError('SMTP server went away')
+        raise _Stop
+
+    def sleep(seconds):
+        if len(calls) > 1:
+            raise _Stop
+
+    monkeypatch.setattr('app.digest.run', run)
+    monkeypatch.setattr(time, 'sleep', sleep)
+    result = app.test_cli_runner().invoke(args=['reminder-digest', '--every', '60'])
+
+    assert isinstance(result.exception, _Stop)
+    assert len(calls) == 2
+
+
+def test_digest_one_off_run_still_fails(app, monkeypatch):
+    def run(today, **kwargs):
+        raise ConnectionError('SMTP server went away')
+
+    monkeypatch.setattr('app.digest.run', run)
+    result = app.test_cli_runner().invoke(args=['reminder-digest'])
+    assert isinstance(result.exception, ConnectionError)
@@ -0,0 +1,54 @@
+import io
+from app.importer import ImportRowError, iter_records
+from app.models.application import Application
+from app.status_counts import find_mismatches
+
+
+def _upload(client, data, filename='applications.csv'):
+    return client.post('/applications/import', data={'file': (io.BytesIO(data), filename)},
+                       content_type='multipart/form-data')
+
+
+def test_latin1_rows_are_reported_not_a_server_error(app, client, user_id):
+    data = ('company,role,status\n'
+            'Acme,Engineer,applied\n'
+            'Café Oy,Barista,saved\n'
+            'Globex,Manager,saved\n').encode('latin-1')
+    response = _upload(client, data)
+
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'Imported 2 application(s).' in body
+    assert 'not valid UTF-8' in body
+    with app.app_context():
+        assert sorted(a.company for a in Application.query.filter_by(user_id=user_id)) == ['Acme', 'Globex']
+        assert find_mismatches() == {}
+
+
+def test_malformed_csv_row_is_reported_and_the_rest_imported(app, client, user_id):
+    data = ('company,role\n'
+            'Acme,Engineer\n'
+            f'"{"x" * 200000}",Huge\n'
+            'Globex,Manager\n').encode()
+    response = _upload(client, data)
+
+    assert response.status_code == 200
+    assert 'malformed CSV' in response.get_data(as_text=True)
+    with app.app_context():
+        assert Application.query.filter_by(user_id=user_id).count() == 2
+
+
+def test_iter_records_handles_bom_and_bad_ndjson_bytes():
+    csv_rows = list(iter_records(io.BytesIO(b'\xef\xbb\xbfcompany,role\nAcme,Dev\n'), 'csv'))
+    assert csv_rows == [(2, {'company': 'Acme', 'role': 'Dev'})]
+
+    rows = list(iter_records(io.BytesIO(b'{"company": "A", "role": "B"}\n{"company": "\xff"}\n[1]\n'), 'ndjson'))
+    assert rows[0] == (1, {'company': 'A', 'role': 'B'})
+    assert isinstance(rows[1][1], ImportRowError) and rows[1][0] == 2
+    assert str(rows[2][1]) == 'expected a JSON object'
+
+
+def test_undecodable_header_rejects_the_file(client):
+    response = _upload(client, 'compañía,role\nAcme,Dev\n'.encode('latin-1'))
+    assert response.status_code == 200
+    assert 'header is not valid UTF-8' in response.get_data(as_text=True)
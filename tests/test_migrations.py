@@ -0,0 +1,90 @@
+import sqlite3
+import pytest
+from sqlalchemy import create_engine
+from app.migrations import adopt, current_revisions, head_revisions, upgrade
+
+
+def test_upgrade_adopts_a_database_built_by_create_all(tmp_path):
+    # What db.create_all() left behind: the initial tables, no alembic_version
+    path = tmp_path / 'legacy.db'
+    url = f'sqlite:///{path}'
+    upgrade(url, '0001')
+    with sqlite3.connect(path) as connection:
+        connection.execute('DROP TABLE alembic_version')
+        connection.execute("INSERT INTO users (name, email, password_hash, created_at) "
+                           "VALUES ('Old', 'old@example.com', 'x', '2026-01-01')")
+        connection.execute("INSERT INTO applications (user_id, company, role, status, created_at, updated_at) "
+                           "VALUES (1, 'Acme', 'Engineer', 'applied', '2026-01-01', '2026-01-01')")
+
+    assert upgrade(url) is True
+
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        assert current_revisions(connection) == head_revisions()
+    engine.dispose()
+    with sqlite3.connect(path) as connection:
+        assert connection.execute('SELECT user_id, status, count FROM user_status_counts').fetchall() == [
+            (1, 'applied', 1)
+        ]
+
+
+def test_upgrade_adopts_a_create_all_database_from_before_user_011(tmp_path):
+    # create_all() at commits up to user-010 also built the later tables,
+    # indexes and columns (through 0006), still without alembic_version
+    path = tmp_path / 'create_all.db'
+    url = f'sqlite:///{path}'
+    upgrade(url, '0006')
+    with sqlite3.connect(path) as connection:
+        connection.execute('DROP TABLE alembic_version')
+        connection.execute("INSERT INTO users (name, email, password_hash, created_at) "
+                           "VALUES ('Old', 'old@example.com', 'x', '2026-01-01')")
+        connection.execute("INSERT INTO applications (user_id, company, role, status, created_at, updated_at) "
+                           "VALUES (1, 'Acme', 'Engineer', 'applied', '2026-01-01', '2026-01-01')")
+
+    assert upgrade(url) is True
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute('SELECT version_num FROM alembic_version').fetchall() == [
+            (revision,) for revision in head_revisions()
+        ]
+        assert connection.execute('SELECT user_id, status, count FROM user_status_counts').fetchall() == [
+            (1, 'applied', 1)
+        ]
+
+
+def test_adopt_leaves_empty_and_migrated_databases_alone(tmp_path):
+    url = f'sqlite:///{tmp_path / "fresh.db"}'
+    assert adopt(url) is False
+    assert upgrade(url) is False
+    assert adopt(url) is False
+
+
+def test_worker_recovers_once_the_upgrade_finishes(tmp_path, monkeypatch):
+    from app import create_app
+    from app import migrations
+    from app.config import Config
+
+    path = tmp_path / 'behind.db'
+    url = f'sqlite:///{path}'
+    upgrade(url, '0001')
+
+    class BehindConfig(Config):
+        SQLALCHEMY_DATABASE_URI = url
+        TESTING = True
+        CACHE_BACKEND = 'memory'
+        MAIL_BACKEND = 'null'
+        DATABASE_REPLICA_URLS = []
+        DATABASE_SHARD_URLS = []
+        SCHEMA_CHECK = 'error'
+
+    app = create_app(BehindConfig)
+    client = app.test_client()
+    with pytest.raises(migrations.SchemaOutOfDate):
+        client.get('/health')
+
+    upgrade(url)
+    # Still remembered within the interval, re-checked after it
+    with pytest.raises(migrations.SchemaOutOfDate):
+        client.get('/health')
+    monkeypatch.setattr(migrations, 'SCHEMA_RECHECK_SECONDS', 0)
+    assert client.get('/health').status_code == 200
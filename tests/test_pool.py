@@ -0,0 +1,63 @@
+import pytest
+from flask import g
+from sqlalchemy import text
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.pool import InstrumentedQueuePool, engine_options
+
+
+def test_profiles_only_size_server_pools():
+    sqlite = engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'DB_POOL_SIZE': 20})
+    assert 'poolclass' not in sqlite and 'pool_size' not in sqlite
+
+    postgres = engine_options({'SQLALCHEMY_DATABASE_URI': 'postgresql://db/jobs', 'DB_POOL_SIZE': 20})
+    assert postgres['poolclass'] is InstrumentedQueuePool
+    assert postgres['pool_size'] == 20
+
+
+def test_in_memory_sqlite_keeps_one_database():
+    class MemoryConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        TESTING = True
+        SCHEMA_CHECK = 'off'
+        DATABASE_REPLICA_URLS = []
+        DATABASE_SHARD_URLS = []
+
+    app = create_app(MemoryConfig)
+    with app.app_context():
+        db.session.execute(text('CREATE TABLE t (x INTEGER)'))
+        db.session.execute(text('INSERT INTO t VALUES (1)'))
+        db.session.commit()
+        assert db.session.execute(text('SELECT x FROM t')).scalar() == 1
+
+
+def test_pool_health_requires_the_metrics_token(app):
+    app.config['METRICS_TOKEN'] = 'sekrit'
+    client = app.test_client()
+    assert client.get('/health/pool').status_code == 401
+    response = client.get('/health/pool', headers={'Authorization': 'Bearer sekrit'})
+    assert response.status_code == 200
+    assert response.get_json()['pool']
+
+
+def test_metrics_are_not_public_outside_debug(app):
+    app.testing = False
+    assert app.test_client().get('/metrics').status_code == 404
+    app.config['METRICS_TOKEN'] = 'sekrit'
+    response = app.test_client().get('/metrics', headers={'Authorization': 'Bearer sekrit'})
+    assert response.status_code == 200
+
+
+def test_failed_statement_leaves_nothing_on_the_connection(app):
+    with app.test_request_context():
+        app.preprocess_request()
+        info = db.session.connection().info
+        before = {key: list(value) if isinstance(value, list) else value for key, value in info.items()}
+        for _ in range(3):
+            with pytest.raises(Exception):
+                db.session.execute(text('SELECT * FROM no_such_table'))
+            db.session.rollback()
+        db.session.execute(text('SELECT 1'))
+        assert db.session.connection().info == before
+        assert g.metrics_sql_time > 0
@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app.database import db
+from app.models.application import Application
+from app.models.document import Document
+from app.models.interview import Interview
+from app.models.reminder import Reminder
+from app.query_budget import QueryBudgetExceeded, query_budget
+
+
+def _application_with_children(app, user_id, children):
+    with app.app_context():
+        application = Application(user_id=user_id, company='Acme', role='Engineer', status='interviewing')
+        db.session.add(application)
+        db.session.flush()
+        for n in range(children):
+            db.session.add(Interview(application_id=application.id,
+                                     scheduled_at=datetime.utcnow() + timedelta(days=n)))
+            db.session.add(Reminder(application_id=application.id,
+                                    remind_on=date.today() + timedelta(days=n), message=f'Follow up {n}'))
+            db.session.add(Document(application_id=application.id, filename=f'cv-{n}.pdf'))
+        db.session.commit()
+        return application.id
+
+
+def _statements(app, client, path):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return statements
+
+
+def test_show_issues_the_same_statements_however_many_children(app, client, user_id):
+    few = _application_with_children(app, user_id, 1)
+    many = _application_with_children(app, user_id, 40)
+    client.get(f'/applications/{few}')  # warm the user cache
+
+    small = _statements(app, client, f'/applications/{few}')
+    large = _statements(app, client, f'/applications/{many}')
+
+    # The application and one SELECT ... IN per child collection
+    assert len(large) == len(small) <= 4
+    body = client.get(f'/applications/{many}').get_data(as_text=True)
+    assert 'cv-39.pdf' in body and 'Follow up 39' in body
+
+
+def test_query_budget_raises_when_exceeded(app):
+    @query_budget(1)
+    def chatty():
+        db.session.execute(db.text('SELECT 1'))
+        db.session.execute(db.text('SELECT 2'))
+        return 'done'
+
+    with app.test_request_context('/'):
+        with pytest.raises(QueryBudgetExceeded, match='issued 2 SQL statements'):
+            chatty()
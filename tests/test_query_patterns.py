@@ -0,0 +1,51 @@
+import pytest
+from flask import Response
+from sqlalchemy import select
+from app.database import db
+from app.models.application import Application
+from app.query_patterns import RepeatedQueriesDetected, repeated_queries_allowed
+from app.statements import statement_count
+
+
+def _lazy_loads(user_id, count):
+    # One statement per application, the way a template loop lazy-loads
+    for _ in range(count):
+        db.session.execute(select(Application).where(Application.user_id == user_id)).all()
+
+
+def test_repeated_statement_raises_in_tests(app, user_id):
+    threshold = app.config['NPLUSONE_THRESHOLD']
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        _lazy_loads(user_id, threshold)
+        with pytest.raises(RepeatedQueriesDetected) as raised:
+            app.process_response(Response())
+    assert f'{threshold}x from ' in str(raised.value)
+    assert 'FROM applications WHERE applications.user_id' in str(raised.value)
+
+
+def test_below_threshold_passes(app, user_id):
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        _lazy_loads(user_id, app.config['NPLUSONE_THRESHOLD'] - 1)
+        app.process_response(Response())
+
+
+def test_allowed_view_is_exempt(app, user_id):
+    @repeated_queries_allowed
+    def view():
+        _lazy_loads(user_id, app.config['NPLUSONE_THRESHOLD'] * 2)
+        return Response()
+
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        app.process_response(view())
+
+
+def test_statements_share_one_counter(app, user_id):
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        start = statement_count()
+        _lazy_loads(user_id, 3)
+        assert statement_count() - start == 3
+        app.process_response(Response())
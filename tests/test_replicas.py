@@ -0,0 +1,66 @@
+import shutil
+from datetime import date
+import pytest
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.models.application import Application
+from app.models.reminder import Reminder
+from app.models.reminder_digest import ReminderDigest
+from app.models.user import User
+from app.replicas import sync
+
+PASSWORD = 'secret123'
+
+
+@pytest.fixture
+def lagging(migrated_db, tmp_path):
+    """``(app, client, user_id)`` with one replica that misses the last write."""
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    shutil.copyfile(migrated_db, primary)
+
+    class ReplicaConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{primary}'
+        TESTING = True
+        CACHE_BACKEND = 'memory'
+        MAIL_BACKEND = 'null'
+        DATABASE_REPLICA_URLS = [f'sqlite:///{replica}']
+        DATABASE_SHARD_URLS = []
+        REPLICA_STICKY_SECONDS = 0
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        user = User(name='Test User', email='test@example.com')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    assert client.post('/login', data={'email': 'test@example.com', 'password': PASSWORD}).status_code == 302
+    sync(ReplicaConfig.SQLALCHEMY_DATABASE_URI, ReplicaConfig.DATABASE_REPLICA_URLS[0])
+
+    # Only the primary has this
+    with app.app_context():
+        application = Application(user_id=user_id, company='Acme', role='Engineer', status='applied')
+        db.session.add(application)
+        db.session.flush()
+        db.session.add(Reminder(application_id=application.id, remind_on=date.today(), message='Follow up'))
+        db.session.commit()
+    return app, client, user_id
+
+
+def test_dashboard_stores_state_read_from_the_primary(lagging):
+    app, client, user_id = lagging
+    response = client.get('/')
+    assert response.status_code == 200
+    assert b'Follow up' in response.data
+
+    with app.app_context():
+        digest = db.session.get(ReminderDigest, user_id)
+        assert (digest.today_count, digest.stale) == (1, False)
+
+
+def test_typeahead_index_reads_from_the_primary(lagging):
+    app, client, user_id = lagging
+    response = client.get('/applications/typeahead?q=acme')
+    assert [result['company'] for result in response.get_json()['results']] == ['Acme']
@@ -0,0 +1,118 @@
+import shutil
+from datetime import date, datetime
+import pytest
+from sqlalchemy import select
+from app import create_app, shards
+from app.bulk import add_reminder
+from app.config import Config
+from app.database import db
+from app.models.application import Application
+from app.models.interview import Interview
+from app.models.reminder import Reminder
+from app.models.user import User
+
+applications = Application.__table__
+interviews = Interview.__table__
+reminders = Reminder.__table__
+
+
+@pytest.fixture
+def sharded(migrated_db, tmp_path):
+    paths = [tmp_path / name for name in ('primary.db', 'shard1.db', 'shard2.db')]
+    for path in paths:
+        shutil.copyfile(migrated_db, path)
+
+    class ShardConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{paths[0]}'
+        TESTING = True
+        CACHE_BACKEND = 'memory'
+        MAIL_BACKEND = 'null'
+        DATABASE_REPLICA_URLS = []
+        DATABASE_SHARD_URLS = [f'sqlite:///{path}' for path in paths[1:]]
+        SHARD_DIRECTORY_TTL = 0
+
+    app = create_app(ShardConfig)
+    with app.app_context():
+        shards.seed_allocations()
+    return app
+
+
+def _add_user(email):
+    user = User(id=shards.allocate(email), name='Test User', email=email)
+    user.set_password('secret123')
+    db.session.add(user)
+    db.session.flush()
+    application = Application(user_id=user.id, company='Acme', role='Engineer', status='interviewing')
+    db.session.add(application)
+    db.session.flush()
+    db.session.add(Interview(application_id=application.id, scheduled_at=datetime(2026, 11, 2, 10)))
+    db.session.commit()
+    return user.id, db.session.info['shard']
+
+
+def _ids(shard, table, column, value):
+    with shards.engine(shard).connect() as connection:
+        return sorted(connection.execute(select(table.c.id).where(column == value)).scalars())
+
+
+def test_users_still_on_the_primary_get_allocated_ids(sharded):
+    with sharded.app_context():
+        user = User(name='Legacy', email='legacy@example.com')
+        user.set_password('secret123')
+        with shards.engine(shards.PRIMARY).begin() as connection:
+            connection.execute(User.__table__.insert().values(
+                id=500, name='Legacy', email='legacy@example.com', password_hash=user.password_hash,
+            ))
+        shards.register_existing()
+        assert shards.select_user(500) and db.session.info['shard'] == shards.PRIMARY
+        application = Application(user_id=500, company='Acme', role='Engineer', status='applied')
+        db.session.add(application)
+        db.session.commit()
+        assert application.id == shards.seed_allocations()['applications'] - 1
+
+
+def test_ids_are_unique_across_shards(sharded):
+    with sharded.app_context():
+        seen = []
+        for n in range(6):
+            user_id, shard = _add_user(f'user{n}@example.com')
+            seen += _ids(shard, applications, applications.c.user_id, user_id)
+        assert len(set(seen)) == len(seen)
+
+
+def test_moved_rows_keep_their_ids(sharded):
+    with sharded.app_context():
+        user_id, source = _add_user('test@example.com')
+        (application_id,) = _ids(source, applications, applications.c.user_id, user_id)
+        add_reminder(user_id, [application_id], date.today(), 'Follow up')
+        target = next(key for key in ['shard1', 'shard2'] if key != source)
+
+        rows, renumbered = shards.copy_user(user_id, source, target)
+
+        assert renumbered == 0
+        assert _ids(target, applications, applications.c.user_id, user_id) == [application_id]
+        for table in (interviews, reminders):
+            assert _ids(target, table, table.c.application_id, application_id) \
+                == _ids(source, table, table.c.application_id, application_id) != []
+
+
+def test_rows_that_predate_the_allocator_are_renumbered_on_a_clash(sharded):
+    with sharded.app_context():
+        user_id, source = _add_user('test@example.com')
+        (application_id,) = _ids(source, applications, applications.c.user_id, user_id)
+        target = next(key for key in ['shard1', 'shard2'] if key != source)
+        # Another user's row that already has this id on the target
+        with shards.engine(target).begin() as connection:
+            connection.execute(User.__table__.insert().values(
+                id=user_id + 1000, name='Other', email='other@example.com', password_hash='x',
+            ))
+            connection.execute(applications.insert().values(
+                id=application_id, user_id=user_id + 1000, company='Globex', role='Analyst', status='applied',
+            ))
+
+        rows, renumbered = shards.copy_user(user_id, source, target)
+
+        assert renumbered == 1
+        (moved_id,) = _ids(target, applications, applications.c.user_id, user_id)
+        assert moved_id != application_id
+        assert len(_ids(target, interviews, interviews.c.application_id, moved_id)) == 1
@@ -0,0 +1,48 @@
+from app.database import db
+from app.models.application import Application
+from app.status_counts import find_mismatches, get_status_counts
+
+
+def _ids(app, user_id):
+    with app.app_context():
+        return [a.id for a in Application.query.filter_by(user_id=user_id).order_by(Application.id)]
+
+
+def test_counters_follow_every_kind_of_write(app, client, user_id):
+    for n in range(8):
+        response = client.post('/applications/new', data={
+            'company': f'Company {n}', 'role': 'Engineer', 'status': 'applied' if n % 2 else 'saved',
+        })
+        assert response.status_code == 302
+    ids = _ids(app, user_id)
+
+    client.post(f'/applications/{ids[0]}/edit', data={'company': 'Renamed', 'role': 'Engineer', 'status': 'offer'})
+    client.post(f'/applications/{ids[1]}/status', data={'status': 'interviewing'})
+    client.post(f'/applications/{ids[2]}/status', data={'status': 'not-a-status'})
+    client.post(f'/applications/{ids[3]}/delete')
+    client.post('/applications/bulk', data={'action': 'status', 'status': 'rejected', 'ids': ids[4:7]})
+    client.post('/applications/bulk', data={'action': 'status', 'status': 'rejected', 'ids': ids[4:7]})
+    client.post('/applications/bulk', data={'action': 'delete', 'ids': ids[5:8]})
+
+    with app.app_context():
+        assert find_mismatches() == {}
+        assert get_status_counts(user_id) == {'offer': 1, 'interviewing': 1, 'saved': 1, 'rejected': 1}
+
+
+def test_counters_ignore_other_users_ids_in_bulk_actions(app, client, user_id):
+    with app.app_context():
+        from app.models.user import User
+        other = User(name='Other', email='other@example.com')
+        other.set_password('x')
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(Application(user_id=other.id, company='Theirs', role='Dev', status='saved'))
+        db.session.commit()
+        theirs = [a.id for a in Application.query.filter_by(user_id=other.id)]
+
+    client.post('/applications/bulk', data={'action': 'status', 'status': 'offer', 'ids': theirs})
+    client.post('/applications/bulk', data={'action': 'delete', 'ids': theirs})
+
+    with app.app_context():
+        assert find_mismatches() == {}
+        assert Application.query.filter(Application.id.in_(theirs)).count() == 1
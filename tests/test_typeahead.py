@@ -0,0 +1,18 @@
+from app.cache import NullBackend, cache
+from app.database import db
+from app.models.application import Application
+from app.typeahead import typeahead
+
+
+def test_null_cache_backend_keeps_the_index_until_applications_change(app, user_id, monkeypatch):
+    monkeypatch.setattr(cache, 'backend', NullBackend())
+    with app.test_request_context('/'):
+        db.session.add(Application(user_id=user_id, company='Acme', role='Engineer'))
+        db.session.commit()
+        index = typeahead.index(user_id)
+        assert typeahead.index(user_id) is index
+
+        db.session.add(Application(user_id=user_id, company='Globex', role='Analyst'))
+        db.session.commit()
+        assert [result['company'] for result in typeahead.search(user_id, 'glo')] == ['Globex']
+        assert typeahead.index(user_id) is not index